@@ -1,9 +1,44 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import (
+    Flask, request, jsonify, g, has_request_context, make_response, Response,
+)
+from flask.json.provider import JSONProvider
 import mysql.connector
+import click
 from pathlib import Path
 import traceback
 import hashlib
+import hmac
+import base64
+import json
 import os
+import datetime
+import decimal
+import re
+import csv
+import io
+import zipfile
+import gzip
+import mimetypes
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from operator import itemgetter
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json without it
+    orjson = None
 
 
 
@@ -12,6 +47,72 @@ app = Flask(__name__)
 BASE_DIR = Path(__file__).resolve().parent
 DIST_DIR = BASE_DIR / "frontend" / "dist"
 
+# =====================================================
+# JSON
+# =====================================================
+def json_default(o):
+    """Types MySQL rows carry that JSON has no native form for."""
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, datetime.timedelta):  # MySQL TIME columns
+        return str(o)
+    if isinstance(o, (bytes, bytearray)):
+        return o.decode("utf-8", "replace")
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    orjson when it is installed, stdlib json otherwise. Both produce the
+    same output: compact, UTF-8, ISO 8601 dates, Decimal as a string.
+    Keys are sorted like Flask's default provider, unless sort_keys is
+    turned off.
+    """
+
+    sort_keys = True
+
+    def _orjson_option(self, option=0):
+        option |= orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(
+                obj, default=json_default, option=self._orjson_option()
+            ).decode("utf-8")
+        kwargs.setdefault("default", json_default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("separators", (",", ":"))
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            body = orjson.dumps(
+                obj,
+                default=json_default,
+                option=self._orjson_option(orjson.OPT_APPEND_NEWLINE),
+            )
+        else:
+            body = self.dumps(obj) + "\n"
+        return self._app.response_class(body, mimetype="application/json")
+
+
+app.json = FastJSONProvider(app)
+
+
 # =====================================================
 # ENVIRONMENT
 # =====================================================
@@ -36,119 +137,489 @@ TEST_DB = {
     "port": 3306,
 }
 
+# =====================================================
+# CONNECTION POOL
+# =====================================================
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PING_AFTER = int(os.environ.get("DB_POOL_PING_AFTER", "30"))
+# Server-side prepared statements for the hot lookups. Off by default:
+# the pure-Python connector sends COM_STMT_RESET before every execute, so
+# each lookup costs two round trips to a remote server instead of one.
+# Turn on only where benchmarks/bench_prepared.py shows a win.
+DB_PREPARED_STATEMENTS = os.environ.get("DB_PREPARED_STATEMENTS", "0") == "1"
+# Prepared statements kept per pooled connection (LRU)
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "32"))
+
+# Dashboard pools talk to remote hosts; keep them small, warm and fail fast
+DASHBOARD_POOL_SIZE = int(os.environ.get("DASHBOARD_POOL_SIZE", "5"))
+DASHBOARD_POOL_MIN_IDLE = int(os.environ.get("DASHBOARD_POOL_MIN_IDLE", "2"))
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))
+DB_READ_TIMEOUT = int(os.environ.get("DB_READ_TIMEOUT", "15"))
+
+# `flask ensure-indexes` builds indexes on its own unpooled connection;
+# 0 waits as long as the ALTER takes
+INDEX_BUILD_READ_TIMEOUT = int(os.environ.get("INDEX_BUILD_READ_TIMEOUT", "0"))
+
+
+class PoolTimeout(mysql.connector.errors.PoolError):
+    """Raised when no pooled connection frees up within the wait timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a mysql.connector connection handed out by
+    ConnectionPool. Everything is delegated to the real connection,
+    except close(), which returns it to the pool instead.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._created = time.monotonic()
+        self._last_used = self._created
+        self._request_scoped = False
+        # (sql, dictionary) -> (prepared cursor, sql), least recently used first
+        self._statements = OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def prepared(self, sql, params=(), dictionary=False):
+        """
+        Execute one of the hot lookups and return the cursor.
+
+        With the pool's prepare_statements on, `sql` runs as a server-side
+        prepared statement: prepared the first time this connection sees
+        it and reused after that, so later calls only send the parameters
+        (binary protocol). Otherwise it goes through a plain text cursor.
+
+        Either cursor is unbuffered: read every row (fetchall) before
+        running anything else on the connection.
+        """
+        if not self._pool.prepare_statements:
+            cur = self._raw.cursor(dictionary=dictionary)
+            cur.execute(sql, params)
+            return cur
+
+        key = (sql, dictionary)
+        entry = self._statements.pop(key, None)
+        if entry is None:
+            entry = (self._raw.cursor(prepared=True, dictionary=dictionary), sql)
+            self._pool._count("stmt_prepared")
+            while len(self._statements) >= self._pool.statement_cache_size:
+                _, (evicted, _) = self._statements.popitem(last=False)
+                try:
+                    evicted.close()  # deallocates the server-side statement
+                except Exception:
+                    pass
+        else:
+            self._pool._count("stmt_reused")
+        self._statements[key] = entry
+
+        cur, sql = entry
+        # Same str object every time: the cursor only re-prepares when the
+        # operation it is given is not the one it prepared last
+        cur.execute(sql, params)
+        return cur
+
+    def close(self):
+        # Request-scoped connections go back in teardown_db()
+        if not self._request_scoped:
+            self._pool.release(self)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+
+    - at most `size` connections are open at once; callers wait up to
+      `timeout` seconds for one to free up
+    - connections older than `recycle` seconds are replaced on checkout
+    - connections idle longer than `ping_after` seconds are pinged first,
+      so a server-side wait_timeout never reaches a route
+    - warm() pre-opens `min_idle` connections so the first requests
+      don't pay the handshake
+    - with `prepare_statements`, each connection caches up to
+      `statement_cache_size` server-side prepared statements (see
+      PooledConnection.prepared)
+    """
+
+    def __init__(self, name, config, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 recycle=DB_POOL_RECYCLE, ping_after=DB_POOL_PING_AFTER,
+                 min_idle=0, prepare_statements=DB_PREPARED_STATEMENTS,
+                 statement_cache_size=DB_STATEMENT_CACHE_SIZE):
+        self.name = name
+        self.config = config
+        self.size = size
+        self.min_idle = min(min_idle, size)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.prepare_statements = prepare_statements
+        self.statement_cache_size = max(statement_cache_size, 1)
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "timeouts": 0,
+            "in_use": 0,
+            "wait_total_ms": 0.0,
+            "wait_max_ms": 0.0,
+            "stmt_prepared": 0,
+            "stmt_reused": 0,
+        }
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _open(self):
+        raw = mysql.connector.connect(**self.config)
+        with self._lock:
+            self._stats["created"] += 1
+        return PooledConnection(self, raw)
+
+    def _discard(self, conn):
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
+
+    def _usable(self, conn):
+        now = time.monotonic()
+        if self.recycle and now - conn._created > self.recycle:
+            with self._lock:
+                self._stats["recycled"] += 1
+            return False
+        if now - conn._last_used > self.ping_after:
+            try:
+                conn._raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def warm(self):
+        """Open connections until `min_idle` are idle. Returns how many were opened."""
+        opened = 0
+        while self._idle.qsize() < self.min_idle:
+            if not self._slots.acquire(blocking=False):
+                break
+            try:
+                conn = self._open()
+                self._idle.put(conn)
+                opened += 1
+            except Exception as e:
+                print(f"⚠ {self.name} pool warm-up failed:", e)
+                break
+            finally:
+                self._slots.release()
+        return opened
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` for a free slot."""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(
+                f"{self.name} pool exhausted ({self.size} connections busy)"
+            )
+        waited_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._open()
+                    break
+                if self._usable(candidate):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_total_ms"] += waited_ms
+            self._stats["wait_max_ms"] = max(self._stats["wait_max_ms"], waited_ms)
+
+        conn._request_scoped = False
+        conn._wait_ms = waited_ms
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Return a connection to the pool, rolling back anything left open.
+        discard=True closes it instead, for connections left mid-result.
+        """
+        try:
+            if discard:
+                self._discard(conn)
+                return
+            if conn._raw.in_transaction:
+                conn._raw.rollback()
+            conn._last_used = time.monotonic()
+            self._idle.put(conn)
+        except Exception:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        checkouts = snapshot["checkouts"] or 1
+        snapshot["size"] = self.size
+        snapshot["min_idle"] = self.min_idle
+        snapshot["idle"] = self._idle.qsize()
+        snapshot["wait_avg_ms"] = round(snapshot["wait_total_ms"] / checkouts, 3)
+        snapshot["wait_total_ms"] = round(snapshot["wait_total_ms"], 3)
+        snapshot["wait_max_ms"] = round(snapshot["wait_max_ms"], 3)
+        return snapshot
+
+
+config_pool = ConnectionPool("config", TEST_DB)
+
+_DASHBOARD_TIMEOUTS = {
+    "connection_timeout": DB_CONNECT_TIMEOUT,
+    "read_timeout": DB_READ_TIMEOUT,
+}
+
+prod_pool = ConnectionPool(
+    "prod",
+    {**PROD_DB, **_DASHBOARD_TIMEOUTS},
+    size=DASHBOARD_POOL_SIZE,
+    min_idle=DASHBOARD_POOL_MIN_IDLE,
+)
+
+test_pool = ConnectionPool(
+    "test",
+    {**TEST_DB, **_DASHBOARD_TIMEOUTS},
+    size=DASHBOARD_POOL_SIZE,
+    min_idle=DASHBOARD_POOL_MIN_IDLE,
+)
+
+
+def dashboard_pool():
+    return prod_pool if APP_ENV == "prod" else test_pool
+
+
+def warm_pools():
+    """Pre-open connections for the active dashboard pool. Call once at startup."""
+    pool = dashboard_pool()
+    started = time.perf_counter()
+    opened = pool.warm()
+    print(
+        f"✔ {pool.name} dashboard pool warmed: {opened} connection(s) "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+
 # =====================================================
 # DB CONNECTION HELPERS
 # =====================================================
 def connect_prod():
-    return mysql.connector.connect(**PROD_DB)
+    return prod_pool.acquire()
 
 def connect_test():
-    return mysql.connector.connect(**TEST_DB)
+    return test_pool.acquire()
 
 def connect_dashboard():
     if APP_ENV == "prod":
         return connect_prod()
     return connect_test()
 
+def connect_index_builder():
+    """
+    Unpooled dashboard connection for long index builds. The pools'
+    connection/read timeouts would cut an ALTER on a large table short
+    (the connector keeps connection_timeout as the socket timeout for
+    every read, so neither is set unless INDEX_BUILD_READ_TIMEOUT is).
+    """
+    config = dict(PROD_DB if APP_ENV == "prod" else TEST_DB)
+    if INDEX_BUILD_READ_TIMEOUT:
+        config["read_timeout"] = INDEX_BUILD_READ_TIMEOUT
+    return mysql.connector.connect(**config)
+
 def connect():
+    """
+    Config DB connection from the pool. Inside a request the same
+    connection is reused by every helper and returned in teardown_db().
+    """
     try:
-        return mysql.connector.connect(**TEST_DB)
+        if not has_request_context():
+            return config_pool.acquire()
+
+        conn = g.get("db_conn")
+        if conn is None:
+            conn = config_pool.acquire()
+            conn._request_scoped = True
+            g.db_conn = conn
+            g.db_pool_wait_ms = conn._wait_ms
+        return conn
     except mysql.connector.Error as e:
-        print("Database connection failed")
+        print("Database connection failed:", e)
+
+
+@app.teardown_appcontext
+def teardown_db(exc):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        config_pool.release(conn)
 
 # =====================================================
-# UNION QUERY (SAFE VERSION)
+# FRESHNESS PROBES (ONE QUERY PER CLIENT)
 # =====================================================
-UNION_QUERY = """
-SELECT
-    'PHL' AS clientName,
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s') AS currentTime,
-    DATE_FORMAT((SELECT deviceTimestamp FROM phl.deviceStatus ORDER BY deviceTimestamp DESC LIMIT 1), '%Y-%m-%d %H:%i:%s') AS deviceStatusLastUpdated,
-    DATE_FORMAT((SELECT updatedTime FROM phl.peoplecountanalytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s') AS peopleLastUpdated,
-    DATE_FORMAT((SELECT updatedTime FROM phl.analytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s') AS analyticsLastUpdated,
-    DATE_FORMAT(
-        (SELECT updatedTime FROM flightDataHistory.{PHL_FLIGHT_TABLE}
-         ORDER BY updatedTime DESC LIMIT 1),
-        '%Y-%m-%d %H:%i:%s'
-    ) AS flightLastUpdated,
-    NULL AS trafficLastUpdated
-
-UNION ALL
-
-SELECT
-    'PIT',
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT deviceTimestamp FROM pit.deviceStatus ORDER BY deviceTimestamp DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM pit.peoplecountanalytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM pit.analytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT(
-        (SELECT updatedTime FROM flightDataHistory.{PIT_FLIGHT_TABLE}
-         ORDER BY updatedTime DESC LIMIT 1),
-        '%Y-%m-%d %H:%i:%s'
-    ),
-    NULL
-
-UNION ALL
-
-SELECT
-    'APPLE',
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT deviceTimestamp FROM apple.deviceStatus ORDER BY deviceTimestamp DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM apple.peoplecountanalytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM apple.analytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    NULL,
-    NULL
-
-UNION ALL
-
-SELECT
-    'DIAL',
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT deviceTimestamp FROM dial.deviceStatus ORDER BY deviceTimestamp DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM dial.peoplecountanalytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM dial.analytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    NULL,
-    NULL
-
-UNION ALL
-
-SELECT
-    'TRAXMIA',
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT deviceTimestamp FROM traxmia.deviceStatus ORDER BY deviceTimestamp DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM traxmia.peoplecountanalytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM traxmia.analytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    NULL,
-    NULL
-
-UNION ALL
-
-SELECT
-    'TAKEDA',
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT deviceTimestamp FROM takeda.deviceStatus ORDER BY deviceTimestamp DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM takeda.peoplecountanalytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    DATE_FORMAT((SELECT updatedTime FROM takeda.analytics ORDER BY updatedTime DESC LIMIT 1), '%Y-%m-%d %H:%i:%s'),
-    NULL,
-    NULL
-
-UNION ALL
-
-SELECT
-    'ABMMIA',
-    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s'),
-    NULL,
-    NULL,
-    NULL,
-    NULL,
-    DATE_FORMAT(
-        (SELECT updatedTime FROM abmmia.intrafficDataAdvHistory
-         ORDER BY updatedTime DESC LIMIT 1),
-        '%Y-%m-%d %H:%i:%s'
-    )
+FRESHNESS_PROBE_TIMEOUT = int(os.environ.get("FRESHNESS_PROBE_TIMEOUT", "10"))
+
+FRESHNESS_REGISTRY_TTL = int(os.environ.get("FRESHNESS_REGISTRY_TTL", "300"))
+
+# /api/lastupdated answers months from this many years back up to the
+# current month; anything else would only probe tables that don't exist
+FRESHNESS_YEARS_BACK = int(os.environ.get("FRESHNESS_YEARS_BACK", "2"))
+
+# Output columns of /api/lastupdated, in display order
+FRESHNESS_COLUMNS = [
+    "deviceStatusLastUpdated",
+    "peopleLastUpdated",
+    "analyticsLastUpdated",
+    "flightLastUpdated",
+    "trafficLastUpdated",
+]
+
+# Source kind -> output column (the `source=` filter takes kinds)
+FRESHNESS_KINDS = {
+    "deviceStatus": "deviceStatusLastUpdated",
+    "people": "peopleLastUpdated",
+    "analytics": "analyticsLastUpdated",
+    "flight": "flightLastUpdated",
+    "traffic": "trafficLastUpdated",
+}
+
+# A source is (kind, table, timestamp column). {db} is the client's
+# dbName; {year}/{month} are filled in per request.
+STANDARD_SITE_SOURCES = (
+    ("deviceStatus", "{db}.deviceStatus", "deviceTimestamp"),
+    ("people", "{db}.peoplecountanalytics", "updatedTime"),
+    ("analytics", "{db}.analytics", "updatedTime"),
+)
+
+FLIGHT_SOURCE = ("flight", "flightDataHistory.{db}_depHistory_{year}_{month}", "updatedTime")
+
+# Sites that differ from STANDARD_SITE_SOURCES, keyed by dbName.
+# Any other dbName found in client_details gets the standard sources.
+FRESHNESS_SOURCE_OVERRIDES = {
+    "phl": STANDARD_SITE_SOURCES + (FLIGHT_SOURCE,),
+    "pit": STANDARD_SITE_SOURCES + (FLIGHT_SOURCE,),
+    "abmmia": (("traffic", "{db}.intrafficDataAdvHistory", "updatedTime"),),
+}
+
+# Always on the dashboard, even if client_details can't be read
+FRESHNESS_SEED_DBNAMES = ("phl", "pit", "apple", "dial", "traxmia", "takeda", "abmmia")
+
+
+def is_safe_identifier(name):
+    """dbNames are spliced into SQL as schema names; allow only [A-Za-z0-9_]."""
+    return bool(name) and name.isascii() and name.replace("_", "").isalnum()
 
-ORDER BY clientName;
-"""
+
+def sources_for_db(db_name):
+    return FRESHNESS_SOURCE_OVERRIDES.get(db_name, STANDARD_SITE_SOURCES)
+
+
+FRESHNESS_DBNAMES_SQL = (
+    "SELECT DISTINCT dbName FROM client_details "
+    "WHERE dbName IS NOT NULL AND dbName <> ''"
+)
+
+
+def freshness_sources(db_names):
+    """{dbName: sources} for every safe name in db_names, sorted."""
+    return {
+        name: sources_for_db(name)
+        for name in sorted(db_names)
+        if is_safe_identifier(name)
+    }
+
+
+class FreshnessRegistry:
+    """
+    dbName -> freshness sources, built from the distinct dbNames in
+    client_details plus FRESHNESS_SEED_DBNAMES and reloaded every
+    `ttl` seconds. If client_details can't be read the last good
+    registry (or the seed list) is kept.
+    """
+
+    def __init__(self, ttl=FRESHNESS_REGISTRY_TTL):
+        self.ttl = ttl
+        self._sources = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load_db_names(self):
+        db = connect()
+        try:
+            cur = db.cursor()
+            cur.execute(FRESHNESS_DBNAMES_SQL)
+            return [row[0].strip().lower() for row in cur.fetchall()]
+        finally:
+            db.close()
+
+    def get(self):
+        """Return {dbName: sources}, reloading from client_details when expired."""
+        with self._lock:
+            if self._sources is not None and time.time() - self._loaded_at < self.ttl:
+                return self._sources
+
+            names = set(FRESHNESS_SEED_DBNAMES)
+            try:
+                names.update(self._load_db_names())
+            except Exception as e:
+                print("⚠ freshness registry reload failed:", e)
+                if self._sources is not None:
+                    self._loaded_at = time.time()
+                    return self._sources
+
+            self._sources = freshness_sources(names)
+            self._loaded_at = time.time()
+            return self._sources
+
+
+freshness_registry = FreshnessRegistry()
+
+
+@lru_cache(maxsize=1024)
+def build_probe_query(db_name, sources, year, month):
+    """
+    One SELECT returning currentTime plus the latest timestamp of every
+    source of a single client. MAX_EXECUTION_TIME makes the server give
+    up on a slow probe instead of holding the connection.
+    """
+    parts = [
+        f"SELECT /*+ MAX_EXECUTION_TIME({FRESHNESS_PROBE_TIMEOUT * 1000}) */",
+        "    DATE_FORMAT(NOW(), '%Y-%m-%d %H:%i:%s') AS currentTime",
+    ]
+    for kind, table, ts_col in sources:
+        table = table.format(db=db_name, year=year, month=month)
+        parts.append(
+            f"  , DATE_FORMAT((SELECT {ts_col} FROM {table} "
+            f"ORDER BY {ts_col} DESC LIMIT 1), '%Y-%m-%d %H:%i:%s') "
+            f"AS {FRESHNESS_KINDS[kind]}"
+        )
+    return "\n".join(parts)
 
 
 # ======================================================================
@@ -159,442 +630,857 @@ DEFAULT_LANG_LIST = "English,German,Dutch"
 DEFAULT_DISPLAY_LIST = "English"
 DEFAULT_WELCOME_BODY = "WELCOME TO SEE MORE"
 
+DEFAULT_HEADER_LOGO = "https://zanelbapp.zancompute.com:82/ClientLogos/ANALYTICSPRD/ISS4.png"
+DEFAULT_POWERED_BY_LOGO = "https://zanelbapp.zancompute.com:82/ClientLogos/ANALYTICSPRD/Kiosk-Powered-by-1.png"
+DEFAULT_PRODUCT_LOGO = "https://gcp-image.zancompute.com/ClientLogos/ANALYTICSPRD/Bobrick-BG-Ori.png"
+
 
 # ======================================================================
-#  ALTER TABLE HELPERS
+#  CLIENT FIELD REGISTRY
 # ======================================================================
+# Every client config column is declared once, in CLIENT_FIELDS. The DDL,
+# DESIRED_COLUMNS (for the schema planner), the /api/client-defaults
+# payload and the INSERT/UPDATE statements are all derived from it below,
+# once, at import.
+ER_DUP_KEYNAME = 1061
+ER_PARSE_ERROR = 1064
+ER_TABLEACCESS_DENIED_ERROR = 1142
+ER_NO_SUCH_TABLE = 1146
+ER_ALTER_OPERATION_NOT_SUPPORTED = 1845
+ER_ALTER_OPERATION_NOT_SUPPORTED_REASON = 1846
+ER_QUERY_TIMEOUT = 3024
+
+
+def split_type(column_type):
+    """'VARCHAR(45) NOT NULL' -> ('varchar', 45, True)"""
+    not_null = "NOT NULL" in column_type.upper()
+    base = column_type.upper().replace("NOT NULL", "").strip().lower()
+    if "(" in base:
+        name, length = base.split("(", 1)
+        return name, int(length.rstrip(")").split(",")[0]), not_null
+    return base, None, not_null
+
+
+def sql_literal(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def column_definition(column_type, default):
+    definition = column_type
+    if default is not None:
+        definition += f" DEFAULT {sql_literal(default)}"
+    return definition
+
+
+class Field:
+    """
+    One client config column.
 
-def alter_clientappdetails_defaults():
-    """Apply defaults to clientappdetails without touching existing data."""
-    try:
-        db = connect()
-        cur = db.cursor()
+    default      filled in when a write leaves the field out; also what
+                 /api/client-defaults hands the AddClient page
+    ddl_default  False when the column has no DEFAULT in the DDL
+    blank        empty values get `default` too, not just missing ones
+    updatable    False: PUT /api/update-client leaves the column alone
+    """
 
-        alter_queries = [
-            "ALTER TABLE clientappdetails MODIFY defaultLanguage VARCHAR(50) DEFAULT 'English';",
-            "ALTER TABLE clientappdetails MODIFY defaultDisplayLanguage VARCHAR(50) DEFAULT 'English';",
-            "ALTER TABLE clientappdetails MODIFY menuColor VARCHAR(50) DEFAULT '#141b4d';",
-            "ALTER TABLE clientappdetails MODIFY subMenuColor VARCHAR(50) DEFAULT '272f69';",
-            "ALTER TABLE clientappdetails MODIFY textColor VARCHAR(50) DEFAULT '#3d86ea';",
-            "ALTER TABLE clientappdetails MODIFY headerText VARCHAR(255) DEFAULT 'Zanitor';",
-            "ALTER TABLE clientappdetails MODIFY welcomeText VARCHAR(255) DEFAULT 'Welcome To Zanitor';",
-        ]
-
-        for q in alter_queries:
+    __slots__ = ("table", "name", "sql_type", "default", "db_default",
+                 "blank", "updatable", "kind", "length")
+
+    def __init__(self, name, sql_type, default, ddl_default=True,
+                 blank=False, updatable=True):
+        self.table = None  # set from CLIENT_FIELDS
+        self.name = name
+        self.sql_type = sql_type
+        self.default = default
+        self.db_default = default if ddl_default else None
+        self.blank = blank
+        self.updatable = updatable
+        self.kind, self.length, _ = split_type(sql_type)
+
+    def coerce(self, value):
+        """Check a value against the column type; returns what gets stored."""
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, float) and self.kind != "int":
+            # A fraction in a text column is an Excel date/time serial
+            # (or a typo), never a config value
+            raise ValueError("must be text, not a number")
+        if self.kind == "int":
+            if isinstance(value, bool):
+                raise ValueError("must be an integer")
             try:
-                cur.execute(q)
-            except:
-                pass
-
-        # TEXT columns can't have DEFAULT in MySQL → update empty/null rows
-        update_queries = [
-            (
-                "UPDATE clientappdetails SET welcomeBody=%s "
-                "WHERE (welcomeBody IS NULL OR welcomeBody='');",
-                (DEFAULT_WELCOME_BODY,),
-            ),
-            (
-                "UPDATE clientappdetails SET listOfLanguage=%s "
-                "WHERE (listOfLanguage IS NULL OR listOfLanguage='');",
-                (DEFAULT_LANG_LIST,),
-            ),
-            (
-                "UPDATE clientappdetails SET listOfDisplayLanguage=%s "
-                "WHERE (listOfDisplayLanguage IS NULL OR listOfDisplayLanguage='');",
-                (DEFAULT_DISPLAY_LIST,),
+                return int(str(value).strip())
+            except ValueError:
+                raise ValueError("must be an integer")
+        value = str(value)
+        if self.length and len(value) > self.length:
+            raise ValueError(f"longer than {self.length} characters")
+        return value
+
+
+# table -> fields, in column order; `id` is the primary key everywhere.
+CLIENT_FIELDS = {
+    "clientappdetails": [
+        Field("clientName", "VARCHAR(255) NOT NULL", "", ddl_default=False),
+        Field("defaultLanguage", "VARCHAR(50)", "English", blank=True),
+        Field("listOfLanguage", "TEXT", DEFAULT_LANG_LIST, ddl_default=False, blank=True),
+        Field("defaultDisplayLanguage", "VARCHAR(50)", "English", blank=True),
+        Field("listOfDisplayLanguage", "TEXT", DEFAULT_DISPLAY_LIST, ddl_default=False, blank=True),
+        Field("headerLogo", "VARCHAR(255)", DEFAULT_HEADER_LOGO, ddl_default=False),
+        Field("footerLogo", "VARCHAR(255)", "", ddl_default=False, updatable=False),
+        Field("poweredByLogo", "VARCHAR(255)", DEFAULT_POWERED_BY_LOGO, ddl_default=False),
+        Field("menuColor", "VARCHAR(50)", "#141b4d", blank=True),
+        Field("subMenuColor", "VARCHAR(50)", "272f69", blank=True),
+        Field("textColor", "VARCHAR(50)", "#3d86ea", blank=True),
+        Field("mobileHeaderColor", "VARCHAR(50)", "", ddl_default=False),
+        Field("mobileMenuBgColor", "VARCHAR(50)", "", ddl_default=False),
+        Field("headerText", "VARCHAR(255)", "Zanitor", blank=True),
+        Field("welcomeText", "VARCHAR(255)", "Welcome To Zanitor", blank=True),
+        Field("welcomeBody", "TEXT", DEFAULT_WELCOME_BODY, ddl_default=False, blank=True),
+        Field("productLogo", "VARCHAR(255)", DEFAULT_PRODUCT_LOGO, ddl_default=False),
+        Field("homeBgColor", "VARCHAR(50)", "#f1fdff", ddl_default=False),
+        Field("homeLauncherLogo", "VARCHAR(255)", "", ddl_default=False),
+    ],
+    "client_details": [
+        Field("clientName", "VARCHAR(255) NOT NULL", "", ddl_default=False),
+        Field("baseClient", "VARCHAR(100)", "", ddl_default=False),
+        Field("dbName", "VARCHAR(100)", "", ddl_default=False),
+        Field("medianFlag", "INT", 0, updatable=False),
+        Field("stateMaintainHours", "INT", 24, updatable=False),
+        Field("recentAlertHours", "INT", 6, updatable=False),
+        Field("notificationListHours", "INT", 24, updatable=False),
+        Field("trashEnabled", "VARCHAR(45)", "True", updatable=False),
+        Field("paperEnabled", "VARCHAR(45)", "True", updatable=False),
+        Field("hvacEnabled", "VARCHAR(45)", "False", updatable=False),
+        Field("waterFlowEnabled", "VARCHAR(45)", "True", updatable=False),
+        Field("feedbackEnabled", "VARCHAR(45)", "True", updatable=False),
+        Field("analyticsWeekEndRestrictionFlag", "VARCHAR(45)", "True", updatable=False),
+        Field("trafficSensor", "VARCHAR(45)", "PeopleCount", updatable=False),
+        Field("appViewType", "INT", 1, updatable=False),
+        Field("soapDispenserEnabled", "VARCHAR(45)", "True"),
+        Field("airFreshenerEnabled", "VARCHAR(45)", "False"),
+        Field("cleanIndexEnabled", "VARCHAR(45)", "True"),
+        Field("heatMapEnabled", "VARCHAR(45)", "False"),
+        Field("schedulerEnabled", "VARCHAR(45)", "False"),
+        Field("peopleCountEnabled", "VARCHAR(45)", "True"),
+        Field("typicalHighValue", "INT", 5),
+        Field("cleaningThreshold", "INT", 50),
+        Field("feedbackAlertConfig", "VARCHAR(45)", "0,1"),
+        Field("beaconTimeInterval", "INT", 2),
+        Field("soapShots", "INT", 1000),
+        Field("pumpPercentage", "INT", 75),
+        Field("soapPredictionIsEnabled", "VARCHAR(45)", "False"),
+        Field("labelFlag", "VARCHAR(45)", "3"),
+        Field("weatherEnabled", "VARCHAR(45)", "False"),
+        Field("language", "VARCHAR(45)", "English"),
+        Field("occupancyDurationLimit", "INT", 10),
+        Field("passwordRotationInterval", "INT", 0),
+        Field("mfaFlag", "INT", 0),
+        Field("pageReloadInterval", "INT", 60),
+        Field("inspectionType", "INT", 1),
+        Field("defaultGradingflag", "INT", 1),
+        Field("commentsLimit", "INT", 100),
+        Field("janitorScheduleFlag", "INT", 0),
+        Field("publisherType", "VARCHAR(45)", "mqtt"),
+        Field("availableSensors", "VARCHAR(255)", ""),
+        Field("feedbackType", "INT", 2),
+        Field("feedbackAlertOrder", "INT", 4),
+        Field("feedbackDefaultTimeout", "INT", 20),
+        Field("overViewStartTime", "VARCHAR(20)", "12:00 AM"),
+        Field("cannedChartPeriod", "INT", 60),
+        Field("dataPostingType", "VARCHAR(45)", ""),
+    ],
+    "notificationconfiguration": [
+        Field("clientName", "VARCHAR(255) NOT NULL", "", ddl_default=False),
+        Field("push", "VARCHAR(10)", "True"),
+        Field("timeRestriction", "VARCHAR(50)", "11:59 PM-12:01 AM", updatable=False),
+        Field("weekendRestriction", "INT", 0, updatable=False),
+        Field("alertInterval", "INT", 0, updatable=False),
+        Field("janitorIssueInterval", "VARCHAR(10)", "0,1", updatable=False),
+        Field("maintenanceIssueInterval", "VARCHAR(10)", "0,1", updatable=False),
+        Field("feedbackDuplicateFilterInterval", "INT", 0, updatable=False),
+        Field("feedbackFilterCount", "INT", 4, updatable=False),
+        Field("deviceEmailFlag", "VARCHAR(10)", "0,0", updatable=False),
+        Field("feedbackCombinedFlag", "VARCHAR(10)", "True", updatable=False),
+        Field("feedbackEmailFlag", "VARCHAR(10)", "0,0", updatable=False),
+        Field("feedbackTextFlag", "INT", 0, updatable=False),
+        Field("deviceTextFlag", "INT", 0, updatable=False),
+        Field("qrJanitorpush", "VARCHAR(10)", "True", updatable=False),
+        Field("qrJanitorTextFlag", "INT", 0, updatable=False),
+        Field("qrJanitorEmailFlag", "INT", 0, updatable=False),
+        Field("openAreaTrafficFlag", "INT", 3, updatable=False),
+        Field("escalationType", "INT", 0, updatable=False),
+        Field("escalationLevel1Interval", "INT", 0, updatable=False),
+        Field("escalationLevel2Interval", "INT", 0, updatable=False),
+        Field("notCleanEscalationInterval", "INT", 0, updatable=False),
+        Field("cleaningScheduleFlag", "VARCHAR(10)", "False", updatable=False),
+        Field("deviceDataTimeInterval", "VARCHAR(500)", "45", ddl_default=False),
+        Field("toiletPaperThreshold", "VARCHAR(400)", "15", ddl_default=False),
+        Field("paperTowelThreshold", "VARCHAR(200)", "15", ddl_default=False),
+        Field("trashThreshold", "VARCHAR(400)", "75", ddl_default=False),
+        Field("areaAlertThreshold", "VARCHAR(300)", "0", ddl_default=False),
+        Field("trafficAlert", "VARCHAR(10)", "True", updatable=False),
+        Field("dispatchedInterval", "INT", 0),
+    ],
+}
+
+CLIENT_TABLES = tuple(CLIENT_FIELDS)
+
+for _table, _fields in CLIENT_FIELDS.items():
+    for _field in _fields:
+        _field.table = _table
+
+# field name -> Field. clientName is declared in every table; the
+# declarations are identical, so any of them will do.
+FIELDS_BY_NAME = {
+    field.name: field
+    for table in reversed(CLIENT_TABLES)
+    for field in CLIENT_FIELDS[table]
+}
+
+# field -> tables it lives in (clientName is in all three)
+CLIENT_FIELD_TABLES = {
+    name: [table for table in CLIENT_TABLES
+           if any(f.name == name for f in CLIENT_FIELDS[table])]
+    for name in FIELDS_BY_NAME
+}
+
+# Columns the read/export endpoints add that writes have no use for
+CLIENT_IGNORED_FIELDS = {"id", "clientId"}
+
+# table -> [(column, type, default)]. The schema planner diffs this
+# against INFORMATION_SCHEMA.
+DESIRED_COLUMNS = {
+    table: [(f.name, f.sql_type, f.db_default) for f in fields]
+    for table, fields in CLIENT_FIELDS.items()
+}
+
+CREATE_TABLE_SQL = {
+    table: "CREATE TABLE IF NOT EXISTS `{}` (\n    {}\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4".format(
+        table,
+        ",\n    ".join(
+            ["id INT AUTO_INCREMENT PRIMARY KEY"]
+            + [f"`{f.name}` {column_definition(f.sql_type, f.db_default)}" for f in fields]
+        ),
+    )
+    for table, fields in CLIENT_FIELDS.items()
+}
+
+# What /api/client-defaults hands the AddClient page, per table
+CLIENT_DETAILS_DEFAULTS = {f.name: f.default for f in CLIENT_FIELDS["client_details"]}
+CLIENT_APPDETAILS_DEFAULTS = {
+    f.name: f.default for f in CLIENT_FIELDS["clientappdetails"] if f.name != "clientName"
+}
+NOTIFICATION_CONFIG_DEFAULTS = {
+    f.name: f.default for f in CLIENT_FIELDS["notificationconfiguration"] if f.name != "clientName"
+}
+CLIENT_FIELD_DEFAULTS = {name: f.default for name, f in FIELDS_BY_NAME.items()}
+
+# INSERT per table: every column. INSERT_PARAMS[table](values) pulls the
+# parameters out of a client_values() dict in column order.
+INSERT_SQL = {}
+INSERT_PARAMS = {}
+# PUT /api/update-client per table: the updatable columns.
+# clientappdetails is keyed by id, the other two by clientName.
+UPDATE_SQL = {}
+UPDATE_PARAMS = {}
+for _table, _fields in CLIENT_FIELDS.items():
+    _columns = [f.name for f in _fields]
+    INSERT_SQL[_table] = "INSERT INTO `{}` ({}) VALUES ({})".format(
+        _table, ", ".join(f"`{c}`" for c in _columns), ", ".join(["%s"] * len(_columns))
+    )
+    INSERT_PARAMS[_table] = itemgetter(*_columns)
+
+    _key = "id" if _table == "clientappdetails" else "clientName"
+    _columns = [f.name for f in _fields if f.updatable and f.name != _key]
+    UPDATE_SQL[_table] = "UPDATE `{}` SET {} WHERE {}=%s".format(
+        _table, ", ".join(f"`{c}`=%s" for c in _columns), _key
+    )
+    UPDATE_PARAMS[_table] = itemgetter(*_columns)
+
+
+def client_values(data):
+    """
+    Request body -> ({field: value} for every field, errors), in one pass
+    over the registry. Missing or null fields (and empty ones for `blank`
+    fields) get their default; everything else is coerced to its column
+    type. Unknown keys are ignored. clientName, baseClient and dbName are
+    trimmed, and dbName falls back to baseClient.
+    """
+    values = {}
+    errors = []
+    for name, field in FIELDS_BY_NAME.items():
+        value = data.get(name)
+        if value is None or (field.blank and not value):
+            values[name] = field.default
+            continue
+        try:
+            values[name] = field.coerce(value)
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+            values[name] = field.default
+
+    for name in ("clientName", "baseClient", "dbName"):
+        values[name] = values[name].strip()
+    if not data.get("dbName"):
+        values["dbName"] = values["baseClient"]
+    return values, errors
+
+
+def ensure_users_table(cur):
+    """Create minimal users table required by auth routes."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(255) NOT NULL UNIQUE,
+            email VARCHAR(255) NOT NULL UNIQUE,
+            password_hash VARCHAR(255) NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """
+    )
+
+
+# (generated column, source column, index). Logins compare against
+# these instead of LOWER(username)/LOWER(email), which no index can serve.
+USERS_LOGIN_COLUMNS = [
+    ("username_lc", "username", "idx_users_username_lc"),
+    ("email_lc", "email", "idx_users_email_lc"),
+]
+
+
+def add_users_login_columns(cur):
+    """
+    Add VIRTUAL lower-cased copies of username and email to users, each
+    with a secondary index. Skips whatever is already there.
+    """
+    ensure_users_table(cur)
+    schema = TEST_DB["database"]
+    cur.execute(
+        "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+        "WHERE TABLE_SCHEMA=%s AND TABLE_NAME='users'",
+        (schema,),
+    )
+    present = {row[0] for row in cur.fetchall()}
+
+    clauses = []
+    for column, source, index in USERS_LOGIN_COLUMNS:
+        if column not in present:
+            clauses.append(
+                f"ADD COLUMN `{column}` VARCHAR(255) "
+                f"GENERATED ALWAYS AS (LOWER(`{source}`)) VIRTUAL"
+            )
+        if column not in present or not has_leading_index(cur, schema, "users", column):
+            clauses.append(f"ADD INDEX `{index}` (`{column}`)")
+    if clauses:
+        cur.execute("ALTER TABLE users " + ", ".join(clauses))
+
+
+def backfill_text_defaults(cur):
+    """TEXT columns can't have DEFAULT in MySQL → update empty/null rows."""
+    update_queries = [
+        (
+            "UPDATE clientappdetails SET welcomeBody=%s "
+            "WHERE (welcomeBody IS NULL OR welcomeBody='');",
+            (DEFAULT_WELCOME_BODY,),
+        ),
+        (
+            "UPDATE clientappdetails SET listOfLanguage=%s "
+            "WHERE (listOfLanguage IS NULL OR listOfLanguage='');",
+            (DEFAULT_LANG_LIST,),
+        ),
+        (
+            "UPDATE clientappdetails SET listOfDisplayLanguage=%s "
+            "WHERE (listOfDisplayLanguage IS NULL OR listOfDisplayLanguage='');",
+            (DEFAULT_DISPLAY_LIST,),
+        ),
+    ]
+    for q, params in update_queries:
+        cur.execute(q, params)
+
+
+# ======================================================================
+#  SCHEMA PLANNER
+# ======================================================================
+
+# Cheapest first. INSTANT only touches the data dictionary, INPLACE with
+# LOCK=NONE rebuilds while allowing reads and writes, COPY blocks writes.
+ALTER_ALGORITHMS = [
+    ("INSTANT", None, "metadata only, no table rebuild"),
+    ("INPLACE", "NONE", "in-place, concurrent reads and writes allowed"),
+    ("COPY", "SHARED", "table copy, writes blocked for the duration"),
+]
+
+
+def live_default(value):
+    """Normalize COLUMN_DEFAULT across MySQL/MariaDB (MariaDB quotes strings)."""
+    if value is None or value == "NULL":
+        return None
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    return value
+
+
+def varchar_length_bytes(length):
+    # utf8mb4: up to 4 bytes per char; >255 bytes needs a 2-byte length prefix
+    return 1 if length * 4 <= 255 else 2
+
+
+def read_live_columns(cur, schema, tables):
+    """{table: {column: (COLUMN_TYPE, COLUMN_DEFAULT)}} in one query."""
+    placeholders = ",".join(["%s"] * len(tables))
+    cur.execute(
+        f"""
+        SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLUMN_DEFAULT
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA=%s AND TABLE_NAME IN ({placeholders})
+        """,
+        (schema, *tables),
+    )
+    live = {table: {} for table in tables}
+    for table, column, column_type, default in cur.fetchall():
+        live[table][column] = (column_type, default)
+    return live
+
+
+def diff_column(column, column_type, default, live):
+    """
+    Compare one desired column with its live definition. Returns
+    (kind, clause, algorithm index) or None, or ("skip", reason, None)
+    for differences the planner won't apply automatically.
+    """
+    if live is None:
+        return ("add", f"ADD COLUMN `{column}` {column_definition(column_type, default)}", 0)
+
+    live_type, live_dflt = live
+    want_name, want_len, _ = split_type(column_type)
+    have_name, have_len, _ = split_type(live_type)
+
+    if (want_name, want_len) != (have_name, have_len):
+        # Only lossless changes: widen a VARCHAR, or INT -> VARCHAR
+        if want_name == "varchar" and have_name == "varchar" and want_len > have_len:
+            same_prefix = varchar_length_bytes(want_len) == varchar_length_bytes(have_len)
+            algo = 1 if same_prefix else 2
+        elif want_name == "varchar" and have_name in ("int", "tinyint", "smallint", "bigint"):
+            algo = 2
+        elif want_name == "int" and have_name == "int":
+            algo = None  # display width only (int(11) vs int)
+        else:
+            return ("skip", f"{column}: live {live_type}, wanted {column_type.lower()}", None)
+        if algo is not None:
+            return ("modify", f"MODIFY `{column}` {column_definition(column_type, default)}", algo)
+
+    want_dflt = None if default is None else str(default)
+    if live_default(live_dflt) != want_dflt:
+        if default is None:
+            return ("default", f"ALTER COLUMN `{column}` DROP DEFAULT", 0)
+        return ("default", f"ALTER COLUMN `{column}` SET DEFAULT {sql_literal(default)}", 0)
+    return None
+
+
+def plan_schema(cur, tables=None, kinds=None):
+    """
+    Diff DESIRED_COLUMNS against the live schema and return one plan
+    entry per table that needs changes:
+
+        {"table", "changes", "skipped", "algorithm", "lock", "effect", "sql"}
+
+    `kinds` limits the plan to some of "add", "default", "modify".
+    """
+    schema = TEST_DB["database"]
+    tables = list(tables or DESIRED_COLUMNS)
+    live = read_live_columns(cur, schema, tables)
+
+    plan = []
+    for table in tables:
+        if not live[table]:
+            continue  # not created yet; create_config_tables() owns that
+        changes, skipped, worst = [], [], 0
+        for column, column_type, default in DESIRED_COLUMNS[table]:
+            result = diff_column(column, column_type, default, live[table].get(column))
+            if result is None:
+                continue
+            kind, clause, algo = result
+            if kind == "skip":
+                skipped.append(clause)
+            elif kinds is None or kind in kinds:
+                changes.append(clause)
+                worst = max(worst, algo)
+        if not changes and not skipped:
+            continue
+
+        algorithm, lock, effect = ALTER_ALGORITHMS[worst]
+        options = f"ALGORITHM={algorithm}" + (f", LOCK={lock}" if lock else "")
+        plan.append({
+            "table": table,
+            "changes": changes,
+            "skipped": skipped,
+            "algorithm": algorithm,
+            "lock": lock,
+            "effect": effect,
+            "sql": (
+                f"ALTER TABLE `{table}`\n    " + ",\n    ".join(changes + [options])
+                if changes else None
             ),
-        ]
+        })
+    return plan
 
-        for q, params in update_queries:
+
+def apply_schema_plan(cur, plan):
+    """
+    Run each table's combined ALTER. If the server can't honour the
+    requested algorithm (older MySQL, or a change it must rebuild for)
+    fall back to the next one, ending with the server's own choice.
+    """
+    for entry in plan:
+        for note in entry["skipped"]:
+            print(f"⚠ {entry['table']}: not changed automatically: {note}")
+        if not entry["changes"]:
+            continue
+
+        start = [a for a, _, _ in ALTER_ALGORITHMS].index(entry["algorithm"])
+        attempts = [
+            f"ALGORITHM={a}" + (f", LOCK={l}" if l else "")
+            for a, l, _ in ALTER_ALGORITHMS[start:]
+        ] + [None]
+        body = f"ALTER TABLE `{entry['table']}` " + ", ".join(entry["changes"])
+
+        for options in attempts:
+            stmt = body + (f", {options}" if options else "")
+            started = time.perf_counter()
             try:
-                cur.execute(q, params)
-            except:
-                pass
+                cur.execute(stmt)
+            except mysql.connector.Error as e:
+                if options and e.errno in (
+                    ER_PARSE_ERROR,
+                    ER_ALTER_OPERATION_NOT_SUPPORTED,
+                    ER_ALTER_OPERATION_NOT_SUPPORTED_REASON,
+                ):
+                    print(f"⚠ {entry['table']}: {options} refused ({e.msg}), retrying")
+                    continue
+                raise
+            print(
+                f"✔ {entry['table']}: {len(entry['changes'])} change(s) "
+                f"[{options or 'server default'}] in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+            break
 
-        db.commit()
-        db.close()
-        print("✔ clientappdetails defaults applied")
 
-    except Exception as e:
-        traceback.print_exc()
-        print("Error in alter_clientappdetails_defaults:", str(e))
+def sync_columns(cur, tables=None, kinds=None):
+    apply_schema_plan(cur, plan_schema(cur, tables, kinds))
 
 
-def alter_client_details_defaults():
-    """Apply defaults to client_details (SAFE)."""
-    try:
-        db = connect()
-        cur = db.cursor()
+def print_schema_plan(plan):
+    if not plan:
+        print("✔ schema matches DESIRED_COLUMNS, nothing to do")
+    for entry in plan:
+        print(f"-- {entry['table']}: {len(entry['changes'])} change(s)")
+        if entry["sql"]:
+            print(f"-- expected: ALGORITHM={entry['algorithm']}"
+                  f"{', LOCK=' + entry['lock'] if entry['lock'] else ''} ({entry['effect']})")
+            print(entry["sql"] + ";")
+        for note in entry["skipped"]:
+            print(f"-- skipped: {note}")
+        print()
 
-        alter_queries = [
-            "ALTER TABLE client_details MODIFY medianFlag INT DEFAULT 0;",
-            "ALTER TABLE client_details MODIFY stateMaintainHours INT DEFAULT 24;",
-            "ALTER TABLE client_details MODIFY recentAlertHours INT DEFAULT 6;",
-            "ALTER TABLE client_details MODIFY notificationListHours INT DEFAULT 24;",
-            "ALTER TABLE client_details MODIFY trashEnabled VARCHAR(45) DEFAULT 'True';",
-            "ALTER TABLE client_details MODIFY paperEnabled VARCHAR(45) DEFAULT 'True';",
-            "ALTER TABLE client_details MODIFY hvacEnabled VARCHAR(45) DEFAULT 'False';",
-            "ALTER TABLE client_details MODIFY waterFlowEnabled VARCHAR(45) DEFAULT 'True';",
-            "ALTER TABLE client_details MODIFY feedbackEnabled VARCHAR(45) DEFAULT 'True';",
-            "ALTER TABLE client_details MODIFY analyticsWeekEndRestrictionFlag VARCHAR(45) DEFAULT 'True';",
-            "ALTER TABLE client_details MODIFY trafficSensor VARCHAR(45) DEFAULT 'PeopleCount';",
-            "ALTER TABLE client_details MODIFY appViewType INT DEFAULT 1;",
-        ]
-
-        for q in alter_queries:
-            try:
-                cur.execute(q)
-            except:
-                pass
 
-        db.commit()
+@app.cli.command("plan-schema")
+@click.option("--apply", is_flag=True, help="Run the plan instead of printing it.")
+def plan_schema_command(apply):
+    """Diff the config tables against DESIRED_COLUMNS (dry run by default)."""
+    db = connect()
+    cur = db.cursor()
+    try:
+        plan = plan_schema(cur)
+        print_schema_plan(plan)
+        if apply:
+            apply_schema_plan(cur, plan)
+            db.commit()
+    finally:
+        cur.close()
         db.close()
-        print("✔ client_details defaults applied")
 
-    except Exception:
-        traceback.print_exc()
 
+# ======================================================================
+#  AUTO-CREATE TABLES WITH DEFAULTS
+# ======================================================================
 
-def alter_notification_defaults():
-    """Apply defaults to notificationconfiguration table."""
-    try:
-        db = connect()
-        cur = db.cursor()
+def create_config_tables(cur):
+    # clientappdetails, client_details, notificationconfiguration:
+    # generated from CLIENT_FIELDS
+    for table in CLIENT_TABLES:
+        cur.execute(CREATE_TABLE_SQL[table])
 
-        alter_queries = [
-            "ALTER TABLE notificationconfiguration MODIFY timeRestriction VARCHAR(50) DEFAULT '11:59 PM-12:01 AM';",
-            "ALTER TABLE notificationconfiguration MODIFY weekendRestriction INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY alertInterval INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY janitorIssueInterval VARCHAR(10) DEFAULT '0,1';",
-            "ALTER TABLE notificationconfiguration MODIFY maintenanceIssueInterval VARCHAR(10) DEFAULT '0,1';",
-            "ALTER TABLE notificationconfiguration MODIFY feedbackDuplicateFilterInterval INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY feedbackFilterCount INT DEFAULT 4;",
-            "ALTER TABLE notificationconfiguration MODIFY deviceEmailFlag VARCHAR(10) DEFAULT '0,0';",
-            "ALTER TABLE notificationconfiguration MODIFY feedbackCombinedFlag VARCHAR(10) DEFAULT 'True';",
-            "ALTER TABLE notificationconfiguration MODIFY feedbackEmailFlag VARCHAR(10) DEFAULT '0,0';",
-            "ALTER TABLE notificationconfiguration MODIFY feedbackTextFlag INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY deviceTextFlag INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY qrJanitorpush VARCHAR(10) DEFAULT 'True';",
-            "ALTER TABLE notificationconfiguration MODIFY qrJanitorTextFlag INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY qrJanitorEmailFlag INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY openAreaTrafficFlag INT DEFAULT 3;",
-            "ALTER TABLE notificationconfiguration MODIFY escalationType INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY escalationLevel1Interval INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY escalationLevel2Interval INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY notCleanEscalationInterval INT DEFAULT 0;",
-            "ALTER TABLE notificationconfiguration MODIFY cleaningScheduleFlag VARCHAR(10) DEFAULT 'False';",
-            "ALTER TABLE notificationconfiguration MODIFY trafficAlert VARCHAR(10) DEFAULT 'True';",
-        ]
-
-        for q in alter_queries:
-            try:
-                cur.execute(q)
-            except:
-                pass
+    # -----------------------------------------------------
+    # USERS TABLE (for auth routes)
+    # -----------------------------------------------------
+    ensure_users_table(cur)
 
-        db.commit()
-        db.close()
-        print("✔ notificationconfiguration defaults applied")
 
-    except Exception:
-        traceback.print_exc()
+def add_missing_columns(cur):
+    """Ensure older databases pick up newly added columns."""
+    sync_columns(cur, kinds=("add",))
 
 
-def alter_notification_numeric_columns_to_varchar():
+def apply_column_defaults(cur):
+    sync_columns(cur, kinds=("default",))
+    backfill_text_defaults(cur)
+
+
+def widen_threshold_columns(cur):
     """
-    Fix type of your 5 new columns so text input does NOT cause
+    Fix type of the 5 threshold columns so text input does NOT cause
     'Incorrect integer value' errors.
     """
-    try:
-        db = connect()
-        cur = db.cursor()
+    sync_columns(cur, tables=("notificationconfiguration",), kinds=("modify",))
 
-        alter_queries = [
-            "ALTER TABLE notificationconfiguration "
-            "MODIFY deviceDataTimeInterval VARCHAR(500);",
-            "ALTER TABLE notificationconfiguration "
-            "MODIFY toiletPaperThreshold VARCHAR(400);",
-            "ALTER TABLE notificationconfiguration "
-            "MODIFY paperTowelThreshold VARCHAR(200);",
-            "ALTER TABLE notificationconfiguration "
-            "MODIFY trashThreshold VARCHAR(400);",
-            "ALTER TABLE notificationconfiguration "
-            "MODIFY areaAlertThreshold VARCHAR(300);",
-        ]
-
-        for q in alter_queries:
-            try:
-                cur.execute(q)
-            except:
-                # ignore if column doesn't exist / already VARCHAR
-                pass
 
-        db.commit()
-        db.close()
-        print("✔ notificationconfiguration numeric columns converted to VARCHAR")
-    except Exception:
-        traceback.print_exc()
+# ======================================================================
+#  INDEXES
+# ======================================================================
 
+# Client-side: the statement outlived the socket timeout or the link dropped
+CR_SERVER_LOST = 2013
+CR_SERVER_LOST_EXTENDED = 2055
+INDEX_TIMEOUT_ERRNOS = (ER_QUERY_TIMEOUT, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED)
+
+# (table, index name, column) on the config DB. Every list/detail route
+# and the update/delete paths join or filter on clientName.
+CONFIG_INDEXES = [
+    ("clientappdetails", "idx_clientappdetails_clientName", "clientName"),
+    ("client_details", "idx_client_details_clientName", "clientName"),
+    ("notificationconfiguration", "idx_notificationconfiguration_clientName", "clientName"),
+]
+
+
+def has_leading_index(cur, schema, table, column):
+    """True if some index on schema.table starts with column."""
+    cur.execute(
+        """
+        SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA=%s AND TABLE_NAME=%s
+          AND COLUMN_NAME=%s AND SEQ_IN_INDEX=1
+        LIMIT 1
+        """,
+        (schema, table, column),
+    )
+    return cur.fetchone() is not None
 
-def ensure_users_table():
-    """Create minimal users table required by auth routes."""
+
+def table_exists(cur, schema, table):
+    cur.execute(
+        "SELECT 1 FROM INFORMATION_SCHEMA.TABLES "
+        "WHERE TABLE_SCHEMA=%s AND TABLE_NAME=%s LIMIT 1",
+        (schema, table),
+    )
+    return cur.fetchone() is not None
+
+
+def ensure_index(cur, schema, table, name, column, report):
+    """Add a secondary index on column unless one already leads with it."""
+    qualified = f"`{schema}`.`{table}`"
+    if not table_exists(cur, schema, table):
+        report["missing_tables"].append(f"{schema}.{table}")
+        return
+    if has_leading_index(cur, schema, table, column):
+        report["existing"].append(f"{schema}.{table}({column})")
+        return
+
+    started = time.perf_counter()
     try:
-        db = connect()
-        cur = db.cursor()
         cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(255) NOT NULL UNIQUE,
-                email VARCHAR(255) NOT NULL UNIQUE,
-                password_hash VARCHAR(255) NOT NULL
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-            """
+            f"ALTER TABLE {qualified} ADD INDEX `{name}` (`{column}`), "
+            f"ALGORITHM=INPLACE, LOCK=NONE"
         )
-        db.commit()
-        db.close()
-        print("✔ users table ensured")
-    except Exception:
-        traceback.print_exc()
+    except mysql.connector.Error as e:
+        # An index by that name on another column: leave it alone
+        if e.errno != ER_DUP_KEYNAME:
+            raise
+        report["existing"].append(f"{schema}.{table}({column}) as {name}")
+        return
+    report["added"].append(
+        f"{schema}.{table}({column}) in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
 
 
-def ensure_clientappdetails_columns(cur):
-    """Add missing columns to clientappdetails without dropping data."""
-    columns = [
-        ("footerLogo", "ALTER TABLE clientappdetails ADD COLUMN footerLogo VARCHAR(255);"),
-    ]
-    for col, stmt in columns:
-        try:
-            cur.execute(stmt)
-        except Exception:
-            # ignore if column already exists
-            pass
+def ensure_config_indexes(cur):
+    """
+    Secondary indexes on the config DB join keys. Safe to run repeatedly.
+    Runs as migration 5: anything but "already there" propagates, so a
+    failed run is not recorded and is retried on the next start.
+    """
+    report = {"added": [], "existing": [], "missing_tables": []}
+    schema = TEST_DB["database"]
+    for table, name, column in CONFIG_INDEXES:
+        ensure_index(cur, schema, table, name, column, report)
+    print("✔ config indexes:", report)
+    return report
 
 
-def ensure_client_details_columns(cur):
-    """Add missing columns to client_details without dropping data."""
-    alter_statements = [
-        ("soapDispenserEnabled", "ALTER TABLE client_details ADD COLUMN soapDispenserEnabled VARCHAR(45) DEFAULT 'True';"),
-        ("airFreshenerEnabled", "ALTER TABLE client_details ADD COLUMN airFreshenerEnabled VARCHAR(45) DEFAULT 'False';"),
-        ("cleanIndexEnabled", "ALTER TABLE client_details ADD COLUMN cleanIndexEnabled VARCHAR(45) DEFAULT 'True';"),
-        ("heatMapEnabled", "ALTER TABLE client_details ADD COLUMN heatMapEnabled VARCHAR(45) DEFAULT 'False';"),
-        ("schedulerEnabled", "ALTER TABLE client_details ADD COLUMN schedulerEnabled VARCHAR(45) DEFAULT 'False';"),
-        ("peopleCountEnabled", "ALTER TABLE client_details ADD COLUMN peopleCountEnabled VARCHAR(45) DEFAULT 'True';"),
-        ("typicalHighValue", "ALTER TABLE client_details ADD COLUMN typicalHighValue INT DEFAULT 5;"),
-        ("cleaningThreshold", "ALTER TABLE client_details ADD COLUMN cleaningThreshold INT DEFAULT 50;"),
-        ("feedbackAlertConfig", "ALTER TABLE client_details ADD COLUMN feedbackAlertConfig VARCHAR(45) DEFAULT '0,1';"),
-        ("beaconTimeInterval", "ALTER TABLE client_details ADD COLUMN beaconTimeInterval INT DEFAULT 2;"),
-        ("soapShots", "ALTER TABLE client_details ADD COLUMN soapShots INT DEFAULT 1000;"),
-        ("pumpPercentage", "ALTER TABLE client_details ADD COLUMN pumpPercentage INT DEFAULT 75;"),
-        ("soapPredictionIsEnabled", "ALTER TABLE client_details ADD COLUMN soapPredictionIsEnabled VARCHAR(45) DEFAULT 'False';"),
-        ("labelFlag", "ALTER TABLE client_details ADD COLUMN labelFlag VARCHAR(45) DEFAULT '3';"),
-        ("weatherEnabled", "ALTER TABLE client_details ADD COLUMN weatherEnabled VARCHAR(45) DEFAULT 'False';"),
-        ("language", "ALTER TABLE client_details ADD COLUMN language VARCHAR(45) DEFAULT 'English';"),
-        ("occupancyDurationLimit", "ALTER TABLE client_details ADD COLUMN occupancyDurationLimit INT DEFAULT 10;"),
-        ("passwordRotationInterval", "ALTER TABLE client_details ADD COLUMN passwordRotationInterval INT DEFAULT 0;"),
-        ("mfaFlag", "ALTER TABLE client_details ADD COLUMN mfaFlag INT DEFAULT 0;"),
-        ("pageReloadInterval", "ALTER TABLE client_details ADD COLUMN pageReloadInterval INT DEFAULT 60;"),
-        ("inspectionType", "ALTER TABLE client_details ADD COLUMN inspectionType INT DEFAULT 1;"),
-        ("defaultGradingflag", "ALTER TABLE client_details ADD COLUMN defaultGradingflag INT DEFAULT 1;"),
-        ("commentsLimit", "ALTER TABLE client_details ADD COLUMN commentsLimit INT DEFAULT 100;"),
-        ("janitorScheduleFlag", "ALTER TABLE client_details ADD COLUMN janitorScheduleFlag INT DEFAULT 0;"),
-        ("publisherType", "ALTER TABLE client_details ADD COLUMN publisherType VARCHAR(45) DEFAULT 'mqtt';"),
-        ("availableSensors", "ALTER TABLE client_details ADD COLUMN availableSensors VARCHAR(255) DEFAULT '';"),
-        ("feedbackType", "ALTER TABLE client_details ADD COLUMN feedbackType INT DEFAULT 2;"),
-        ("feedbackAlertOrder", "ALTER TABLE client_details ADD COLUMN feedbackAlertOrder INT DEFAULT 4;"),
-        ("feedbackDefaultTimeout", "ALTER TABLE client_details ADD COLUMN feedbackDefaultTimeout INT DEFAULT 20;"),
-        ("overViewStartTime", "ALTER TABLE client_details ADD COLUMN overViewStartTime VARCHAR(20) DEFAULT '12:00 AM';"),
-        ("cannedChartPeriod", "ALTER TABLE client_details ADD COLUMN cannedChartPeriod INT DEFAULT 60;"),
-        ("dataPostingType", "ALTER TABLE client_details ADD COLUMN dataPostingType VARCHAR(45) DEFAULT '';"),
-    ]
-    for col, stmt in alter_statements:
-        try:
-            cur.execute(stmt)
-        except Exception as e:
-            # Ignore errors for columns that already exist
-            if "Duplicate column name" not in str(e):
-                pass
-
-
-def ensure_notification_threshold_columns(cur):
-    """Add missing threshold columns to notificationconfiguration safely."""
-    statements = [
-        "ALTER TABLE notificationconfiguration ADD COLUMN deviceDataTimeInterval VARCHAR(500);",
-        "ALTER TABLE notificationconfiguration ADD COLUMN toiletPaperThreshold VARCHAR(400);",
-        "ALTER TABLE notificationconfiguration ADD COLUMN paperTowelThreshold VARCHAR(200);",
-        "ALTER TABLE notificationconfiguration ADD COLUMN trashThreshold VARCHAR(400);",
-        "ALTER TABLE notificationconfiguration ADD COLUMN areaAlertThreshold VARCHAR(300);",
-    ]
-    for stmt in statements:
-        try:
-            cur.execute(stmt)
-        except Exception:
-            # ignore if column already exists
-            pass
+def uses_backward_index_scan(cur, schema, table, column):
+    """
+    EXPLAIN the freshness probe shape and check it is served from an
+    index read backwards (no filesort).
+    """
+    cur.execute(
+        f"EXPLAIN SELECT `{column}` FROM `{schema}`.`{table}` "
+        f"ORDER BY `{column}` DESC LIMIT 1"
+    )
+    plan = cur.fetchone()
+    names = [d[0] for d in cur.description]
+    plan = dict(zip(names, plan)) if plan else {}
+    extra = str(plan.get("Extra") or "")
+    return bool(plan.get("key")) and "filesort" not in extra.lower()
+
 
+def ensure_freshness_indexes(year=None, month=None):
+    """
+    Make sure every freshness source table has an index on its timestamp
+    column, then verify each probe can use a backward index scan.
+    Flight tables are checked for the given (default: current) month.
+    A table whose build times out is reported and the run moves on with
+    a fresh connection; the server may still finish that index.
+    """
+    year = year or time.strftime("%Y")
+    month = month or time.strftime("%m")
+    report = {"added": [], "existing": [], "missing_tables": [],
+              "backward_scan": [], "filesort": [], "denied": [], "timed_out": []}
 
-def ensure_notification_extra_columns(cur):
-    """Add missing columns to notificationconfiguration without dropping data."""
+    conn = connect_index_builder()
     try:
-        cur.execute("ALTER TABLE notificationconfiguration ADD COLUMN dispatchedInterval INT DEFAULT 0;")
-    except Exception:
-        pass
+        cur = conn.cursor()
+        for db_name, sources in freshness_registry.get().items():
+            for kind, table, ts_col in sources:
+                schema, table = table.format(db=db_name, year=year, month=month).split(".", 1)
+                name = f"idx_{table}_{ts_col}"[:64]
+                try:
+                    ensure_index(cur, schema, table, name, ts_col, report)
+                    if f"{schema}.{table}" in report["missing_tables"]:
+                        continue
+                    key = "backward_scan" if uses_backward_index_scan(
+                        cur, schema, table, ts_col
+                    ) else "filesort"
+                    report[key].append(f"{schema}.{table}({ts_col})")
+                except mysql.connector.Error as e:
+                    # Expected per table on the dashboard hosts: dropped
+                    # between the check and the ALTER, no ALTER grant, or
+                    # a build that outlived INDEX_BUILD_READ_TIMEOUT
+                    if e.errno == ER_NO_SUCH_TABLE:
+                        report["missing_tables"].append(f"{schema}.{table}")
+                    elif e.errno == ER_TABLEACCESS_DENIED_ERROR:
+                        report["denied"].append(f"{schema}.{table}({ts_col})")
+                    elif e.errno in INDEX_TIMEOUT_ERRNOS:
+                        print(f"⚠ index on {schema}.{table}({ts_col}) timed out:", e)
+                        report["timed_out"].append(f"{schema}.{table}({ts_col})")
+                        conn.close()
+                        conn = connect_index_builder()
+                        cur = conn.cursor()
+                    else:
+                        raise
+        cur.close()
+    finally:
+        conn.close()
+
+    print("✔ freshness indexes:", report)
+    return report
+
+
+@app.cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Create missing config and freshness indexes and print what changed."""
+    db = connect()
+    cur = db.cursor()
+    ensure_config_indexes(cur)
+    cur.close()
+    db.close()
+    ensure_freshness_indexes()
 
 
 # ======================================================================
-#  AUTO-CREATE TABLES WITH DEFAULTS
+#  SCHEMA MIGRATIONS
 # ======================================================================
 
-def init_db():
+# (version, description, step). Steps run in order on one connection and
+# each is recorded in schema_version once it succeeds. Append new steps
+# at the end; never renumber.
+MIGRATIONS = [
+    (1, "create config and users tables", create_config_tables),
+    (2, "add columns introduced after the first release", add_missing_columns),
+    (3, "column defaults and TEXT backfills", apply_column_defaults),
+    (4, "notificationconfiguration thresholds to VARCHAR", widen_threshold_columns),
+    (5, "clientName indexes", ensure_config_indexes),
+    (6, "indexed lower-case username/email on users", add_users_login_columns),
+]
+
+
+def get_schema_version(cur):
+    """Current schema version; creates schema_version on first run."""
     try:
-        db = connect()
-        cur = db.cursor()
+        cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cur.fetchone()[0]
+    except mysql.connector.Error as e:
+        if e.errno != ER_NO_SUCH_TABLE:
+            raise
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT NOT NULL PRIMARY KEY,
+            description VARCHAR(255),
+            duration_ms INT,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """
+    )
+    return 0
 
-        # -----------------------------------------------------
-        # CLIENTAPPDETAILS TABLE
-        # -----------------------------------------------------
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS clientappdetails (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                clientName VARCHAR(255) NOT NULL,
-                defaultLanguage VARCHAR(50) DEFAULT 'English',
-                listOfLanguage TEXT,
-                defaultDisplayLanguage VARCHAR(50) DEFAULT 'English',
-                listOfDisplayLanguage TEXT,
-                headerLogo VARCHAR(255),
-                footerLogo VARCHAR(255),
-                poweredByLogo VARCHAR(255),
-                menuColor VARCHAR(50) DEFAULT '#141b4d',
-                subMenuColor VARCHAR(50) DEFAULT '272f69',
-                textColor VARCHAR(50) DEFAULT '#3d86ea',
-                mobileHeaderColor VARCHAR(50),
-                mobileMenuBgColor VARCHAR(50),
-                headerText VARCHAR(255) DEFAULT 'Zanitor',
-                welcomeText VARCHAR(255) DEFAULT 'Welcome To Zanitor',
-                welcomeBody TEXT,
-                productLogo VARCHAR(255),
-                homeBgColor VARCHAR(50),
-                homeLauncherLogo VARCHAR(255)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-        """)
-
-        # -----------------------------------------------------
-        # CLIENT_DETAILS TABLE
-        # (minimal definition; your existing DB may have more)
-        # -----------------------------------------------------
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS client_details (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                clientName VARCHAR(255) NOT NULL,
-                baseClient VARCHAR(100),
-                dbName VARCHAR(100),
-                medianFlag INT DEFAULT 0,
-                stateMaintainHours INT DEFAULT 24,
-                recentAlertHours INT DEFAULT 6,
-                notificationListHours INT DEFAULT 24,
-                trashEnabled VARCHAR(45) DEFAULT 'True',
-                paperEnabled VARCHAR(45) DEFAULT 'True',
-                hvacEnabled VARCHAR(45) DEFAULT 'False',
-                waterFlowEnabled VARCHAR(45) DEFAULT 'True',
-                feedbackEnabled VARCHAR(45) DEFAULT 'True',
-                analyticsWeekEndRestrictionFlag VARCHAR(45) DEFAULT 'True',
-                trafficSensor VARCHAR(45) DEFAULT 'PeopleCount',
-                appViewType INT DEFAULT 1,
-                soapDispenserEnabled VARCHAR(45) DEFAULT 'True',
-                airFreshenerEnabled VARCHAR(45) DEFAULT 'False',
-                cleanIndexEnabled VARCHAR(45) DEFAULT 'True',
-                heatMapEnabled VARCHAR(45) DEFAULT 'False',
-                schedulerEnabled VARCHAR(45) DEFAULT 'False',
-                peopleCountEnabled VARCHAR(45) DEFAULT 'True',
-                typicalHighValue INT DEFAULT 5,
-                cleaningThreshold INT DEFAULT 50,
-                feedbackAlertConfig VARCHAR(45) DEFAULT '0,1',
-                beaconTimeInterval INT DEFAULT 2,
-                soapShots INT DEFAULT 1000,
-                pumpPercentage INT DEFAULT 75,
-                soapPredictionIsEnabled VARCHAR(45) DEFAULT 'False',
-                labelFlag VARCHAR(45) DEFAULT '3',
-                weatherEnabled VARCHAR(45) DEFAULT 'False',
-                language VARCHAR(45) DEFAULT 'English',
-                occupancyDurationLimit INT DEFAULT 10,
-                passwordRotationInterval INT DEFAULT 0,
-                mfaFlag INT DEFAULT 0,
-                pageReloadInterval INT DEFAULT 60,
-                inspectionType INT DEFAULT 1,
-                defaultGradingflag INT DEFAULT 1,
-                commentsLimit INT DEFAULT 100,
-                janitorScheduleFlag INT DEFAULT 0,
-                publisherType VARCHAR(45) DEFAULT 'mqtt',
-                availableSensors VARCHAR(255) DEFAULT '',
-                feedbackType INT DEFAULT 2,
-                feedbackAlertOrder INT DEFAULT 4,
-                feedbackDefaultTimeout INT DEFAULT 20,
-                overViewStartTime VARCHAR(20) DEFAULT '12:00 AM',
-                cannedChartPeriod INT DEFAULT 60,
-                dataPostingType VARCHAR(45) DEFAULT ''
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-        """)
-
-        # -----------------------------------------------------
-        # NOTIFICATIONCONFIGURATION TABLE
-        # (core columns; new ones altered separately)
-        # -----------------------------------------------------
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS notificationconfiguration (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                clientName VARCHAR(255) NOT NULL,
-                push VARCHAR(10) DEFAULT 'True',
-                timeRestriction VARCHAR(50) DEFAULT '11:59 PM-12:01 AM',
-                weekendRestriction INT DEFAULT 0,
-                alertInterval INT DEFAULT 0,
-                janitorIssueInterval VARCHAR(10) DEFAULT '0,1',
-                maintenanceIssueInterval VARCHAR(10) DEFAULT '0,1',
-                feedbackDuplicateFilterInterval INT DEFAULT 0,
-                feedbackFilterCount INT DEFAULT 4,
-                deviceEmailFlag VARCHAR(10) DEFAULT '0,0',
-                feedbackCombinedFlag VARCHAR(10) DEFAULT 'True',
-                feedbackEmailFlag VARCHAR(10) DEFAULT '0,0',
-                feedbackTextFlag INT DEFAULT 0,
-                deviceTextFlag INT DEFAULT 0,
-                qrJanitorpush VARCHAR(10) DEFAULT 'True',
-                qrJanitorTextFlag INT DEFAULT 0,
-                qrJanitorEmailFlag INT DEFAULT 0,
-                openAreaTrafficFlag INT DEFAULT 3,
-                escalationType INT DEFAULT 0,
-                escalationLevel1Interval INT DEFAULT 0,
-                escalationLevel2Interval INT DEFAULT 0,
-                notCleanEscalationInterval INT DEFAULT 0,
-                cleaningScheduleFlag VARCHAR(10) DEFAULT 'False',
-                deviceDataTimeInterval VARCHAR(500),
-                toiletPaperThreshold VARCHAR(400),
-                paperTowelThreshold VARCHAR(200),
-                trashThreshold VARCHAR(400),
-                areaAlertThreshold VARCHAR(300),
-                trafficAlert VARCHAR(10) DEFAULT 'True',
-                dispatchedInterval INT DEFAULT 0
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-        """)
-
-        # -----------------------------------------------------
-        # USERS TABLE (for auth routes)
-        # -----------------------------------------------------
-        ensure_users_table()
-
-        # Ensure older databases pick up newly added columns
-        ensure_clientappdetails_columns(cur)
-        ensure_client_details_columns(cur)
-        ensure_notification_threshold_columns(cur)
-        ensure_notification_extra_columns(cur)
 
-        db.commit()
+def run_migrations():
+    """
+    Bring the config DB up to the latest schema version. When nothing is
+    pending this is a single SELECT. A failing step stops the run; it is
+    retried on the next start.
+    """
+    db = connect()
+    cur = db.cursor()
+    try:
+        current = get_schema_version(cur)
+        pending = [m for m in MIGRATIONS if m[0] > current]
+        if not pending:
+            print(f"✔ schema up to date (version {current})")
+            return current
+
+        for version, description, step in pending:
+            started = time.perf_counter()
+            try:
+                step(cur)
+                duration_ms = int((time.perf_counter() - started) * 1000)
+                cur.execute(
+                    "INSERT INTO schema_version (version, description, duration_ms) "
+                    "VALUES (%s, %s, %s)",
+                    (version, description, duration_ms),
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                traceback.print_exc()
+                print(f"✖ migration {version} ({description}) failed; stopping at version {current}")
+                break
+            print(f"✔ migration {version} ({description}) applied in {duration_ms} ms")
+            current = version
+        return current
+    finally:
+        cur.close()
         db.close()
 
-        # Run ALTER helpers
-        alter_clientappdetails_defaults()
-        alter_client_details_defaults()
-        alter_notification_defaults()
-        alter_notification_numeric_columns_to_varchar()
 
+def init_db():
+    try:
+        run_migrations()
     except Exception:
         traceback.print_exc()
 
@@ -605,8 +1491,17 @@ def init_db():
 @app.after_request
 def cors(resp):
     resp.headers["Access-Control-Allow-Origin"] = "*"
-    resp.headers["Access-Control-Allow-Methods"] = "GET,POST,PUT,DELETE,OPTIONS"
-    resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    resp.headers["Access-Control-Allow-Methods"] = "GET,POST,PUT,PATCH,DELETE,OPTIONS"
+    resp.headers["Access-Control-Allow-Headers"] = (
+        "Content-Type, Authorization, If-None-Match, If-Modified-Since"
+    )
+    resp.headers["Access-Control-Expose-Headers"] = (
+        "Server-Timing, Age, X-Snapshot-Generated-At, ETag, Last-Modified"
+    )
+
+    # How long this request waited for a pooled DB connection
+    if "db_pool_wait_ms" in g:
+        resp.headers["Server-Timing"] = f"db-pool;dur={g.db_pool_wait_ms:.2f}"
     return resp
 
 
@@ -615,6 +1510,55 @@ def opt(x):
     return ("", 204)
 
 
+# ======================================================================
+#  RESPONSE COMPRESSION (/api/*)
+# ======================================================================
+API_COMPRESS_MIN_SIZE = int(os.environ.get("API_COMPRESS_MIN_SIZE", "1024"))
+API_GZIP_LEVEL = int(os.environ.get("API_GZIP_LEVEL", "6"))
+API_BROTLI_QUALITY = int(os.environ.get("API_BROTLI_QUALITY", "4"))
+
+API_COMPRESSIBLE = {"application/json", "text/plain", "text/csv", "text/html"}
+
+
+@app.after_request
+def compress_response(resp):
+    """
+    gzip/br the body of larger API responses. Streamed, already encoded,
+    non-text and small responses pass through untouched. A strong ETag
+    becomes weak, since the encoded bytes differ but the content is the
+    same and conditional_config() compares weakly.
+    """
+    if not request.path.startswith("/api/"):
+        return resp
+    if resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed:
+        return resp
+    if "Content-Encoding" in resp.headers or resp.mimetype not in API_COMPRESSIBLE:
+        return resp
+
+    resp.vary.add("Accept-Encoding")
+    body = resp.get_data()
+    if len(body) < API_COMPRESS_MIN_SIZE:
+        return resp
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"] > 0:
+        encoding = "br"
+        body = brotli.compress(body, quality=API_BROTLI_QUALITY)
+    elif accepted["gzip"] > 0:
+        encoding = "gzip"
+        body = gzip.compress(body, API_GZIP_LEVEL)
+    else:
+        return resp
+
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = encoding
+
+    etag, weak = resp.get_etag()
+    if etag and not weak:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
 # ======================================================================
 #  PASSWORD / USER HELPERS
 # ======================================================================
@@ -622,22 +1566,40 @@ def sha256(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+# Hot lookups; prepared server-side when DB_PREPARED_STATEMENTS=1
+# (PooledConnection.prepared)
+USER_BY_LOGIN_SQL = """
+    SELECT id, username, email, password_hash
+    FROM users WHERE username_lc=LOWER(%s)
+    UNION
+    SELECT id, username, email, password_hash
+    FROM users WHERE email_lc=LOWER(%s)
+    LIMIT 1
+"""
+
+USER_BY_USERNAME_SQL = """
+    SELECT id, username, email, password_hash
+    FROM users
+    WHERE username_lc=LOWER(%s)
+    LIMIT 1
+"""
+
+USER_BY_ID_SQL = "SELECT id, username, email, password_hash FROM users WHERE id=%s"
+
+INSERT_USER_SQL = "INSERT INTO users (username, email, password_hash) VALUES (%s,%s,%s)"
+
+
+def first_row(cur):
+    """First row of a prepared cursor's result, reading the rest off the wire."""
+    rows = cur.fetchall()
+    return rows[0] if rows else None
+
+
 def get_user(login_name):
     """Case-insensitive username or email lookup."""
     try:
         db = connect()
-        cur = db.cursor(dictionary=True)
-        cur.execute(
-            """
-            SELECT id, username, email, password_hash
-            FROM users
-            WHERE LOWER(username)=LOWER(%s)
-               OR LOWER(email)=LOWER(%s)
-            LIMIT 1
-            """,
-            (login_name, login_name),
-        )
-        row = cur.fetchone()
+        row = first_row(db.prepared(USER_BY_LOGIN_SQL, (login_name, login_name), dictionary=True))
         db.close()
         return row
     except Exception:
@@ -645,20 +1607,45 @@ def get_user(login_name):
         return None
 
 
+def user_exists_query(login_names):
+    marks = ",".join(["LOWER(%s)"] * len(login_names))
+    sql = f"""
+        SELECT id FROM users WHERE username_lc IN ({marks})
+        UNION
+        SELECT id FROM users WHERE email_lc IN ({marks})
+        LIMIT 1
+    """
+    return sql, (*login_names, *login_names)
+
+
+def user_exists(*login_names):
+    """
+    True if any of login_names matches a username or email, case-insensitively.
+    One round trip; both branches are index probes.
+    """
+    db = connect()
+    cur = db.cursor()
+    cur.execute(*user_exists_query(login_names))
+    found = cur.fetchone() is not None
+    db.close()
+    return found
+
+
 def get_user_by_username(username):
     try:
         db = connect()
-        cur = db.cursor(dictionary=True)
-        cur.execute(
-            """
-            SELECT id, username, email, password_hash
-            FROM users
-            WHERE LOWER(username)=LOWER(%s)
-            LIMIT 1
-            """,
-            (username,),
-        )
-        row = cur.fetchone()
+        row = first_row(db.prepared(USER_BY_USERNAME_SQL, (username,), dictionary=True))
+        db.close()
+        return row
+    except Exception:
+        traceback.print_exc()
+        return None
+
+
+def get_user_by_id(user_id):
+    try:
+        db = connect()
+        row = first_row(db.prepared(USER_BY_ID_SQL, (user_id,), dictionary=True))
         db.close()
         return row
     except Exception:
@@ -666,18 +1653,112 @@ def get_user_by_username(username):
         return None
 
 
-def get_username_from_header():
+# -----------------------------------------------------
+# Session tokens: base64url(payload).base64url(HMAC-SHA256), where the
+# payload carries the user id, username and expiry. Verified in memory,
+# so an authenticated request needs no users-table lookup for the token.
+# -----------------------------------------------------
+SESSION_TTL = int(os.environ.get("SESSION_TTL", "43200"))
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "60"))
+
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "").encode("utf-8")
+if not SESSION_SECRET:
+    SESSION_SECRET = os.urandom(32)
+    print("⚠ SESSION_SECRET not set – sessions end when the server restarts")
+
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def sign(payload):
+    return hmac.new(SESSION_SECRET, payload, hashlib.sha256).digest()
+
+
+def issue_session_token(user):
+    payload = json.dumps(
+        {"uid": user["id"], "sub": user["username"], "exp": int(time.time()) + SESSION_TTL},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return b64url(payload) + "." + b64url(sign(payload))
+
+
+def verify_session_token(token):
+    """Payload dict of a valid, unexpired token; None otherwise."""
+    try:
+        body, signature = token.split(".", 1)
+        payload = b64url_decode(body)
+        if not hmac.compare_digest(sign(payload), b64url_decode(signature)):
+            return None
+        claims = json.loads(payload)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+
+class UserCache:
+    """
+    users rows by id, kept for USER_CACHE_TTL seconds. Routes that change
+    a user call invalidate() so the next request reloads the row.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+        if entry and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def put(self, user):
+        with self._lock:
+            self._users[user["id"]] = (user, time.monotonic())
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+user_cache = UserCache(USER_CACHE_TTL)
+
+
+def get_token_from_header():
     auth = request.headers.get("Authorization", "")
     if auth.startswith("Bearer "):
         return auth.split(" ", 1)[1].strip()
     return None
 
 
+def session_claims():
+    """Verified claims of the request's bearer token, or None."""
+    token = get_token_from_header()
+    if not token:
+        return None
+    return verify_session_token(token)
+
+
 def get_current_user():
-    username = get_username_from_header()
-    if not username:
+    claims = session_claims()
+    if claims is None:
         return None
-    return get_user_by_username(username)
+
+    user = user_cache.get(claims["uid"])
+    if user is None:
+        user = get_user_by_id(claims["uid"])
+        if user is None:
+            return None
+        user_cache.put(user)
+    return user
 
 
 def check_password(input_pw, user):
@@ -700,6 +1781,23 @@ def check_password(input_pw, user):
 # ======================================================================
 #  AUTH ROUTES
 # ======================================================================
+def login_response(user, password):
+    if not user or not check_password(password, user):
+        return jsonify({"ok": False, "error": "Invalid username or password"}), 401
+
+    return jsonify(
+        {
+            "ok": True,
+            "token": issue_session_token(user),
+            "user": {
+                "id": user["id"],
+                "username": user["username"],
+                "email": user["email"],
+            },
+        }
+    )
+
+
 @app.route("/api/auth/login", methods=["POST"])
 def login():
     try:
@@ -707,21 +1805,7 @@ def login():
         username = data.get("username", "").strip()
         password = data.get("password", "").strip()
 
-        user = get_user(username)
-        if not user or not check_password(password, user):
-            return jsonify({"ok": False, "error": "Invalid username or password"}), 401
-
-        return jsonify(
-            {
-                "ok": True,
-                "token": user["username"],  # username used as Bearer token
-                "user": {
-                    "id": user["id"],
-                    "username": user["username"],
-                    "email": user["email"],
-                },
-            }
-        )
+        return login_response(get_user(username), password)
     except Exception:
         traceback.print_exc()
         return jsonify({"ok": False, "error": "Login failed"}), 500
@@ -739,17 +1823,14 @@ def register():
             return jsonify({"ok": False, "error": "All fields required"}), 400
 
         # Check existing
-        if get_user(username) or get_user(email):
+        if user_exists(username, email):
             return jsonify({"ok": False, "error": "User already exists"}), 400
 
         hashed = sha256(password)
 
         db = connect()
         cur = db.cursor()
-        cur.execute(
-            "INSERT INTO users (username, email, password_hash) VALUES (%s,%s,%s)",
-            (username, email, hashed),
-        )
+        cur.execute(INSERT_USER_SQL, (username, email, hashed))
         db.commit()
         db.close()
 
@@ -795,9 +1876,14 @@ def update_profile():
         )
         db.commit()
         db.close()
+        user_cache.invalidate(user["id"])
 
-        updated = get_user_by_username(new_username)
-        return jsonify({"ok": True, "user": updated})
+        updated = get_user_by_id(user["id"])
+        if updated is None:
+            # Deleted between the session check and the UPDATE
+            return jsonify({"ok": False, "error": "Unauthorized"}), 401
+        # The token carries the username, so hand out a fresh one
+        return jsonify({"ok": True, "user": updated, "token": issue_session_token(updated)})
     except Exception:
         traceback.print_exc()
         return jsonify({"ok": False, "error": "Update failed"}), 500
@@ -830,6 +1916,7 @@ def change_password():
         )
         db.commit()
         db.close()
+        user_cache.invalidate(user["id"])
 
         return jsonify({"ok": True, "message": "Password updated"})
     except Exception:
@@ -837,91 +1924,338 @@ def change_password():
         return jsonify({"ok": False, "error": "Failed"}), 500
 
 
+# ======================================================================
+#  CONFIG VERSION (ETag / conditional GET)
+# ======================================================================
+class ConfigVersion:
+    """
+    Monotonic counter bumped by every route that writes client config.
+    The config read endpoints derive their ETag and Last-Modified from it,
+    so a conditional GET can be answered with 304 without touching MySQL.
+
+    The counter lives in this process (app.py runs a single process) and
+    is prefixed with a per-boot id so ETags from a previous run never
+    match. Changes made directly in MySQL are not seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boot = os.urandom(4).hex()
+        self.version = 0
+        self.modified = time.time()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            # Last-Modified has whole seconds: a write in the same second as
+            # the previous one must still move it forward
+            self.modified = max(time.time(), int(self.modified) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return f"{self._boot}-{self.version}", self.modified
+
+
+config_version = ConfigVersion()
+
+
+def bump_config_version():
+    config_version.bump()
+
+
+def config_not_modified(etag, modified):
+    """True when the request's If-None-Match / If-Modified-Since still match."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        # HTTP dates have whole seconds; Last-Modified was sent truncated
+        return int(modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def set_config_validators(resp, etag, modified):
+    """
+    Same validators on the 200 and the 304 that replaces it. The ETag is
+    always weak, since compress_response() may encode the body, and
+    Vary covers that encoding.
+    """
+    resp.set_etag(etag, weak=True)
+    resp.last_modified = int(modified)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def conditional_config(view):
+    """Add ETag/Last-Modified to a config read route and answer 304s."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Taken before the read: a write racing with it only makes the
+        # ETag older, so the next request revalidates
+        etag, modified = config_version.snapshot()
+
+        if config_not_modified(etag, modified):
+            resp = app.response_class(status=304)
+        else:
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+
+        return set_config_validators(resp, etag, modified)
+
+    return wrapper
+
+
 # ======================================================================
 #  BASIC CLIENT QUERIES
 # ======================================================================
+PAGE_LIMIT_DEFAULT = 100
+PAGE_LIMIT_MAX = 500
+
+
+def parse_page_args():
+    """
+    Keyset pagination args: ?limit=N&after=<id>. Returns (limit, after),
+    or None when neither is given and the caller wants the full list.
+    Raises ValueError on bad input.
+    """
+    limit = request.args.get("limit")
+    after = request.args.get("after")
+    if limit is None and after is None:
+        return None
+
+    limit = int(limit) if limit else PAGE_LIMIT_DEFAULT
+    if not 1 <= limit <= PAGE_LIMIT_MAX:
+        raise ValueError(f"limit must be between 1 and {PAGE_LIMIT_MAX}")
+    after = int(after) if after else None
+    return limit, after
+
+
+def keyset_source(table, page):
+    """
+    `table` itself, or a derived table holding one page of it in id DESC
+    order (plus one extra row to tell whether another page exists).
+    Paging the driving table before the joins keeps every joined row of
+    one id on the same page.
+    """
+    if page is None:
+        return table, ()
+    limit, after = page
+    if after is None:
+        return f"(SELECT * FROM {table} ORDER BY id DESC LIMIT %s)", (limit + 1,)
+    return (
+        f"(SELECT * FROM {table} WHERE id < %s ORDER BY id DESC LIMIT %s)",
+        (after, limit + 1),
+    )
+
+
+def parse_fields(table, alias, extra=()):
+    """
+    ?fields=a,b,c -> SQL select list for `alias`, validated against
+    DESIRED_COLUMNS[table] plus `extra` (computed columns already in the
+    query). id is always included for paging. Returns None when absent;
+    raises ValueError on unknown fields.
+    """
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+
+    allowed = {"id"} | {col for col, _, _ in DESIRED_COLUMNS[table]}
+    wanted = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in wanted if f not in allowed and f not in extra]
+    if unknown:
+        raise ValueError("unknown fields: " + ", ".join(unknown))
+
+    columns = [f"{alias}.id"] + [
+        f"{alias}.`{f}`" for f in wanted if f != "id" and f not in extra
+    ]
+    return columns, [f for f in wanted if f in extra]
+
+
+def projection(table, alias):
+    """Select list for the detail listings: `alias`.* + clientId, or ?fields=."""
+    fields = parse_fields(table, alias, extra=("clientId",))
+    if fields is None:
+        return f"{alias}.*, c.id AS clientId"
+    columns, extra = fields
+    if "clientId" in extra:
+        columns.append("c.id AS clientId")
+    return ", ".join(columns)
+
+
+def page_response(rows, page, key="id"):
+    """Full list as before, or {"items", "nextCursor"} for a keyset page."""
+    if page is None:
+        return jsonify(rows)
+
+    limit = page[0]
+    ids = list(dict.fromkeys(row[key] for row in rows))
+    next_cursor = None
+    if len(ids) > limit:
+        extra = ids[limit]
+        rows = [row for row in rows if row[key] != extra]
+        next_cursor = str(ids[limit - 1])
+    return jsonify({"items": rows, "nextCursor": next_cursor})
+
+
+def clients_query(page):
+    """(sql, params) for /api/clients; page from parse_page_args()."""
+    source, params = keyset_source("clientappdetails", page)
+    sql = f"""
+        SELECT DISTINCT
+            c.*,
+            d.dbName,
+            d.baseClient,
+            n.push,
+            n.deviceDataTimeInterval,
+            n.toiletPaperThreshold,
+            n.paperTowelThreshold,
+            n.trashThreshold,
+            n.areaAlertThreshold
+        FROM {source} c
+        LEFT JOIN client_details d ON c.clientName = d.clientName
+        LEFT JOIN notificationconfiguration n ON c.clientName = n.clientName
+        ORDER BY c.id DESC
+    """
+    return sql, params
+
+
+def client_details_query(select, page):
+    """(sql, params) for /api/client-details; select from projection()."""
+    source, params = keyset_source("client_details", page)
+    sql = f"""
+        SELECT {select}
+        FROM {source} d
+        LEFT JOIN clientappdetails c ON c.clientName = d.clientName
+        ORDER BY d.id DESC
+    """
+    return sql, params
+
+
+def notification_configs_query(select, page):
+    """(sql, params) for /api/notification-configs; select from projection()."""
+    source, params = keyset_source("notificationconfiguration", page)
+    sql = f"""
+        SELECT {select}
+        FROM {source} n
+        LEFT JOIN clientappdetails c ON c.clientName = n.clientName
+        ORDER BY n.id DESC
+    """
+    return sql, params
+
+
 @app.route("/api/clients", methods=["GET"])
+@conditional_config
 def get_clients():
     """
     List clients with:
       - all clientappdetails columns
       - dbName + baseClient (client_details)
       - push + 5 thresholds (notificationconfiguration)
+
+    Optional keyset paging: ?limit=N&after=<nextCursor>.
     """
+    try:
+        page = parse_page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         db = connect()
         cur = db.cursor(dictionary=True)
-        cur.execute(
-            """
-            SELECT DISTINCT
-                c.*,
-                d.dbName,
-                d.baseClient,
-                n.push,
-                n.deviceDataTimeInterval,
-                n.toiletPaperThreshold,
-                n.paperTowelThreshold,
-                n.trashThreshold,
-                n.areaAlertThreshold
-            FROM clientappdetails c
-            LEFT JOIN client_details d ON c.clientName = d.clientName
-            LEFT JOIN notificationconfiguration n ON c.clientName = n.clientName
-            ORDER BY c.id DESC
-            """
-        )
+        cur.execute(*clients_query(page))
         rows = cur.fetchall()
         db.close()
-        return jsonify(rows)
+        return page_response(rows, page)
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/client-details", methods=["GET"])
+@conditional_config
 def get_client_details():
-    """Raw client_details rows (+ clientId from clientappdetails)."""
+    """
+    Raw client_details rows (+ clientId from clientappdetails).
+
+    ?fields=a,b limits the columns; see parse_fields().
+    """
+    try:
+        page = parse_page_args()
+        select = projection("client_details", "d")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         db = connect()
         cur = db.cursor(dictionary=True)
-        cur.execute(
-            """
-            SELECT d.*, c.id AS clientId
-            FROM client_details d
-            LEFT JOIN clientappdetails c ON c.clientName = d.clientName
-            ORDER BY d.id DESC
-            """
-        )
+        cur.execute(*client_details_query(select, page))
         rows = cur.fetchall()
         db.close()
-        return jsonify(rows)
+        return page_response(rows, page)
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/notification-configs", methods=["GET"])
+@conditional_config
 def get_notification_configs():
-    """Raw notificationconfiguration rows (+ clientId)."""
+    """
+    Raw notificationconfiguration rows (+ clientId).
+
+    ?fields=a,b limits the columns; see parse_fields().
+    """
+    try:
+        page = parse_page_args()
+        select = projection("notificationconfiguration", "n")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         db = connect()
         cur = db.cursor(dictionary=True)
-        cur.execute(
-            """
-            SELECT n.*, c.id AS clientId
-            FROM notificationconfiguration n
-            LEFT JOIN clientappdetails c ON c.clientName = n.clientName
-            ORDER BY n.id DESC
-            """
-        )
+        cur.execute(*notification_configs_query(select, page))
         rows = cur.fetchall()
         db.close()
-        return jsonify(rows)
+        return page_response(rows, page)
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+CLIENT_BY_ID_SQL = """
+    SELECT
+        c.*,
+        d.baseClient,
+        d.dbName,
+        n.push,
+        n.deviceDataTimeInterval,
+        n.toiletPaperThreshold,
+        n.paperTowelThreshold,
+        n.trashThreshold,
+        n.areaAlertThreshold
+    FROM clientappdetails c
+    LEFT JOIN client_details d ON c.clientName = d.clientName
+    LEFT JOIN notificationconfiguration n ON c.clientName = n.clientName
+    WHERE c.id=%s
+"""
+
+# Marker columns split the flat row back into the three tables
+CLIENT_CONFIG_SQL = """
+    SELECT c.*, 1 AS `__details__`, d.*, 1 AS `__notification__`, n.*
+    FROM clientappdetails c
+    LEFT JOIN client_details d ON d.clientName = c.clientName
+    LEFT JOIN notificationconfiguration n ON n.clientName = c.clientName
+    WHERE c.id=%s
+    ORDER BY d.id, n.id
+    LIMIT 1
+"""
+
+
 @app.route("/api/client/<id>", methods=["GET"])
+@conditional_config
 def get_client(id):
     """
     Single client by id with:
@@ -931,27 +2265,7 @@ def get_client(id):
     """
     try:
         db = connect()
-        cur = db.cursor(dictionary=True)
-        cur.execute(
-            """
-            SELECT
-                c.*,
-                d.baseClient,
-                d.dbName,
-                n.push,
-                n.deviceDataTimeInterval,
-                n.toiletPaperThreshold,
-                n.paperTowelThreshold,
-                n.trashThreshold,
-                n.areaAlertThreshold
-            FROM clientappdetails c
-            LEFT JOIN client_details d ON c.clientName = d.clientName
-            LEFT JOIN notificationconfiguration n ON c.clientName = n.clientName
-            WHERE c.id=%s
-            """,
-            (id,),
-        )
-        row = cur.fetchone()
+        row = first_row(db.prepared(CLIENT_BY_ID_SQL, (id,), dictionary=True))
         db.close()
         return jsonify(row if row else {})
     except Exception as e:
@@ -959,9 +2273,215 @@ def get_client(id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/client/<id>/config", methods=["GET"])
+@conditional_config
+def get_client_config(id):
+    """
+    Complete config of one client for the edit page:
+    {ok, client_appdetails, client_details, notification_config}, each the
+    full table row (or {} if missing). One query: a primary-key lookup on
+    clientappdetails plus clientName index lookups on the other two.
+    """
+    try:
+        db = connect()
+        cur = db.prepared(CLIENT_CONFIG_SQL, (id,))
+        row = first_row(cur)
+        names = [col[0] for col in cur.description]
+        db.close()
+
+        if not row:
+            return jsonify({"ok": False, "error": "Client not found"}), 404
+
+        d_at = names.index("__details__")
+        n_at = names.index("__notification__")
+
+        def part(start, end):
+            values = dict(zip(names[start:end], row[start:end]))
+            # LEFT JOIN miss → every column NULL
+            return values if values.get("id") is not None else {}
+
+        return jsonify({
+            "ok": True,
+            "client_appdetails": part(0, d_at),
+            "client_details": part(d_at + 1, n_at),
+            "notification_config": part(n_at + 1, len(names)),
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+
+# Columns /api/clients pulls in from the other two tables
+CLIENT_LIST_DETAIL_COLUMNS = ["dbName", "baseClient"]
+CLIENT_LIST_NOTIFICATION_COLUMNS = [
+    "push",
+    "deviceDataTimeInterval",
+    "toiletPaperThreshold",
+    "paperTowelThreshold",
+    "trashThreshold",
+    "areaAlertThreshold",
+]
+
+
+def client_key(name):
+    # The SQL joins compare clientName case-insensitively
+    return (name or "").casefold()
+
+
+def group_by_client(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(client_key(row["clientName"]), []).append(row)
+    return groups
+
+
+def build_client_bundle(apps, details, notifications):
+    """
+    Join the three tables in memory, producing the same rows as
+    /api/clients, /api/client-details and /api/notification-configs.
+    """
+    apps_by_name = group_by_client(apps)
+    details_by_name = group_by_client(details)
+    notifs_by_name = group_by_client(notifications)
+
+    clients = []
+    seen = set()
+    for app_row in apps:
+        key = client_key(app_row["clientName"])
+        for d in details_by_name.get(key) or [None]:
+            for n in notifs_by_name.get(key) or [None]:
+                row = dict(app_row)
+                for col in CLIENT_LIST_DETAIL_COLUMNS:
+                    row[col] = d.get(col) if d else None
+                for col in CLIENT_LIST_NOTIFICATION_COLUMNS:
+                    row[col] = n.get(col) if n else None
+                # SELECT DISTINCT in /api/clients
+                fingerprint = tuple(map(repr, row.values()))
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    clients.append(row)
+
+    def with_client_id(rows):
+        out = []
+        for row in rows:
+            for app_row in apps_by_name.get(client_key(row["clientName"])) or [None]:
+                out.append({**row, "clientId": app_row["id"] if app_row else None})
+        return out
+
+    return {
+        "clients": clients,
+        "clientDetails": with_client_id(details),
+        "notificationConfigs": with_client_id(notifications),
+    }
+
+
+@app.route("/api/client-bundle", methods=["GET"])
+@conditional_config
+def get_client_bundle():
+    """
+    Everything the ClientList page shows, in one round trip:
+    {clients, clientDetails, notificationConfigs}, each shaped like the
+    matching list endpoint. The three tables are read in one
+    consistent-snapshot transaction and joined in memory.
+
+    With ?limit=N&after=<nextCursor> it pages over clientappdetails and
+    only returns detail/notification rows of the clients on that page.
+    """
+    try:
+        page = parse_page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        source, params = keyset_source("clientappdetails", page)
+        db = connect()
+        if db.in_transaction:
+            db.rollback()
+        db.start_transaction(consistent_snapshot=True, readonly=True)
+        cur = db.cursor(dictionary=True)
+
+        cur.execute(f"SELECT * FROM {source} c ORDER BY c.id DESC", params)
+        apps = cur.fetchall()
+
+        next_cursor = None
+        if page is not None:
+            limit = page[0]
+            if len(apps) > limit:
+                apps = apps[:limit]
+                next_cursor = str(apps[-1]["id"])
+            names = [a["clientName"] for a in apps] or [None]
+            where = "WHERE clientName IN (" + ",".join(["%s"] * len(names)) + ")"
+        else:
+            names = []
+            where = ""
+
+        cur.execute(f"SELECT * FROM client_details {where} ORDER BY id DESC", names)
+        details = cur.fetchall()
+        cur.execute(f"SELECT * FROM notificationconfiguration {where} ORDER BY id DESC", names)
+        notifications = cur.fetchall()
+
+        db.commit()
+        db.close()
+
+        bundle = build_client_bundle(apps, details, notifications)
+        if page is not None:
+            bundle["nextCursor"] = next_cursor
+        return jsonify(bundle)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
 # ======================================================================
 #  CLIENT CONFIG CRUD
 # ======================================================================
+def parse_client_changes(data):
+    """
+    Sparse client document -> ({field: value}, errors). null stands for
+    the field's /api/client-defaults value.
+    """
+    changes = {}
+    errors = []
+    for name, value in data.items():
+        if name in CLIENT_IGNORED_FIELDS:
+            continue
+        field = FIELDS_BY_NAME.get(name)
+        if field is None:
+            errors.append(f"unknown field: {name}")
+            continue
+        if value is None:
+            value = field.default
+        try:
+            changes[name] = field.coerce(value)
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+
+    if "clientName" in changes:
+        changes["clientName"] = changes["clientName"].strip()
+        if not changes["clientName"]:
+            errors.append("clientName is required")
+    return changes, errors
+
+
+def changes_by_table(changes):
+    """{field: value} -> {table: {column: value}}, touched tables only."""
+    by_table = {}
+    for field, value in changes.items():
+        for table in CLIENT_FIELD_TABLES[field]:
+            by_table.setdefault(table, {})[field] = value
+    return by_table
+
+
+CLIENT_NAME_BY_ID_SQL = "SELECT clientName FROM clientappdetails WHERE id=%s"
+CLIENT_NAME_FOR_UPDATE_SQL = CLIENT_NAME_BY_ID_SQL + " FOR UPDATE"
+
+DELETE_CLIENT_SQL = (
+    "DELETE FROM client_details WHERE clientName=%s",
+    "DELETE FROM notificationconfiguration WHERE clientName=%s",
+    "DELETE FROM clientappdetails WHERE id=%s",
+)
+
+
 @app.route("/api/create-client", methods=["POST"])
 def create_client_route():
     """
@@ -975,533 +2495,123 @@ def create_client_route():
     try:
         data = request.get_json(force=True)
 
-        client_name = (data.get("clientName") or "").strip()
-        if not client_name:
+        if not (data.get("clientName") or "").strip():
             return jsonify({"ok": False, "error": "clientName is required"}), 400
 
-        # FRONTEND may send either dbName or baseClient for DB
-        base_client = (data.get("baseClient") or "").strip()
-        db_name = (data.get("dbName") or base_client or "").strip()
-
-        # BACKEND defaults for app config
-        default_language = data.get("defaultLanguage") or "English"
-        list_lang = data.get("listOfLanguage")
-        if not list_lang:
-            list_lang = DEFAULT_LANG_LIST
-
-        default_display_language = data.get("defaultDisplayLanguage") or "English"
-        list_disp = data.get("listOfDisplayLanguage")
-        if not list_disp:
-            list_disp = DEFAULT_DISPLAY_LIST
-
-        menu_color = data.get("menuColor") or "#141b4d"
-        sub_menu_color = data.get("subMenuColor") or "272f69"
-        text_color = data.get("textColor") or "#3d86ea"
-
-        header_text = data.get("headerText") or "Zanitor"
-        welcome_text = data.get("welcomeText") or "Welcome To Zanitor"
-        welcome_body = data.get("welcomeBody") or DEFAULT_WELCOME_BODY
-
-        header_logo = data.get("headerLogo", "")
-        powered_by_logo = data.get("poweredByLogo", "")
-        footer_logo = data.get("footerLogo", "")
-        mobile_header_color = data.get("mobileHeaderColor", "")
-        mobile_menu_bg_color = data.get("mobileMenuBgColor", "")
-        alert = data.get("alert", "")
-        product_logo = data.get("productLogo", "")
-        home_bg_color = data.get("homeBgColor", "")
-        home_launcher_logo = data.get("homeLauncherLogo", "")
-
-        push_val = data.get("push", "True")
-
-        # Extended client_details fields
-        soap_dispenser_enabled = data.get("soapDispenserEnabled", "True")
-        air_freshener_enabled = data.get("airFreshenerEnabled", "False")
-        clean_index_enabled = data.get("cleanIndexEnabled", "True")
-        heat_map_enabled = data.get("heatMapEnabled", "False")
-        scheduler_enabled = data.get("schedulerEnabled", "False")
-        people_count_enabled = data.get("peopleCountEnabled", "True")
-        typical_high_value = data.get("typicalHighValue", 5)
-        cleaning_threshold = data.get("cleaningThreshold", 50)
-        feedback_alert_config = data.get("feedbackAlertConfig", "0,1")
-        beacon_time_interval = data.get("beaconTimeInterval", 2)
-        soap_shots = data.get("soapShots", 1000)
-        pump_percentage = data.get("pumpPercentage", 75)
-        soap_prediction_enabled = data.get("soapPredictionIsEnabled", "False")
-        label_flag = data.get("labelFlag", "3")
-        weather_enabled = data.get("weatherEnabled", "False")
-        language_val = data.get("language", "English")
-        occupancy_duration_limit = data.get("occupancyDurationLimit", 10)
-        password_rotation_interval = data.get("passwordRotationInterval", 0)
-        mfa_flag = data.get("mfaFlag", 0)
-        page_reload_interval = data.get("pageReloadInterval", 60)
-        inspection_type = data.get("inspectionType", 1)
-        default_grading_flag = data.get("defaultGradingflag", 1)
-        comments_limit = data.get("commentsLimit", 100)
-        janitor_schedule_flag = data.get("janitorScheduleFlag", 0)
-        publisher_type = data.get("publisherType", "mqtt")
-        available_sensors = data.get("availableSensors", "")
-        feedback_type = data.get("feedbackType", 2)
-        feedback_alert_order = data.get("feedbackAlertOrder", 4)
-        feedback_default_timeout = data.get("feedbackDefaultTimeout", 20)
-        overview_start_time = data.get("overViewStartTime", "12:00 AM")
-        canned_chart_period = data.get("cannedChartPeriod", 60)
-        data_posting_type = data.get("dataPostingType", "")
-
-        # 5 NEW FIELDS – AddClient form → notificationconfiguration
-        device_data_time_interval = data.get("deviceDataTimeInterval", "")
-        toilet_paper_threshold = data.get("toiletPaperThreshold", "")
-        paper_towel_threshold = data.get("paperTowelThreshold", "")
-        trash_threshold = data.get("trashThreshold", "")
-        area_alert_threshold = data.get("areaAlertThreshold", "")
-        dispatched_interval = data.get("dispatchedInterval", 0)
+        values, errors = client_values(data)
+        if errors:
+            return jsonify({"ok": False, "error": "; ".join(errors)}), 400
 
         db = connect()
-        cur = db.cursor()
 
-        # 1) Insert into clientappdetails
-        cur.execute(
-            """
-            INSERT INTO clientappdetails (
-                clientName,
-                defaultLanguage,
-                listOfLanguage,
-                defaultDisplayLanguage,
-                listOfDisplayLanguage,
-                headerLogo,
-                footerLogo,
-                poweredByLogo,
-                menuColor,
-                subMenuColor,
-                textColor,
-                mobileHeaderColor,
-                mobileMenuBgColor,
-                headerText,
-                welcomeText,
-                welcomeBody,
-                productLogo,
-                homeBgColor,
-                homeLauncherLogo
-            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """,
-            (
-                client_name,
-                default_language,
-                list_lang,
-                default_display_language,
-                list_disp,
-                header_logo,
-                footer_logo,
-                powered_by_logo,
-                menu_color,
-                sub_menu_color,
-                text_color,
-                mobile_header_color,
-                mobile_menu_bg_color,
-                header_text,
-                welcome_text,
-                welcome_body,
-                product_logo,
-                home_bg_color,
-                home_launcher_logo,
-            ),
-        )
+        for table in CLIENT_TABLES:
+            db.prepared(INSERT_SQL[table], INSERT_PARAMS[table](values))
 
-        # 2) Insert into client_details (store baseClient + dbName)
-        cur.execute(
-            """
-            INSERT INTO client_details (
-                clientName,
-                baseClient,
-                dbName,
-                medianFlag,
-                stateMaintainHours,
-                recentAlertHours,
-                notificationListHours,
-                trashEnabled,
-                paperEnabled,
-                hvacEnabled,
-                waterFlowEnabled,
-                feedbackEnabled,
-                analyticsWeekEndRestrictionFlag,
-                trafficSensor,
-                appViewType,
-                soapDispenserEnabled,
-                airFreshenerEnabled,
-                cleanIndexEnabled,
-                heatMapEnabled,
-                schedulerEnabled,
-                peopleCountEnabled,
-                typicalHighValue,
-                cleaningThreshold,
-                feedbackAlertConfig,
-                beaconTimeInterval,
-                soapShots,
-                pumpPercentage,
-                soapPredictionIsEnabled,
-                labelFlag,
-                weatherEnabled,
-                language,
-                occupancyDurationLimit,
-                passwordRotationInterval,
-                mfaFlag,
-                pageReloadInterval,
-                inspectionType,
-                defaultGradingflag,
-                commentsLimit,
-                janitorScheduleFlag,
-                publisherType,
-                availableSensors,
-                feedbackType,
-                feedbackAlertOrder,
-                feedbackDefaultTimeout,
-                overViewStartTime,
-                cannedChartPeriod,
-                dataPostingType
-            )
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """,
-            (
-                client_name,
-                base_client,
-                db_name,
-                0,
-                24,
-                6,
-                24,
-                "True",
-                "True",
-                "False",
-                "True",
-                "True",
-                "True",
-                "PeopleCount",
-                1,
-                soap_dispenser_enabled,
-                air_freshener_enabled,
-                clean_index_enabled,
-                heat_map_enabled,
-                scheduler_enabled,
-                people_count_enabled,
-                typical_high_value,
-                cleaning_threshold,
-                feedback_alert_config,
-                beacon_time_interval,
-                soap_shots,
-                pump_percentage,
-                soap_prediction_enabled,
-                label_flag,
-                weather_enabled,
-                language_val,
-                occupancy_duration_limit,
-                password_rotation_interval,
-                mfa_flag,
-                page_reload_interval,
-                inspection_type,
-                default_grading_flag,
-                comments_limit,
-                janitor_schedule_flag,
-                publisher_type,
-                available_sensors,
-                feedback_type,
-                feedback_alert_order,
-                feedback_default_timeout,
-                overview_start_time,
-                canned_chart_period,
-                data_posting_type,
-            ),
-        )
+        db.commit()
+        db.close()
+        bump_config_version()
 
-        # 3) Insert into notificationconfiguration (push + 5 new fields)
-        cur.execute(
-            """
-            INSERT INTO notificationconfiguration (
-                clientName,
-                push,
-                deviceDataTimeInterval,
-                toiletPaperThreshold,
-                paperTowelThreshold,
-                trashThreshold,
-                areaAlertThreshold,
-                dispatchedInterval
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                client_name,
-                push_val,
-                device_data_time_interval,
-                toilet_paper_threshold,
-                paper_towel_threshold,
-                trash_threshold,
-                area_alert_threshold,
-                dispatched_interval,
-            ),
-        )
+        return jsonify({"ok": True, "message": "Client created successfully"})
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+
+@app.route("/api/update-client/<id>", methods=["PUT"])
+def update_client_route(id):
+    """
+    Update client in:
+      - clientappdetails (by id)
+      - client_details
+      - notificationconfiguration (by the new clientName)
+
+    Columns declared with updatable=False are left alone.
+    """
+    try:
+        data = request.get_json(force=True)
+
+        if not (data.get("clientName") or "").strip():
+            return jsonify({"ok": False, "error": "clientName is required"}), 400
+
+        values, errors = client_values(data)
+        if errors:
+            return jsonify({"ok": False, "error": "; ".join(errors)}), 400
+
+        db = connect()
+
+        for table in CLIENT_TABLES:
+            key = id if table == "clientappdetails" else values["clientName"]
+            db.prepared(UPDATE_SQL[table], (*UPDATE_PARAMS[table](values), key))
 
         db.commit()
         db.close()
+        bump_config_version()
 
-        return jsonify({"ok": True, "message": "Client created successfully"})
+        return jsonify({"ok": True, "message": "Updated successfully"})
     except Exception as e:
         traceback.print_exc()
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
-@app.route("/api/update-client/<id>", methods=["PUT"])
-def update_client_route(id):
+@app.route("/api/update-client/<id>", methods=["PATCH"])
+def patch_client_route(id):
     """
-    Update client in:
-      - clientappdetails
-      - client_details (baseClient + dbName)
-      - notificationconfiguration (push + 5 new fields)
+    Partial update: only the fields present in the body are written, and
+    a table none of them belong to is not touched at all. null resets a
+    field to its /api/client-defaults value. Changing clientName renames
+    the client in all three tables.
     """
     try:
-        data = request.get_json(force=True)
-
-        client_name = (data.get("clientName") or "").strip()
-        if not client_name:
-            return jsonify({"ok": False, "error": "clientName is required"}), 400
+        data = request.get_json(force=True, silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"ok": False, "error": "expected a JSON object"}), 400
 
-        base_client = (data.get("baseClient") or "").strip()
-        db_name = (data.get("dbName") or base_client or "").strip()
-
-        default_language = data.get("defaultLanguage") or "English"
-        list_lang = data.get("listOfLanguage")
-        if not list_lang:
-            list_lang = DEFAULT_LANG_LIST
-
-        default_display_language = data.get("defaultDisplayLanguage") or "English"
-        list_disp = data.get("listOfDisplayLanguage")
-        if not list_disp:
-            list_disp = DEFAULT_DISPLAY_LIST
-
-        menu_color = data.get("menuColor") or "#141b4d"
-        sub_menu_color = data.get("subMenuColor") or "272f69"
-        text_color = data.get("textColor") or "#3d86ea"
-
-        header_text = data.get("headerText") or "Zanitor"
-        welcome_text = data.get("welcomeText") or "Welcome To Zanitor"
-        welcome_body = data.get("welcomeBody") or DEFAULT_WELCOME_BODY
-
-        header_logo = data.get("headerLogo", "")
-        powered_by_logo = data.get("poweredByLogo", "")
-        mobile_header_color = data.get("mobileHeaderColor", "")
-        mobile_menu_bg_color = data.get("mobileMenuBgColor", "")
-        alert = data.get("alert", "")
-        product_logo = data.get("productLogo", "")
-        home_bg_color = data.get("homeBgColor", "")
-        home_launcher_logo = data.get("homeLauncherLogo", "")
-
-        push_val = data.get("push", "True")
-
-        # Extended client_details fields
-        soap_dispenser_enabled = data.get("soapDispenserEnabled", "True")
-        air_freshener_enabled = data.get("airFreshenerEnabled", "False")
-        clean_index_enabled = data.get("cleanIndexEnabled", "True")
-        heat_map_enabled = data.get("heatMapEnabled", "False")
-        scheduler_enabled = data.get("schedulerEnabled", "False")
-        people_count_enabled = data.get("peopleCountEnabled", "True")
-        typical_high_value = data.get("typicalHighValue", 5)
-        cleaning_threshold = data.get("cleaningThreshold", 50)
-        feedback_alert_config = data.get("feedbackAlertConfig", "0,1")
-        beacon_time_interval = data.get("beaconTimeInterval", 2)
-        soap_shots = data.get("soapShots", 1000)
-        pump_percentage = data.get("pumpPercentage", 75)
-        soap_prediction_enabled = data.get("soapPredictionIsEnabled", "False")
-        label_flag = data.get("labelFlag", "3")
-        weather_enabled = data.get("weatherEnabled", "False")
-        language_val = data.get("language", "English")
-        occupancy_duration_limit = data.get("occupancyDurationLimit", 10)
-        password_rotation_interval = data.get("passwordRotationInterval", 0)
-        mfa_flag = data.get("mfaFlag", 0)
-        page_reload_interval = data.get("pageReloadInterval", 60)
-        inspection_type = data.get("inspectionType", 1)
-        default_grading_flag = data.get("defaultGradingflag", 1)
-        comments_limit = data.get("commentsLimit", 100)
-        janitor_schedule_flag = data.get("janitorScheduleFlag", 0)
-        publisher_type = data.get("publisherType", "mqtt")
-        available_sensors = data.get("availableSensors", "")
-        feedback_type = data.get("feedbackType", 2)
-        feedback_alert_order = data.get("feedbackAlertOrder", 4)
-        feedback_default_timeout = data.get("feedbackDefaultTimeout", 20)
-        overview_start_time = data.get("overViewStartTime", "12:00 AM")
-        canned_chart_period = data.get("cannedChartPeriod", 60)
-        data_posting_type = data.get("dataPostingType", "")
-
-        # 5 new fields
-        device_data_time_interval = data.get("deviceDataTimeInterval", "")
-        toilet_paper_threshold = data.get("toiletPaperThreshold", "")
-        paper_towel_threshold = data.get("paperTowelThreshold", "")
-        trash_threshold = data.get("trashThreshold", "")
-        area_alert_threshold = data.get("areaAlertThreshold", "")
-        dispatched_interval = data.get("dispatchedInterval", 0)
+        changes, errors = parse_client_changes(data)
+        if errors:
+            return jsonify({"ok": False, "error": "; ".join(errors)}), 400
 
-        db = connect()
-        cur = db.cursor()
+        if not changes:
+            return jsonify({"ok": True, "message": "Nothing to update", "updated": {}})
 
-        # 1) Update clientappdetails  (FIXED PARAM COUNT – removed alert=%s)
-        cur.execute(
-            """
-            UPDATE clientappdetails SET
-                clientName=%s,
-                defaultLanguage=%s,
-                listOfLanguage=%s,
-                defaultDisplayLanguage=%s,
-                listOfDisplayLanguage=%s,
-                headerLogo=%s,
-                poweredByLogo=%s,
-                menuColor=%s,
-                subMenuColor=%s,
-                textColor=%s,
-                mobileHeaderColor=%s,
-                mobileMenuBgColor=%s,
-                headerText=%s,
-                welcomeText=%s,
-                welcomeBody=%s,
-                productLogo=%s,
-                homeBgColor=%s,
-                homeLauncherLogo=%s
-            WHERE id=%s
-            """,
-            (
-                client_name,
-                default_language,
-                list_lang,
-                default_display_language,
-                list_disp,
-                header_logo,
-                powered_by_logo,
-                menu_color,
-                sub_menu_color,
-                text_color,
-                mobile_header_color,
-                mobile_menu_bg_color,
-                header_text,
-                welcome_text,
-                welcome_body,
-                product_logo,
-                home_bg_color,
-                home_launcher_logo,
-                id,
-            ),
-        )
+        by_table = changes_by_table(changes)
 
-        # 2) Update client_details (baseClient + dbName)
-        cur.execute(
-            """
-            UPDATE client_details
-            SET baseClient=%s,
-                dbName=%s,
-                soapDispenserEnabled=%s,
-                airFreshenerEnabled=%s,
-                cleanIndexEnabled=%s,
-                heatMapEnabled=%s,
-                schedulerEnabled=%s,
-                peopleCountEnabled=%s,
-                typicalHighValue=%s,
-                cleaningThreshold=%s,
-                feedbackAlertConfig=%s,
-                beaconTimeInterval=%s,
-                soapShots=%s,
-                pumpPercentage=%s,
-                soapPredictionIsEnabled=%s,
-                labelFlag=%s,
-                weatherEnabled=%s,
-                language=%s,
-                occupancyDurationLimit=%s,
-                passwordRotationInterval=%s,
-                mfaFlag=%s,
-                pageReloadInterval=%s,
-                inspectionType=%s,
-                defaultGradingflag=%s,
-                commentsLimit=%s,
-                janitorScheduleFlag=%s,
-                publisherType=%s,
-                availableSensors=%s,
-                feedbackType=%s,
-                feedbackAlertOrder=%s,
-                feedbackDefaultTimeout=%s,
-                overViewStartTime=%s,
-                cannedChartPeriod=%s,
-                dataPostingType=%s
-            WHERE clientName=%s
-            """,
-            (
-                base_client,
-                db_name,
-                soap_dispenser_enabled,
-                air_freshener_enabled,
-                clean_index_enabled,
-                heat_map_enabled,
-                scheduler_enabled,
-                people_count_enabled,
-                typical_high_value,
-                cleaning_threshold,
-                feedback_alert_config,
-                beacon_time_interval,
-                soap_shots,
-                pump_percentage,
-                soap_prediction_enabled,
-                label_flag,
-                weather_enabled,
-                language_val,
-                occupancy_duration_limit,
-                password_rotation_interval,
-                mfa_flag,
-                page_reload_interval,
-                inspection_type,
-                default_grading_flag,
-                comments_limit,
-                janitor_schedule_flag,
-                publisher_type,
-                available_sensors,
-                feedback_type,
-                feedback_alert_order,
-                feedback_default_timeout,
-                overview_start_time,
-                canned_chart_period,
-                data_posting_type,
-                client_name,
-            ),
-        )
+        db = connect()
 
-        # 3) Update notificationconfiguration (push + 5 fields)
-        cur.execute(
-            """
-            UPDATE notificationconfiguration
-            SET
-                push=%s,
-                deviceDataTimeInterval=%s,
-                toiletPaperThreshold=%s,
-                paperTowelThreshold=%s,
-                trashThreshold=%s,
-                areaAlertThreshold=%s,
-                dispatchedInterval=%s
-            WHERE clientName=%s
-            """,
-            (
-                push_val,
-                device_data_time_interval,
-                toilet_paper_threshold,
-                paper_towel_threshold,
-                trash_threshold,
-                area_alert_threshold,
-                dispatched_interval,
-                client_name,
-            ),
-        )
+        row = first_row(db.prepared(CLIENT_NAME_FOR_UPDATE_SQL, (id,)))
+        if not row:
+            db.rollback()
+            db.close()
+            return jsonify({"ok": False, "error": "Client not found"}), 404
+        current_name = row[0]
+
+        for table, columns in by_table.items():
+            assignments = ", ".join(f"`{col}`=%s" for col in columns)
+            if table == "clientappdetails":
+                where, key = "id=%s", id
+            else:
+                where, key = "clientName=%s", current_name
+            # One statement per column set; the LRU keeps the common ones
+            db.prepared(
+                f"UPDATE `{table}` SET {assignments} WHERE {where}",
+                (*columns.values(), key),
+            )
 
         db.commit()
         db.close()
+        bump_config_version()
 
-        return jsonify({"ok": True, "message": "Updated successfully"})
+        return jsonify({
+            "ok": True,
+            "message": "Updated successfully",
+            "updated": {table: list(columns) for table, columns in by_table.items()},
+        })
     except Exception as e:
         traceback.print_exc()
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
 @app.route("/api/client-defaults", methods=["GET"])
+@conditional_config
 def get_client_defaults():
     """
     Returns backend default values for AddClient page,
@@ -1509,130 +2619,12 @@ def get_client_defaults():
     fill all tabs easily.
     """
     try:
-        # ------------ CLIENT_DETAILS DEFAULTS ------------
-        client_details_defaults = {
-            # shared ids (also present in other tables, but fine to send here too)
-            "clientName": "",
-            "dbName": "",
-
-            "baseClient": "",
-            "medianFlag": 0,
-            "stateMaintainHours": 24,
-            "recentAlertHours": 6,
-            "notificationListHours": 24,
-
-            "trashEnabled": "True",
-            "paperEnabled": "True",
-            "hvacEnabled": "False",
-            "waterFlowEnabled": "True",
-            "feedbackEnabled": "True",
-            "soapDispenserEnabled": "True",
-            "airFreshenerEnabled": "False",
-            "cleanIndexEnabled": "True",
-            "heatMapEnabled": "False",
-            "schedulerEnabled": "False",
-            "peopleCountEnabled": "True",
-
-            "typicalHighValue": 5,
-            "cleaningThreshold": 50,
-            "analyticsWeekEndRestrictionFlag": "True",
-            "trafficSensor": "PeopleCount",
-            "appViewType": 1,
-            "feedbackAlertConfig": "0,1",
-
-            "beaconTimeInterval": 2,
-            "soapShots": 1000,
-            "pumpPercentage": 75,
-            "soapPredictionIsEnabled": "False",
-            "labelFlag": "3",
-            "weatherEnabled": "False",
-
-            "language": "English",  # UI language for this client
-            "occupancyDurationLimit": 10,
-            "passwordRotationInterval": 0,
-            "mfaFlag": 0,
-            "pageReloadInterval": 60,
-            "inspectionType": 1,
-            "defaultGradingflag": 1,
-            "commentsLimit": 100,
-            "janitorScheduleFlag": 0,
-            "publisherType": "mqtt",
-            "availableSensors": "",
-
-            "feedbackType": 2,
-            "feedbackAlertOrder": 4,
-            "feedbackDefaultTimeout": 20,
-            "overViewStartTime": "12:00 AM",
-            "cannedChartPeriod": 60,
-            "dataPostingType": "",
-        }
-
-        # ------------ CLIENT APP DETAILS DEFAULTS --------
-        client_appdetails_defaults = {
-            "defaultLanguage": "English",
-            "listOfLanguage": DEFAULT_LANG_LIST,
-            "defaultDisplayLanguage": "English",
-            "listOfDisplayLanguage": DEFAULT_DISPLAY_LIST,
-
-            "headerLogo": "https://zanelbapp.zancompute.com:82/ClientLogos/ANALYTICSPRD/ISS4.png",
-            "footerLogo": "",
-            "poweredByLogo": "https://zanelbapp.zancompute.com:82/ClientLogos/ANALYTICSPRD/Kiosk-Powered-by-1.png",
-            "productLogo": "https://gcp-image.zancompute.com/ClientLogos/ANALYTICSPRD/Bobrick-BG-Ori.png",
-            "homeLauncherLogo": "",
-
-            "menuColor": "#141b4d",
-            "subMenuColor": "272f69",
-            "textColor": "#3d86ea",
-            "mobileHeaderColor": "",
-            "mobileMenuBgColor": "",
-            "homeBgColor": "#f1fdff",
-
-            "headerText": "Zanitor",
-            "welcomeText": "Welcome To Zanitor",
-            "welcomeBody": DEFAULT_WELCOME_BODY,
-        }
-
-        # ------------ NOTIFICATION CONFIG DEFAULTS -------
-        notification_config_defaults = {
-            "push": "True",
-            "timeRestriction": "11:59 PM-12:01 AM",
-            "weekendRestriction": 0,
-            "alertInterval": 0,
-            "janitorIssueInterval": "0,1",
-            "maintenanceIssueInterval": "0,1",
-            "feedbackDuplicateFilterInterval": 0,
-            "feedbackFilterCount": 4,
-            "deviceEmailFlag": "0,0",
-            "feedbackCombinedFlag": "True",
-            "feedbackEmailFlag": "0,0",
-            "feedbackTextFlag": 0,
-            "deviceTextFlag": 0,
-            "qrJanitorpush": "True",
-            "qrJanitorTextFlag": 0,
-            "qrJanitorEmailFlag": 0,
-            "openAreaTrafficFlag": 3,
-            "escalationType": 0,
-            "escalationLevel1Interval": 0,
-            "escalationLevel2Interval": 0,
-            "notCleanEscalationInterval": 0,
-            "cleaningScheduleFlag": "False",
-            "dispatchedInterval": 0,
-
-            "deviceDataTimeInterval": "45",
-            "toiletPaperThreshold": "15",
-            "paperTowelThreshold": "15",
-            "trashThreshold": "75",
-            "areaAlertThreshold": "0",
-
-            "trafficAlert": "True",
-        }
-
         return jsonify(
             {
                 "ok": True,
-                "client_details": client_details_defaults,
-                "client_appdetails": client_appdetails_defaults,
-                "notification_config": notification_config_defaults,
+                "client_details": CLIENT_DETAILS_DEFAULTS,
+                "client_appdetails": CLIENT_APPDETAILS_DEFAULTS,
+                "notification_config": NOTIFICATION_CONFIG_DEFAULTS,
             }
         )
 
@@ -1648,30 +2640,623 @@ def delete_client_route(id):
     """
     try:
         db = connect()
-        cur = db.cursor(dictionary=True)
 
         # Find clientName from clientappdetails
-        cur.execute("SELECT clientName FROM clientappdetails WHERE id=%s", (id,))
-        row = cur.fetchone()
+        row = first_row(db.prepared(CLIENT_NAME_BY_ID_SQL, (id,)))
         if not row:
             db.close()
             return jsonify({"ok": False, "error": "Client not found"}), 404
 
-        cn = row["clientName"]
+        cn = row[0]
 
         # Delete from detail / notification / app
-        cur.execute("DELETE FROM client_details WHERE clientName=%s", (cn,))
-        cur.execute("DELETE FROM notificationconfiguration WHERE clientName=%s", (cn,))
-        cur.execute("DELETE FROM clientappdetails WHERE id=%s", (id,))
+        for sql, key in zip(DELETE_CLIENT_SQL, (cn, cn, id)):
+            db.prepared(sql, (key,))
 
         db.commit()
         db.close()
+        bump_config_version()
 
         return jsonify({"ok": True, "message": "Deleted successfully"})
     except Exception as e:
         traceback.print_exc()
         return jsonify({"ok": False, "error": str(e)}), 500
 
+
+# ======================================================================
+#  BULK IMPORT
+# ======================================================================
+IMPORT_MAX_ROWS = int(os.environ.get("IMPORT_MAX_ROWS", "5000"))
+# Uncompressed size of the worksheet + shared strings an .xlsx upload may
+# expand to; checked from the zip directory before anything is inflated
+IMPORT_MAX_XLSX_BYTES = int(os.environ.get("IMPORT_MAX_XLSX_BYTES", str(64 * 1024 * 1024)))
+
+XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+# Built-in number formats that show a time of day only
+XLSX_TIME_FORMATS = {18, 19, 20, 21, 45, 46, 47}
+
+
+def xlsx_column_index(ref):
+    """'C7' -> 2"""
+    index = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + ord(ch.upper()) - ord("A") + 1
+    return index - 1
+
+
+def xlsx_time_styles(book):
+    """Indexes of the cell styles (the `s` attribute) that format a time of day."""
+    if "xl/styles.xml" not in book.namelist():
+        return set()
+    root = ElementTree.fromstring(book.read("xl/styles.xml"))
+
+    time_formats = set(XLSX_TIME_FORMATS)
+    for fmt in root.iter(f"{XLSX_MAIN_NS}numFmt"):
+        # Drop quoted literals and [colour]/[h] brackets, then look for
+        # hours or seconds without a day, month name or year
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", fmt.get("formatCode", "")).lower()
+        if re.search(r"[hs]", code) and not re.search(r"[dy]", code):
+            time_formats.add(int(fmt.get("numFmtId")))
+
+    cell_xfs = root.find(f"{XLSX_MAIN_NS}cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {
+        index for index, xf in enumerate(cell_xfs.iter(f"{XLSX_MAIN_NS}xf"))
+        if int(xf.get("numFmtId", "0")) in time_formats
+    }
+
+
+def xlsx_time_text(serial):
+    """Excel time serial (fraction of a day) -> '9:30 AM', like overViewStartTime."""
+    minutes = round((serial % 1) * 24 * 60) % (24 * 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{(hour % 12) or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def read_xlsx_rows(stream):
+    """
+    First worksheet of an .xlsx file as lists of cell values: str for text
+    and time-formatted cells, bool for TRUE/FALSE, int/float for numbers.
+    Raises ValueError for error cells (#N/A...) and for a workbook that
+    would inflate past IMPORT_MAX_XLSX_BYTES.
+    """
+    with zipfile.ZipFile(io.BytesIO(stream.read())) as book:
+        names = book.namelist()
+        sheets = sorted(n for n in names if n.startswith("xl/worksheets/sheet"))
+        if not sheets:
+            raise ValueError("workbook has no worksheet")
+        sheet = "xl/worksheets/sheet1.xml" if "xl/worksheets/sheet1.xml" in names else sheets[0]
+
+        parts = [sheet] + [n for n in ("xl/sharedStrings.xml", "xl/styles.xml") if n in names]
+        if sum(book.getinfo(n).file_size for n in parts) > IMPORT_MAX_XLSX_BYTES:
+            raise ValueError(f"workbook expands to more than {IMPORT_MAX_XLSX_BYTES} bytes")
+
+        shared = []
+        if "xl/sharedStrings.xml" in names:
+            root = ElementTree.fromstring(book.read("xl/sharedStrings.xml"))
+            for item in root.iter(f"{XLSX_MAIN_NS}si"):
+                shared.append("".join(t.text or "" for t in item.iter(f"{XLSX_MAIN_NS}t")))
+
+        time_styles = xlsx_time_styles(book)
+        root = ElementTree.fromstring(book.read(sheet))
+
+    rows = []
+    for row in root.iter(f"{XLSX_MAIN_NS}row"):
+        cells = {}
+        for position, cell in enumerate(row.iter(f"{XLSX_MAIN_NS}c")):
+            ref = cell.get("r")
+            index = xlsx_column_index(ref) if ref else position
+            kind = cell.get("t")
+            if kind == "inlineStr":
+                cells[index] = "".join(t.text or "" for t in cell.iter(f"{XLSX_MAIN_NS}t"))
+                continue
+            value = cell.find(f"{XLSX_MAIN_NS}v")
+            if value is None or value.text is None:
+                continue
+            if kind == "s":
+                cells[index] = shared[int(value.text)]
+            elif kind == "str":
+                cells[index] = value.text
+            elif kind == "b":
+                cells[index] = value.text == "1"
+            elif kind == "e":
+                raise ValueError(f"cell {ref or index + 1} holds {value.text}")
+            elif int(cell.get("s", "0")) in time_styles:
+                cells[index] = xlsx_time_text(float(value.text))
+            else:
+                number = float(value.text)
+                cells[index] = int(number) if number.is_integer() else number
+        if cells:
+            rows.append([cells.get(i) for i in range(max(cells) + 1)])
+            # Header + one row over the limit is enough for the caller to refuse it
+            if len(rows) > IMPORT_MAX_ROWS + 1:
+                break
+    return rows
+
+
+def rows_to_dicts(rows):
+    """Header row + data rows -> dicts; rows with no values are dropped."""
+    if not rows:
+        return []
+    header = [str(h).strip() if h is not None else "" for h in rows[0]]
+    records = []
+    for row in rows[1:]:
+        record = {h: v for h, v in zip(header, row) if h}
+        if any(v not in (None, "") for v in record.values()):
+            records.append(record)
+    return records
+
+
+def read_import_rows():
+    """
+    Client records from a `file` upload (.csv, .xlsx, .json) or from a
+    JSON body: a list of client objects, or {"clients": [...]}.
+    Raises ValueError for anything it can't read.
+    """
+    upload = request.files.get("file")
+    if upload is None:
+        data = request.get_json(force=True, silent=True)
+        if isinstance(data, dict):
+            data = data.get("clients")
+        if not isinstance(data, list):
+            raise ValueError("send a JSON array of clients or a file upload")
+        return data
+
+    name = (upload.filename or "").lower()
+    try:
+        if name.endswith(".csv"):
+            text = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+            return rows_to_dicts(list(csv.reader(text)))
+        if name.endswith(".xlsx"):
+            return rows_to_dicts(read_xlsx_rows(upload.stream))
+        if name.endswith(".json"):
+            data = json.load(upload.stream)
+            if isinstance(data, dict):
+                data = data.get("clients")
+            if not isinstance(data, list):
+                raise ValueError("JSON file must hold an array of clients")
+            return data
+    except (UnicodeDecodeError, csv.Error, zipfile.BadZipFile,
+            ElementTree.ParseError, json.JSONDecodeError) as e:
+        raise ValueError(f"could not read {upload.filename}: {e}")
+    raise ValueError("file must be .csv, .xlsx or .json")
+
+
+def prepare_import_row(record):
+    """
+    One client record -> ({table: params}, errors). Missing or empty
+    fields take the /api/client-defaults value.
+    """
+    if not isinstance(record, dict):
+        return None, ["not an object"]
+
+    errors = []
+    present = {}
+    for field, value in record.items():
+        if field in CLIENT_IGNORED_FIELDS:
+            continue
+        if field not in FIELDS_BY_NAME:
+            errors.append(f"unknown field: {field}")
+            continue
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        present[field] = value
+
+    values, value_errors = client_values(present)
+    errors.extend(value_errors)
+    if not values["clientName"]:
+        errors.append("clientName is required")
+
+    return {table: INSERT_PARAMS[table](values) for table in CLIENT_TABLES}, errors
+
+
+def existing_client_names(cur, names):
+    """Lower-cased clientNames from `names` that are already in clientappdetails."""
+    found = set()
+    names = list(names)
+    for i in range(0, len(names), 500):
+        chunk = names[i:i + 500]
+        cur.execute(
+            "SELECT clientName FROM clientappdetails WHERE clientName IN ({})".format(
+                ",".join(["%s"] * len(chunk))
+            ),
+            chunk,
+        )
+        found.update(row[0].lower() for row in cur.fetchall())
+    return found
+
+
+@app.route("/api/import-clients", methods=["POST"])
+def import_clients_route():
+    """
+    Create many clients at once, in all three tables.
+
+    Accepts a JSON array of client objects (the /api/create-client keys)
+    or a `file` upload (.csv, .xlsx, .json). Every row is validated
+    before anything is written; if one fails, nothing is imported.
+    ?dryRun=1 stops after validation. The inserts run as one
+    executemany per table inside a single transaction.
+    """
+    try:
+        try:
+            records = read_import_rows()
+        except ValueError as e:
+            return jsonify({"ok": False, "error": str(e)}), 400
+        if not records:
+            return jsonify({"ok": False, "error": "no rows to import"}), 400
+        if len(records) > IMPORT_MAX_ROWS:
+            return jsonify({
+                "ok": False,
+                "error": f"at most {IMPORT_MAX_ROWS} rows per import",
+            }), 400
+
+        report = []
+        prepared = []
+        for number, record in enumerate(records, start=1):
+            params, errors = prepare_import_row(record)
+            name = params["clientappdetails"][0] if params else ""
+            report.append({"row": number, "clientName": name, "ok": not errors, "errors": errors})
+            prepared.append(params)
+
+        # Duplicates inside the file
+        seen = {}
+        for entry in report:
+            key = entry["clientName"].lower()
+            if not key:
+                continue
+            if key in seen:
+                entry["errors"].append(f"duplicate of row {seen[key]}")
+                entry["ok"] = False
+            else:
+                seen[key] = entry["row"]
+
+        db = connect()
+        cur = db.cursor()
+
+        # ...and clients that already exist
+        taken = existing_client_names(cur, {e["clientName"] for e in report if e["clientName"]})
+        for entry in report:
+            if entry["clientName"].lower() in taken:
+                entry["errors"].append("client already exists")
+                entry["ok"] = False
+
+        failed = sum(1 for entry in report if not entry["ok"])
+        if failed:
+            return jsonify({
+                "ok": False,
+                "error": f"{failed} of {len(report)} rows failed validation",
+                "imported": 0,
+                "rows": report,
+            }), 400
+
+        if request.args.get("dryRun") in ("1", "true"):
+            return jsonify({"ok": True, "dryRun": True, "imported": 0, "rows": report})
+
+        try:
+            for table in CLIENT_TABLES:
+                cur.executemany(INSERT_SQL[table], [p[table] for p in prepared])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        bump_config_version()
+
+        print(f"✔ Imported {len(prepared)} clients")
+        return jsonify({"ok": True, "imported": len(prepared), "rows": report})
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+# ======================================================================
+#  BATCH OPERATIONS
+# ======================================================================
+BATCH_MAX_OPERATIONS = int(os.environ.get("BATCH_MAX_OPERATIONS", "1000"))
+BATCH_MODES = ("atomic", "best-effort")
+
+
+def in_clause(values):
+    return ",".join(["%s"] * len(values))
+
+
+def lock_clients(cur, ids, names):
+    """
+    Look up (and lock) the clients a batch refers to.
+    Returns ({id: clientName}, {clientName.lower(): clientName}).
+    """
+    by_id = {}
+    by_name = {}
+    ids = list(ids)
+    names = list(names)
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cur.execute(
+            f"SELECT id, clientName FROM clientappdetails WHERE id IN ({in_clause(chunk)}) FOR UPDATE",
+            chunk,
+        )
+        for row_id, name in cur.fetchall():
+            by_id[str(row_id)] = name
+    for i in range(0, len(names), 500):
+        chunk = names[i:i + 500]
+        cur.execute(
+            f"SELECT clientName FROM clientappdetails WHERE clientName IN ({in_clause(chunk)}) FOR UPDATE",
+            chunk,
+        )
+        for (name,) in cur.fetchall():
+            by_name[name.lower()] = name
+    return by_id, by_name
+
+
+def insert_statements(params):
+    return [
+        (INSERT_SQL[table], [p[table] for p in params], True)
+        for table in CLIENT_TABLES
+    ]
+
+
+def update_statements(changes, names):
+    statements = []
+    for table, columns in changes_by_table(changes).items():
+        assignments = ", ".join(f"`{col}`=%s" for col in columns)
+        statements.append((
+            f"UPDATE `{table}` SET {assignments} WHERE clientName IN ({in_clause(names)})",
+            (*columns.values(), *names),
+            False,
+        ))
+    return statements
+
+
+def delete_statements(names):
+    return [
+        (f"DELETE FROM `{table}` WHERE clientName IN ({in_clause(names)})", tuple(names), False)
+        for table in CLIENT_TABLES
+    ]
+
+
+def run_statements(cur, statements):
+    for sql, params, many in statements:
+        if many:
+            cur.executemany(sql, params)
+        else:
+            cur.execute(sql, params)
+
+
+def batch_target(op):
+    """The id or clientName an update/delete names, as given."""
+    if op.get("id") not in (None, ""):
+        return "id", str(op["id"])
+    name = str(op.get("clientName") or "").strip()
+    return ("name", name) if name else (None, None)
+
+
+@app.route("/api/batch-clients", methods=["POST"])
+def batch_clients_route():
+    """
+    Run a list of create/update/delete operations in one transaction:
+
+        {"mode": "atomic" | "best-effort",
+         "operations": [
+            {"op": "create", "data": {...}},
+            {"op": "update", "clientName": "PHL", "data": {"heatMapEnabled": "True"}},
+            {"op": "delete", "id": 42}
+         ]}
+
+    create takes the /api/create-client keys (missing ones get defaults),
+    update a sparse document like PATCH. Updates with identical changes
+    become one UPDATE ... WHERE clientName IN (...) per table; creates
+    and deletes are grouped the same way. A client may appear in only
+    one operation per batch.
+
+    atomic (default): one invalid operation or failing statement and
+    nothing is applied. best-effort: invalid operations are skipped, and
+    a grouped statement that fails is retried one operation at a time
+    under savepoints, so only the bad ones fail.
+    """
+    try:
+        body = request.get_json(force=True, silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get("operations"), list):
+            return jsonify({"ok": False, "error": "expected {\"operations\": [...]}"}), 400
+        mode = body.get("mode") or "atomic"
+        if mode not in BATCH_MODES:
+            return jsonify({"ok": False, "error": "mode must be atomic or best-effort"}), 400
+        operations = body["operations"]
+        if not operations:
+            return jsonify({"ok": False, "error": "no operations"}), 400
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return jsonify({
+                "ok": False,
+                "error": f"at most {BATCH_MAX_OPERATIONS} operations per batch",
+            }), 400
+
+        # ---- 1) validate each operation on its own ----
+        results = []
+        parsed = []
+        ids = set()
+        names = set()
+        for index, op in enumerate(operations):
+            result = {"index": index, "op": None, "clientName": None, "ok": True, "error": None}
+            results.append(result)
+            parsed.append(None)
+            if not isinstance(op, dict):
+                result.update(ok=False, error="not an object")
+                continue
+            kind = op.get("op")
+            result["op"] = kind
+            data = op.get("data")
+
+            if kind == "create":
+                params, errors = prepare_import_row(data)
+                if params:
+                    result["clientName"] = params["clientappdetails"][0]
+                    names.add(result["clientName"])
+                if errors:
+                    result.update(ok=False, error="; ".join(errors))
+                    continue
+                parsed[index] = (kind, params)
+            elif kind in ("update", "delete"):
+                target = batch_target(op)
+                if target[0] is None:
+                    result.update(ok=False, error="id or clientName is required")
+                    continue
+                (ids if target[0] == "id" else names).add(target[1])
+                if kind == "delete":
+                    parsed[index] = (kind, target)
+                    continue
+                if not isinstance(data, dict) or not data:
+                    result.update(ok=False, error="data must be a non-empty object")
+                    continue
+                changes, errors = parse_client_changes(data)
+                if errors:
+                    result.update(ok=False, error="; ".join(errors))
+                    continue
+                parsed[index] = (kind, target, changes)
+            else:
+                result.update(ok=False, error="op must be create, update or delete")
+
+        db = connect()
+        cur = db.cursor()
+
+        # ---- 2) resolve targets against the database ----
+        by_id, by_name = lock_clients(cur, ids, names)
+        claimed = {}
+        for index, entry in enumerate(parsed):
+            if entry is None:
+                continue
+            result = results[index]
+            kind = entry[0]
+            if kind == "create":
+                name = result["clientName"]
+                if name.lower() in by_name:
+                    result.update(ok=False, error="client already exists")
+                    parsed[index] = None
+                    continue
+                keys = {name.lower()}
+            else:
+                how, value = entry[1]
+                name = by_id.get(value) if how == "id" else by_name.get(value.lower())
+                if name is None:
+                    result.update(ok=False, error="Client not found")
+                    parsed[index] = None
+                    continue
+                result["clientName"] = name
+                keys = {name.lower()}
+                if kind == "update" and "clientName" in entry[2]:
+                    keys.add(entry[2]["clientName"].lower())
+            clash = next((claimed[k] for k in keys if k in claimed), None)
+            if clash is not None:
+                result.update(ok=False, error=f"client is also in operation {clash}")
+                parsed[index] = None
+                continue
+            for k in keys:
+                claimed[k] = index
+            parsed[index] = (*entry, name)
+
+        invalid = [r for r in results if not r["ok"]]
+        if invalid and mode == "atomic":
+            db.rollback()
+            for result in results:
+                result["ok"] = False
+            return jsonify({
+                "ok": False,
+                "mode": mode,
+                "error": f"{len(invalid)} of {len(results)} operations are invalid; nothing was applied",
+                "applied": 0,
+                "failed": len(results),
+                "results": results,
+            }), 400
+
+        # ---- 3) group into units: (indexes, grouped statements, per-op statements) ----
+        units = []
+        creates = [i for i, e in enumerate(parsed) if e and e[0] == "create"]
+        if creates:
+            units.append((
+                creates,
+                insert_statements([parsed[i][1] for i in creates]),
+                {i: insert_statements([parsed[i][1]]) for i in creates},
+            ))
+
+        update_groups = {}
+        for i, entry in enumerate(parsed):
+            if not entry or entry[0] != "update":
+                continue
+            _, _, changes, name = entry
+            if "clientName" in changes:
+                # a rename only ever applies to one client
+                units.append(([i], update_statements(changes, [name]), {}))
+                continue
+            update_groups.setdefault(tuple(sorted(changes.items())), []).append(i)
+        for signature, indexes in update_groups.items():
+            changes = dict(signature)
+            units.append((
+                indexes,
+                update_statements(changes, [parsed[i][3] for i in indexes]),
+                {i: update_statements(changes, [parsed[i][3]]) for i in indexes},
+            ))
+
+        deletes = [i for i, e in enumerate(parsed) if e and e[0] == "delete"]
+        if deletes:
+            units.append((
+                deletes,
+                delete_statements([parsed[i][2] for i in deletes]),
+                {i: delete_statements([parsed[i][2]]) for i in deletes},
+            ))
+
+        # ---- 4) execute ----
+        if mode == "atomic":
+            try:
+                for _, statements, _ in units:
+                    run_statements(cur, statements)
+                db.commit()
+            except Exception as e:
+                traceback.print_exc()
+                db.rollback()
+                for result in results:
+                    result.update(ok=False, error=str(e))
+                return jsonify({
+                    "ok": False,
+                    "mode": mode,
+                    "error": str(e),
+                    "applied": 0,
+                    "failed": len(results),
+                    "results": results,
+                }), 500
+        else:
+            for indexes, statements, single in units:
+                cur.execute("SAVEPOINT batch_group")
+                try:
+                    run_statements(cur, statements)
+                    cur.execute("RELEASE SAVEPOINT batch_group")
+                    continue
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT batch_group")
+                for i in indexes:
+                    cur.execute("SAVEPOINT batch_op")
+                    try:
+                        run_statements(cur, single.get(i, statements))
+                        cur.execute("RELEASE SAVEPOINT batch_op")
+                    except Exception as e:
+                        cur.execute("ROLLBACK TO SAVEPOINT batch_op")
+                        results[i].update(ok=False, error=str(e))
+            db.commit()
+
+        applied = sum(1 for r in results if r["ok"])
+        if applied:
+            bump_config_version()
+
+        return jsonify({
+            "ok": applied == len(results),
+            "mode": mode,
+            "applied": applied,
+            "failed": len(results) - applied,
+            "results": results,
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": str(e)}), 500
+
     
     # =====================================================
 # API – HEALTH
@@ -1681,7 +3266,11 @@ def health():
     return jsonify({
         "ok": True,
         "env": APP_ENV,
-        "db": "PROD_DB" if APP_ENV == "prod" else "TEST_DB"
+        "db": "PROD_DB" if APP_ENV == "prod" else "TEST_DB",
+        "pools": {
+            pool.name: pool.stats()
+            for pool in (config_pool, prod_pool, test_pool)
+        },
     })
 
 # =====================================================
@@ -1716,58 +3305,747 @@ def health():
 #             cur.close()
 #         if conn:
 #             conn.close()
-@app.route("/api/lastupdated", methods=["GET"])
-def last_updated():
+# -----------------------------------------------------
+# Freshness snapshots: one per (year, month), refreshed in
+# the background and served stale-while-revalidate.
+# -----------------------------------------------------
+FRESHNESS_REFRESH_INTERVAL = int(os.environ.get("FRESHNESS_REFRESH_INTERVAL", "60"))
+FRESHNESS_MAX_STALE = int(os.environ.get("FRESHNESS_MAX_STALE", "600"))
+FRESHNESS_KEY_IDLE = int(os.environ.get("FRESHNESS_KEY_IDLE", "3600"))
+
+
+freshness_executor = ThreadPoolExecutor(
+    max_workers=DASHBOARD_POOL_SIZE, thread_name_prefix="freshness-probe"
+)
+
+
+def empty_freshness_row(client_name):
+    row = {"clientName": client_name, "currentTime": None}
+    row.update({column: None for column in FRESHNESS_COLUMNS})
+    return row
+
+
+def run_freshness_probe(db_name, sources, year, month):
+    """Run one client's probe on its own dashboard connection."""
+    conn = None
+    cur = None
+    try:
+        conn = connect_dashboard()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(build_probe_query(db_name, sources, year, month))
+        result = cur.fetchone() or {}
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+
+    row = empty_freshness_row(db_name.upper())
+    row.update(result)
+    return row
+
+
+def compute_freshness(year, month, clients=None, kinds=None):
+    """
+    Fan the per-client probes out over freshness_executor and merge the
+    rows as they finish. A client whose probe fails or runs past its
+    deadline still gets a row, with the reason in "error".
+
+    `clients` (dbNames) and `kinds` narrow down which probes run.
+    """
+    futures = {}
+    for db_name, sources in freshness_registry.get().items():
+        if clients is not None and db_name not in clients:
+            continue
+        if kinds is not None:
+            sources = tuple(src for src in sources if src[0] in kinds)
+        if sources:
+            future = freshness_executor.submit(
+                run_freshness_probe, db_name, sources, year, month
+            )
+            futures[future] = db_name.upper()
+
+    if not futures:
+        return []
+
+    # Probes queue behind each other once every worker is busy
+    waves = -(-len(futures) // DASHBOARD_POOL_SIZE)
+    rows = {}
+    try:
+        for future in as_completed(futures, timeout=FRESHNESS_PROBE_TIMEOUT * waves):
+            name = futures[future]
+            try:
+                rows[name] = future.result()
+            except Exception as e:
+                print(f"⚠ freshness probe failed for {name}:", e)
+                rows[name] = {**empty_freshness_row(name), "error": str(e)}
+    except FuturesTimeout:
+        for future, name in futures.items():
+            if name not in rows:
+                future.cancel()
+                rows[name] = {**empty_freshness_row(name), "error": "timeout"}
+
+    return [rows[name] for name in sorted(rows)]
+
+
+class FreshnessCache:
+    """
+    In-memory freshness snapshots keyed by (year, month).
+
+    A daemon thread recomputes every key that was requested within
+    `key_idle` seconds once per `interval`. Readers always get the last
+    snapshot; if it is older than `interval` a refresh is kicked off in
+    the background, and only a snapshot older than `max_stale` (or a
+    missing one) is recomputed inline. Readers that need a key already
+    being recomputed wait for that refresh instead of starting another.
+    """
+
+    def __init__(self, compute, interval=FRESHNESS_REFRESH_INTERVAL,
+                 max_stale=FRESHNESS_MAX_STALE, key_idle=FRESHNESS_KEY_IDLE):
+        self.compute = compute
+        self.interval = interval
+        self.max_stale = max_stale
+        self.key_idle = key_idle
+
+        self._snapshots = {}
+        self._last_requested = {}
+        self._refreshing = {}  # key -> Event set when its refresh ends
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="freshness-refresher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.time()
+            with self._lock:
+                for key, seen in list(self._last_requested.items()):
+                    if now - seen > self.key_idle:
+                        self._last_requested.pop(key, None)
+                        self._snapshots.pop(key, None)
+                keys = list(self._last_requested)
+            for key in keys:
+                self.refresh(key)
+
+    def refresh(self, key, wait=False):
+        """
+        Recompute one key. A failed refresh keeps the previous snapshot.
+        If the key is already being recomputed, wait=True blocks until that
+        refresh ends; otherwise this returns at once.
+        """
+        with self._lock:
+            done = self._refreshing.get(key)
+            if done is None:
+                done = self._refreshing[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            if wait:
+                done.wait()
+            return
+
+        try:
+            rows = self.compute(*key)
+            with self._lock:
+                self._snapshots[key] = (rows, time.time())
+        except Exception as e:
+            print(f"⚠ freshness refresh failed for {key}:", e)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+            done.set()
+
+    def _refresh_async(self, key):
+        threading.Thread(target=self.refresh, args=(key,), daemon=True).start()
+
+    def get(self, key):
+        """Return (rows, computed_at) for key, or (None, None) if unavailable."""
+        self._ensure_thread()
+        with self._lock:
+            self._last_requested[key] = time.time()
+            snapshot = self._snapshots.get(key)
+
+        age = time.time() - snapshot[1] if snapshot else None
+        if snapshot is None or age > self.max_stale:
+            self.refresh(key, wait=True)
+        elif age > self.interval:
+            self._refresh_async(key)
+            return snapshot
+
+        with self._lock:
+            return self._snapshots.get(key, (None, None))
+
+
+freshness_cache = FreshnessCache(compute_freshness)
+
+
+def parse_list_arg(name, normalize=None):
+    """Comma-separated query arg -> sorted tuple, or None when absent."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    values = {v.strip() for v in raw.split(",") if v.strip()}
+    if normalize:
+        values = {normalize(v) for v in values}
+    return tuple(sorted(values))
+
+
+def freshness_key():
+    """
+    (year, month, clients, kinds) snapshot key from the query string, or
+    None when there is nothing to probe.
+
+    Every distinct key is a snapshot the refresher keeps recomputing, so
+    only keys that can name real tables get through: months within
+    FRESHNESS_YEARS_BACK years up to now, dbNames in the registry, known
+    source kinds. A filter that selects everything collapses to None.
+    """
     year = request.args.get("year")
     month = request.args.get("month")
 
     if not year or not month:
+        return None
+
+    # year/month end up in table names, so only accept real dates
+    if not (str(year).isdigit() and len(str(year)) == 4):
+        return None
+    if not (str(month).isdigit() and 1 <= int(month) <= 12):
+        return None
+
+    now = time.localtime()
+    if not (now.tm_year - FRESHNESS_YEARS_BACK <= int(year) <= now.tm_year):
+        return None
+    if (int(year), int(month)) > (now.tm_year, now.tm_mon):
+        return None
+
+    month = str(int(month)).zfill(2)
+
+    # Optional filters: ?client=PHL,PIT&source=deviceStatus,flight
+    clients = parse_list_arg("client", str.lower)
+    if clients is not None:
+        known = freshness_registry.get()
+        clients = tuple(c for c in clients if c in known)
+        if not clients:
+            return None
+        if len(clients) == len(known):
+            clients = None
+
+    kinds = parse_list_arg("source")
+    if kinds is not None:
+        kinds = tuple(k for k in kinds if k in FRESHNESS_KINDS)
+        if not kinds:
+            return None
+        if len(kinds) == len(FRESHNESS_KINDS):
+            kinds = None
+
+    return (str(year), month, clients, kinds)
+
+
+@app.route("/api/lastupdated", methods=["GET"])
+def last_updated():
+    key = freshness_key()
+    if key is None:
         return jsonify([]), 200
 
-    month = str(month).zfill(2)
+    rows, computed_at = freshness_cache.get(key)
+    return snapshot_response(rows, computed_at)
 
-    phl_flight_table = f"phl_depHistory_{year}_{month}"
-    pit_flight_table = f"pit_depHistory_{year}_{month}"
 
-    query = UNION_QUERY.format(
-        PHL_FLIGHT_TABLE=phl_flight_table,
-        PIT_FLIGHT_TABLE=pit_flight_table,
+def snapshot_response(rows, computed_at):
+    """/api/lastupdated body plus the snapshot's Age headers."""
+    if rows is None:
+        return jsonify([]), 200
+
+    resp = jsonify(rows)
+    resp.headers["Age"] = str(int(time.time() - computed_at))
+    resp.headers["X-Snapshot-Generated-At"] = time.strftime(
+        "%Y-%m-%d %H:%M:%S", time.localtime(computed_at)
     )
+    return resp, 200
 
-    try:
-        conn = connect_dashboard()
-        cur = conn.cursor(dictionary=True)
-        cur.execute(query)
-        rows = cur.fetchall()
-        return jsonify(rows), 200
 
+# =====================================================
+# EXPORT (CSV / XLSX)
+# =====================================================
+# Rows go from an unbuffered cursor straight into the response, a batch
+# at a time, so an export never holds a whole table in memory.
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "500"))
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Characters XML 1.0 can't carry, even escaped
+XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+
+
+class StreamSink:
+    """
+    Write-only file object the CSV/zip writers fill; the response
+    generator drains it between batches. No seek()/tell(), so zipfile
+    falls back to streaming mode (data descriptors after each entry).
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_cell(value):
+    """DB value -> the text an export shows for it."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+def stream_csv(header, batches):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    for batch in batches:
+        writer.writerows([export_cell(v) for v in row] for row in batch)
+        yield out.getvalue().encode("utf-8")
+        out.seek(0)
+        out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+def xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float, decimal.Decimal)):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            text = xml_escape(XML_ILLEGAL.sub("", export_cell(value)))
+            cells.append(
+                f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+            )
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def stream_xlsx(header, batches, sheet_name="Data"):
+    """
+    Minimal single-sheet workbook with inline strings, written entry by
+    entry into a zip that is streamed as it grows.
+    """
+    sink = StreamSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as book:
+        for name, body in XLSX_PARTS.items():
+            book.writestr(name, body)
+        book.writestr("xl/workbook.xml", XLSX_WORKBOOK.format(name=xml_escape(sheet_name)))
+        yield sink.drain()
+
+        with book.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(xlsx_row(header).encode("utf-8"))
+            for batch in batches:
+                sheet.write("".join(xlsx_row(row) for row in batch).encode("utf-8"))
+                yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def export_response(fmt, filename, header, batches):
+    stream = stream_xlsx(header, batches) if fmt == "xlsx" else stream_csv(header, batches)
+    return Response(
+        stream,
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+def export_format():
+    fmt = (request.values.get("format") or "csv").lower()
+    return fmt if fmt in EXPORT_FORMATS else None
+
+
+def stream_query(fmt, filename, sql, params):
+    """
+    Run `sql` on a connection of its own and stream the rows out
+    EXPORT_BATCH_SIZE at a time. The query runs before the response
+    starts, so connection and SQL errors still come back as a 500; the
+    connection is handed back once the response is closed.
+    """
+    conn = None
+    try:
+        conn = config_pool.acquire()
+        cur = conn.cursor()
+        cur.execute(sql, params)
     except Exception as e:
-        print("⚠ UNION ERROR:", e)
-        return jsonify([]), 200
+        traceback.print_exc()
+        if conn:
+            config_pool.release(conn, discard=True)
+        return jsonify({"error": str(e)}), 500
 
-    finally:
-        if cur:
+    header = [col[0] for col in cur.description]
+    state = {"finished": False}
+
+    def batches():
+        while True:
+            rows = cur.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield rows
+        state["finished"] = True
+
+    def done():
+        # A client that disconnects mid-export leaves unread rows behind
+        if state["finished"]:
             cur.close()
+        config_pool.release(conn, discard=not state["finished"])
+
+    resp = export_response(fmt, filename, header, batches())
+    resp.call_on_close(done)
+    return resp
+
+
+def stream_ids(fmt, filename, table, columns, ids):
+    """
+    Stream the rows of `table` with the given ids, in exactly that order
+    (the order the page shows them). Ids are looked up EXPORT_BATCH_SIZE
+    at a time on a connection of its own; ids that no longer exist are
+    skipped. The first batch is read before the response starts, so
+    connection and SQL errors still come back as a 500.
+    """
+    select = ", ".join(f"`{col}`" for col in columns)
+
+    def fetch(cur, chunk):
+        cur.execute(
+            f"SELECT id AS `__id__`, {select} FROM `{table}` WHERE id IN ({in_clause(chunk)})",
+            chunk,
+        )
+        by_id = {row[0]: row[1:] for row in cur.fetchall()}
+        return [by_id[i] for i in chunk if i in by_id]
+
+    chunks = [ids[i:i + EXPORT_BATCH_SIZE] for i in range(0, len(ids), EXPORT_BATCH_SIZE)]
+    conn = None
+    try:
+        conn = config_pool.acquire()
+        cur = conn.cursor()
+        first = fetch(cur, chunks[0]) if chunks else []
+    except Exception as e:
+        traceback.print_exc()
         if conn:
-            conn.close()
+            config_pool.release(conn, discard=True)
+        return jsonify({"error": str(e)}), 500
+
+    def batches():
+        if first:
+            yield first
+        for chunk in chunks[1:]:
+            rows = fetch(cur, chunk)
+            if rows:
+                yield rows
+
+    def done():
+        cur.close()
+        config_pool.release(conn)
+
+    resp = export_response(fmt, filename, columns, batches())
+    resp.call_on_close(done)
+    return resp
+
+
+def export_ids():
+    """?ids=3,1,2 (or the same form field) -> [3, 1, 2]; None when absent."""
+    raw = request.values.get("ids")
+    if raw is None:
+        return None
+    try:
+        return list(dict.fromkeys(int(v) for v in raw.split(",") if v.strip()))
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
+
+
+def export_columns(table):
+    """?fields=a,b,c validated against DESIRED_COLUMNS[table]; raises ValueError."""
+    allowed = ["id"] + [col for col, _, _ in DESIRED_COLUMNS[table]]
+    raw = request.values.get("fields")
+    if not raw:
+        return allowed
+    wanted = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise ValueError("unknown fields: " + ", ".join(unknown))
+    return wanted
+
+
+@app.route("/api/export/<table>", methods=["GET", "POST"])
+def export_table(table):
+    """
+    /api/export/<table>?format=csv|xlsx
+        &fields=a,b,c          columns, in order (default: all)
+        &ids=3,1,2             exactly these rows, in this order
+        &q=term                substring match across the exported columns
+        &sort=column&dir=asc   ordering (default: id)
+
+    The same parameters are accepted as a POSTed form, which is how the
+    ClientList page sends the ids of the rows it shows (a long id list
+    does not fit in a URL). q/sort are ignored when ids is given.
+    """
+    if table not in DESIRED_COLUMNS:
+        return jsonify({"error": "Unknown table"}), 404
+    fmt = export_format()
+    if fmt is None:
+        return jsonify({"error": "format must be csv or xlsx"}), 400
+    try:
+        columns = export_columns(table)
+        ids = export_ids()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if ids is not None:
+        return stream_ids(fmt, table, table, columns, ids)
+
+    sort = request.args.get("sort") or "id"
+    if sort != "id" and sort not in {col for col, _, _ in DESIRED_COLUMNS[table]}:
+        return jsonify({"error": "unknown sort column"}), 400
+    direction = "DESC" if (request.args.get("dir") or "").lower() == "desc" else "ASC"
+
+    select = ", ".join(f"`{col}`" for col in columns)
+    sql = f"SELECT {select} FROM `{table}`"
+    params = ()
+    term = (request.args.get("q") or "").strip()
+    if term:
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+        sql += f" WHERE CONCAT_WS(' ', {select}) LIKE %s"
+        params = (pattern,)
+    sql += f" ORDER BY `{sort}` {direction}"
+    if sort != "id":
+        sql += ", id"
+
+    return stream_query(fmt, table, sql, params)
+
+
+@app.route("/api/export/lastupdated", methods=["GET"])
+def export_last_updated():
+    """Same query string as /api/lastupdated, plus format=csv|xlsx."""
+    fmt = export_format()
+    if fmt is None:
+        return jsonify({"error": "format must be csv or xlsx"}), 400
+
+    key = freshness_key()
+    rows = None
+    if key is not None:
+        # Filter the page's own (year, month) snapshot here rather than
+        # creating a per-filter cache key that the refresher would keep
+        # recomputing for key_idle seconds
+        year, month, clients, kinds = key
+        rows, _ = freshness_cache.get((year, month, None, None))
+    rows = rows or []
+
+    header = ["clientName", "currentTime", *FRESHNESS_COLUMNS]
+    if key is not None:
+        if clients is not None:
+            rows = [row for row in rows if row["clientName"].lower() in clients]
+        if kinds is not None:
+            wanted = {FRESHNESS_KINDS[kind] for kind in kinds}
+            header = [col for col in header if col not in FRESHNESS_COLUMNS or col in wanted]
+    batches = (
+        [[row.get(col) for col in header] for row in rows[i:i + EXPORT_BATCH_SIZE]]
+        for i in range(0, len(rows), EXPORT_BATCH_SIZE)
+    )
+    filename = f"dashboard_{key[0]}_{key[1]}" if key else "dashboard"
+    return export_response(fmt, filename, header, batches)
 
 
 # =====================================================
 # SERVE REACT BUILD
 # =====================================================
+STATIC_COMPRESS_MIN_SIZE = 1024
+STATIC_COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+
+# Written by `vite build` (build.manifest). Every file it lists carries a
+# content hash in its name; nothing else in dist is assumed to.
+VITE_MANIFEST = ".vite/manifest.json"
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+
+class StaticAssets:
+    """
+    In-memory index of frontend/dist, built once. Every file is read a
+    single time; text assets above STATIC_COMPRESS_MIN_SIZE also get gzip
+    and (with the brotli package) br variants, taken from .gz/.br files
+    next to them when the build produced those, otherwise compressed
+    here. Restart the server after `npm run build`.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._files = None
+        self._lock = threading.Lock()
+
+    def _hashed_files(self):
+        """dist-relative paths of the hashed build outputs, from Vite's manifest."""
+        manifest = self.root / VITE_MANIFEST
+        if not manifest.is_file():
+            print(f"⚠ {manifest} not found – serving every static file with {CACHE_REVALIDATE}")
+            return set()
+        try:
+            chunks = json.loads(manifest.read_text("utf-8")).values()
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠ could not read {manifest}:", e)
+            return set()
+        hashed = set()
+        for chunk in chunks:
+            hashed.add(chunk["file"])
+            hashed.update(chunk.get("css", ()))
+            hashed.update(chunk.get("assets", ()))
+        return hashed
+
+    def _load_file(self, path, hashed):
+        body = path.read_bytes()
+        variants = {"identity": body}
+
+        if path.suffix in STATIC_COMPRESSIBLE and len(body) >= STATIC_COMPRESS_MIN_SIZE:
+            gz = path.with_name(path.name + ".gz")
+            variants["gzip"] = gz.read_bytes() if gz.exists() else gzip.compress(body, 9)
+
+            br = path.with_name(path.name + ".br")
+            if br.exists():
+                variants["br"] = br.read_bytes()
+            elif brotli is not None:
+                variants["br"] = brotli.compress(body, quality=11)
+
+        rel = path.relative_to(self.root).as_posix()
+        return {
+            "mimetype": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            "etag": hashlib.sha256(body).hexdigest()[:20],
+            "cache": CACHE_IMMUTABLE if rel in hashed else CACHE_REVALIDATE,
+            "variants": variants,
+            "path": rel,
+        }
+
+    def load(self):
+        files = {}
+        if self.root.is_dir():
+            hashed = self._hashed_files()
+            for path in self.root.rglob("*"):
+                if not path.is_file() or path.suffix in (".gz", ".br"):
+                    continue
+                if path.relative_to(self.root).parts[0] == ".vite":
+                    continue  # build metadata, not for the browser
+                entry = self._load_file(path, hashed)
+                files[entry["path"]] = entry
+        with self._lock:
+            self._files = files
+        print(f"✔ indexed {len(files)} static file(s) from {self.root}")
+        return files
+
+    def get(self, path):
+        files = self._files
+        if files is None:
+            with self._lock:
+                files = self._files
+            if files is None:
+                files = self.load()
+        return files.get(path)
+
+
+static_assets = StaticAssets(DIST_DIR)
+
+
+def pick_encoding(variants):
+    accepted = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in variants and accepted[encoding] > 0:
+            return encoding
+    return "identity"
+
+
+def send_static_asset(entry):
+    encoding = pick_encoding(entry["variants"])
+    etag = entry["etag"] if encoding == "identity" else f"{entry['etag']}-{encoding}"
+
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(entry["variants"][encoding], mimetype=entry["mimetype"])
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = entry["cache"]
+    if len(entry["variants"]) > 1:
+        resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def serve_react(path):
     if path.startswith("api/"):
         return jsonify({"error": "API route not found"}), 404
 
-    file_path = DIST_DIR / path
-    if path and file_path.exists():
-        return send_from_directory(DIST_DIR, path)
-
-    index_file = DIST_DIR / "index.html"
-    if index_file.exists():
-        return send_from_directory(DIST_DIR, "index.html")
+    entry = static_assets.get(path) if path else None
+    if entry is None:
+        # Client-side routes fall back to the SPA shell
+        entry = static_assets.get("index.html")
+    if entry is not None:
+        return send_static_asset(entry)
 
     return (
         "React build not found. "
@@ -1775,8 +4053,17 @@ def serve_react(path):
         500
     )
 
+
 # =====================================================
 # RUN SERVER
 # =====================================================
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    debug = True
+    # The debug reloader runs this file twice: once as the file watcher,
+    # then as the child that serves requests (WERKZEUG_RUN_MAIN=true).
+    # Only the serving process migrates, warms the pools and loads the build.
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        init_db()
+        warm_pools()
+        static_assets.load()
+    app.run(host="0.0.0.0", port=5000, debug=debug)
@@ -0,0 +1,543 @@
+"""
+ASGI entry point: the same API as app.py, with the DB-bound read routes
+served by coroutines on an async MySQL pool.
+
+    pip install -r requirements-asgi.txt
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Routes in ASYNC_ROUTES run on the event loop, so a request waiting on
+MySQL holds no thread:
+
+  - /api/lastupdated         snapshot per (year, month); probes fan out
+                             on the dashboard pool
+  - /api/clients, /api/client-details, /api/notification-configs
+  - /api/auth/login, /api/auth/register, GET /api/user/profile
+
+Every other request (writes, exports, the React build, ...) goes to the
+Flask app in a thread pool, unchanged. The async views run inside a
+Flask request context, so they share app.py's argument parsing, JSON
+provider, CORS/compression hooks and response shapes.
+
+Run a single process: the config version behind the ETags, the session
+user cache and the freshness snapshots all live in memory. The exports
+that stay on Flask read the async freshness snapshots too.
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+import traceback
+from functools import wraps
+
+try:
+    import aiomysql
+    from a2wsgi import WSGIMiddleware
+except ImportError as e:  # optional; python app.py needs neither
+    raise ImportError(
+        f"asgi.py needs aiomysql and a2wsgi ({e.name} is missing): "
+        "pip install -r requirements-asgi.txt"
+    ) from e
+
+from flask import jsonify, make_response, request
+
+import app as configapp
+from app import app
+
+# =====================================================
+# ASYNC POOLS
+# =====================================================
+ASYNC_DB_POOL_SIZE = int(os.environ.get("ASYNC_DB_POOL_SIZE", "20"))
+ASYNC_DASHBOARD_POOL_SIZE = int(os.environ.get("ASYNC_DASHBOARD_POOL_SIZE", "20"))
+ASYNC_POOL_MIN_IDLE = int(os.environ.get("ASYNC_POOL_MIN_IDLE", "2"))
+# Threads for the routes that still run on Flask
+WSGI_THREADS = int(os.environ.get("WSGI_THREADS", "10"))
+
+
+async def create_pool(config, size):
+    return await aiomysql.create_pool(
+        host=config["host"],
+        port=config["port"],
+        user=config["user"],
+        password=config["password"],
+        db=config.get("database"),
+        charset="utf8mb4",
+        # Reads only; autocommit keeps a pooled connection from pinning
+        # an old REPEATABLE READ snapshot
+        autocommit=True,
+        minsize=min(ASYNC_POOL_MIN_IDLE, size),
+        maxsize=size,
+        connect_timeout=configapp.DB_CONNECT_TIMEOUT,
+        pool_recycle=configapp.DB_POOL_RECYCLE,
+    )
+
+
+class AsyncPools:
+    """aiomysql pools for the config DB and the active dashboard DB."""
+
+    def __init__(self):
+        self.config = None
+        self.dashboard = None
+
+    async def open(self):
+        dashboard = configapp.PROD_DB if configapp.APP_ENV == "prod" else configapp.TEST_DB
+        self.config = await create_pool(configapp.TEST_DB, ASYNC_DB_POOL_SIZE)
+        self.dashboard = await create_pool(dashboard, ASYNC_DASHBOARD_POOL_SIZE)
+
+    async def close(self):
+        for pool in (self.config, self.dashboard):
+            if pool is not None:
+                pool.close()
+                await pool.wait_closed()
+
+    async def query(self, pool, sql, params=None, one=False):
+        """Run one statement on a pooled connection; rows as dicts."""
+        conn = await pool.acquire()
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(sql, params)
+                return await (cur.fetchone() if one else cur.fetchall())
+        except BaseException:
+            # Cancelled or failed mid-query: don't hand the connection back
+            conn.close()
+            raise
+        finally:
+            pool.release(conn)
+
+
+pools = AsyncPools()
+
+
+# =====================================================
+# FRESHNESS (ASYNC)
+# =====================================================
+class AsyncFreshnessRegistry:
+    """FreshnessRegistry on the async config pool."""
+
+    def __init__(self, ttl=configapp.FRESHNESS_REGISTRY_TTL):
+        self.ttl = ttl
+        self._sources = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self._sources is not None and time.time() - self._loaded_at < self.ttl:
+                return self._sources
+
+            names = set(configapp.FRESHNESS_SEED_DBNAMES)
+            try:
+                rows = await pools.query(pools.config, configapp.FRESHNESS_DBNAMES_SQL)
+                names.update(row["dbName"].strip().lower() for row in rows)
+            except Exception as e:
+                print("⚠ freshness registry reload failed:", e)
+                if self._sources is not None:
+                    self._loaded_at = time.time()
+                    return self._sources
+
+            self._sources = configapp.freshness_sources(names)
+            self._loaded_at = time.time()
+            return self._sources
+
+
+freshness_registry = AsyncFreshnessRegistry()
+
+
+async def run_freshness_probe(db_name, sources, year, month):
+    result = await pools.query(
+        pools.dashboard,
+        configapp.build_probe_query(db_name, sources, year, month),
+        one=True,
+    )
+    row = configapp.empty_freshness_row(db_name.upper())
+    row.update(result or {})
+    return row
+
+
+async def compute_freshness(year, month, clients=None, kinds=None):
+    """
+    compute_freshness() on the event loop: every probe is started at
+    once and waits for a dashboard connection, not for a thread.
+    """
+    probes = {}
+    for db_name, sources in (await freshness_registry.get()).items():
+        if clients is not None and db_name not in clients:
+            continue
+        if kinds is not None:
+            sources = tuple(src for src in sources if src[0] in kinds)
+        if sources:
+            probes[db_name.upper()] = run_freshness_probe(db_name, sources, year, month)
+
+    if not probes:
+        return []
+
+    # Probes queue behind each other once every connection is busy
+    waves = -(-len(probes) // ASYNC_DASHBOARD_POOL_SIZE)
+    deadline = configapp.FRESHNESS_PROBE_TIMEOUT * waves
+    results = await asyncio.gather(
+        *(asyncio.wait_for(probe, deadline) for probe in probes.values()),
+        return_exceptions=True,
+    )
+
+    rows = {}
+    for name, result in zip(probes, results):
+        if isinstance(result, asyncio.TimeoutError):
+            rows[name] = {**configapp.empty_freshness_row(name), "error": "timeout"}
+        elif isinstance(result, Exception):
+            print(f"⚠ freshness probe failed for {name}:", result)
+            rows[name] = {**configapp.empty_freshness_row(name), "error": str(result)}
+        else:
+            rows[name] = result
+    return [rows[name] for name in sorted(rows)]
+
+
+class AsyncFreshnessCache:
+    """
+    FreshnessCache on the event loop, same interval/max_stale/key_idle
+    rules. Concurrent readers of a missing or expired key all await the
+    one refresh already running for it.
+    """
+
+    def __init__(self, compute, interval=configapp.FRESHNESS_REFRESH_INTERVAL,
+                 max_stale=configapp.FRESHNESS_MAX_STALE,
+                 key_idle=configapp.FRESHNESS_KEY_IDLE):
+        self.compute = compute
+        self.interval = interval
+        self.max_stale = max_stale
+        self.key_idle = key_idle
+
+        self._snapshots = {}
+        self._last_requested = {}
+        self._refreshing = {}
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.time()
+            for key, seen in list(self._last_requested.items()):
+                if now - seen > self.key_idle:
+                    self._last_requested.pop(key, None)
+                    self._snapshots.pop(key, None)
+            for key in list(self._last_requested):
+                await self.refresh(key)
+
+    async def _compute(self, key):
+        try:
+            rows = await self.compute(*key)
+            self._snapshots[key] = (rows, time.time())
+        except Exception as e:
+            print(f"⚠ freshness refresh failed for {key}:", e)
+        finally:
+            self._refreshing.pop(key, None)
+
+    def refresh(self, key):
+        """Recompute one key (or join the refresh in flight); awaitable."""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key))
+            self._refreshing[key] = task
+        # shield: a client disconnecting must not cancel everyone's refresh
+        return asyncio.shield(task)
+
+    async def get(self, key):
+        """Return (rows, computed_at) for key, or (None, None) if unavailable."""
+        self._last_requested[key] = time.time()
+        snapshot = self._snapshots.get(key)
+
+        age = time.time() - snapshot[1] if snapshot else None
+        if snapshot is None or age > self.max_stale:
+            await self.refresh(key)
+        elif age > self.interval:
+            self.refresh(key)
+            return snapshot
+
+        return self._snapshots.get(key, (None, None))
+
+
+freshness_cache = AsyncFreshnessCache(compute_freshness)
+
+
+class LoopFreshnessCache:
+    """
+    The async cache as seen from a Flask worker thread. Installed as
+    app.freshness_cache at startup, so /api/export/lastupdated reads the
+    same snapshots as /api/lastupdated instead of running its own probes.
+    """
+
+    def __init__(self, cache, loop):
+        self.cache = cache
+        self.loop = loop
+
+    def get(self, key):
+        return asyncio.run_coroutine_threadsafe(self.cache.get(key), self.loop).result()
+
+
+# =====================================================
+# ASYNC VIEWS
+# =====================================================
+def conditional_config(view):
+    """app.conditional_config() for coroutine views."""
+
+    @wraps(view)
+    async def wrapper():
+        etag, modified = configapp.config_version.snapshot()
+
+        if configapp.config_not_modified(etag, modified):
+            resp = app.response_class(status=304)
+        else:
+            resp = make_response(await view())
+            if resp.status_code != 200:
+                return resp
+
+        return configapp.set_config_validators(resp, etag, modified)
+
+    return wrapper
+
+
+async def last_updated():
+    key = configapp.freshness_key()
+    if key is None:
+        return jsonify([]), 200
+
+    rows, computed_at = await freshness_cache.get(key)
+    return configapp.snapshot_response(rows, computed_at)
+
+
+async def paged_listing(build_query):
+    try:
+        page = configapp.parse_page_args()
+        sql, params = build_query(page)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = await pools.query(pools.config, sql, params)
+        return configapp.page_response(list(rows), page)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@conditional_config
+async def get_clients():
+    return await paged_listing(configapp.clients_query)
+
+
+@conditional_config
+async def get_client_details():
+    return await paged_listing(lambda page: configapp.client_details_query(
+        configapp.projection("client_details", "d"), page
+    ))
+
+
+@conditional_config
+async def get_notification_configs():
+    return await paged_listing(lambda page: configapp.notification_configs_query(
+        configapp.projection("notificationconfiguration", "n"), page
+    ))
+
+
+async def login():
+    try:
+        data = request.get_json(force=True)
+        username = data.get("username", "").strip()
+        password = data.get("password", "").strip()
+
+        user = await pools.query(
+            pools.config, configapp.USER_BY_LOGIN_SQL, (username, username), one=True
+        )
+        return configapp.login_response(user, password)
+    except Exception:
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": "Login failed"}), 500
+
+
+async def register():
+    try:
+        data = request.get_json(force=True)
+        username = data.get("username", "").strip()
+        email = data.get("email", "").strip()
+        password = data.get("password", "").strip()
+
+        if not username or not email or not password:
+            return jsonify({"ok": False, "error": "All fields required"}), 400
+
+        # Check existing
+        sql, params = configapp.user_exists_query((username, email))
+        if await pools.query(pools.config, sql, params, one=True):
+            return jsonify({"ok": False, "error": "User already exists"}), 400
+
+        await pools.query(
+            pools.config,
+            configapp.INSERT_USER_SQL,
+            (username, email, configapp.sha256(password)),
+        )
+        return jsonify({"ok": True, "message": "Account created successfully"})
+    except Exception:
+        traceback.print_exc()
+        return jsonify({"ok": False, "error": "Registration failed"}), 500
+
+
+async def profile():
+    claims = configapp.session_claims()
+    user = None
+    if claims is not None:
+        user = configapp.user_cache.get(claims["uid"])
+        if user is None:
+            try:
+                user = await pools.query(
+                    pools.config, configapp.USER_BY_ID_SQL, (claims["uid"],), one=True
+                )
+            except Exception:
+                traceback.print_exc()
+            if user is not None:
+                configapp.user_cache.put(user)
+
+    if not user:
+        return jsonify({"ok": False, "error": "Unauthorized"}), 401
+    return jsonify({"ok": True, "user": user})
+
+
+# (method, path) -> coroutine view; anything else is handed to Flask
+ASYNC_ROUTES = {
+    ("GET", "/api/lastupdated"): last_updated,
+    ("GET", "/api/clients"): get_clients,
+    ("GET", "/api/client-details"): get_client_details,
+    ("GET", "/api/notification-configs"): get_notification_configs,
+    ("POST", "/api/auth/login"): login,
+    ("POST", "/api/auth/register"): register,
+    ("GET", "/api/user/profile"): profile,
+}
+
+
+# =====================================================
+# ASGI APPLICATION
+# =====================================================
+def build_environ(scope, body):
+    """Minimal WSGI environ for an ASGI http scope, so Flask can parse it."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        if name == "CONTENT_LENGTH":
+            continue
+        key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+class ConfigPageASGI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=WSGI_THREADS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+
+        view = None
+        if scope["type"] == "http":
+            view = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+        if view is None:
+            await self.wsgi(scope, receive, send)
+            return
+
+        environ = build_environ(scope, await read_body(receive))
+        with self.flask_app.request_context(environ):
+            try:
+                resp = self.flask_app.make_response(await view())
+            except Exception as e:
+                traceback.print_exc()
+                resp = make_response(jsonify({"ok": False, "error": str(e)}), 500)
+            # CORS headers and compression, as for every Flask response
+            resp = self.flask_app.process_response(resp)
+            body = resp.get_data()
+
+        await send({
+            "type": "http.response.start",
+            "status": resp.status_code,
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in resp.headers.items()
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await asyncio.to_thread(configapp.init_db)
+                    configapp.static_assets.load()
+                    await pools.open()
+                    freshness_cache.start()
+                    configapp.freshness_cache = LoopFreshnessCache(
+                        freshness_cache, asyncio.get_running_loop()
+                    )
+                    print(
+                        f"✔ async pools ready: config={ASYNC_DB_POOL_SIZE}, "
+                        f"dashboard={ASYNC_DASHBOARD_POOL_SIZE} ({configapp.APP_ENV})"
+                    )
+                except Exception as e:
+                    traceback.print_exc()
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await freshness_cache.stop()
+                await pools.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+application = ConfigPageASGI(app)
+
+
+# =====================================================
+# RUN SERVER
+# =====================================================
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(application, host="0.0.0.0", port=5000)
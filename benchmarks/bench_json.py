@@ -0,0 +1,77 @@
+"""
+Encode-time micro-benchmark for the /api JSON payloads.
+
+Builds rows shaped like `cursor(dictionary=True)` results from
+client_details / notificationconfiguration (every column in
+DESIRED_COLUMNS plus an id, a DATETIME and a DECIMAL) and times:
+
+  - stdlib json with Flask's default provider settings
+  - FastJSONProvider on the stdlib fallback
+  - FastJSONProvider on orjson (if installed)
+
+Usage: python benchmarks/bench_json.py [rows] [repeat]
+"""
+import datetime
+import decimal
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app as configapp  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+
+def sample_rows(count):
+    columns = (
+        configapp.DESIRED_COLUMNS["client_details"]
+        + configapp.DESIRED_COLUMNS["notificationconfiguration"]
+    )
+    rows = []
+    for i in range(count):
+        row = {"id": i + 1, "clientId": i + 1}
+        for name, column_type, default in columns:
+            if name == "clientName":
+                row[name] = f"Client {i:04d}"
+            elif default is None:
+                row[name] = "" if "VARCHAR" in column_type else None
+            else:
+                row[name] = default
+        row["updatedTime"] = datetime.datetime(2026, 1, 1) + datetime.timedelta(minutes=i)
+        row["ratio"] = decimal.Decimal("0.75")
+        rows.append(row)
+    return rows
+
+
+def bench(label, fn, repeat):
+    best = min(timeit.repeat(fn, number=1, repeat=repeat))
+    print(f"{label:<34} {best * 1000:8.2f} ms")
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rows = sample_rows(count)
+    print(f"{count} rows x {len(rows[0])} columns, best of {repeat}\n")
+
+    flask_default = DefaultJSONProvider(configapp.app)
+    fast = configapp.FastJSONProvider(configapp.app)
+    orjson = configapp.orjson
+
+    base = bench("flask default (stdlib json)", lambda: flask_default.dumps(rows), repeat)
+
+    configapp.orjson = None
+    bench("FastJSONProvider (stdlib fallback)", lambda: fast.dumps(rows), repeat)
+    configapp.orjson = orjson
+
+    if orjson is not None:
+        best = bench("FastJSONProvider (orjson)", lambda: fast.dumps(rows), repeat)
+        print(f"\norjson speed-up vs flask default: {base / best:.1f}x")
+    else:
+        print("\norjson not installed; pip install orjson to compare")
+
+
+if __name__ == "__main__":
+    main()
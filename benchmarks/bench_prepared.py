@@ -0,0 +1,112 @@
+"""
+Text protocol vs server-side prepared statements for the hot lookups.
+
+Runs each statement below `iterations` times on one pooled config DB
+connection (TEST_DB), first through a plain cursor (MySQL parses the SQL
+on every call), then through PooledConnection.prepared with
+prepare_statements on (parsed once, executed with the binary protocol).
+Prints the per-call latency plus the server's Com_stmt_* counters. The
+pure-Python connector sends COM_STMT_RESET before every execute, so the
+prepared path costs two round trips per call; against a remote server
+that can outweigh the parse saving. Set DB_PREPARED_STATEMENTS=1 only if
+the "saving" column comes out positive for your setup.
+
+  - USER_BY_LOGIN_SQL      get_user / login
+  - USER_BY_USERNAME_SQL   get_user_by_username
+  - USER_BY_ID_SQL         get_current_user on a cache miss
+  - CLIENT_BY_ID_SQL       GET /api/client/<id>
+  - CLIENT_CONFIG_SQL      GET /api/client/<id>/config
+  - CLIENT_NAME_BY_ID_SQL  delete / PATCH name lookup
+
+Needs a reachable config database with the schema created (run the app
+once). Usage: python benchmarks/bench_prepared.py [iterations] [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app as configapp  # noqa: E402
+
+
+def stmt_counters(conn):
+    cur = conn.cursor()
+    cur.execute("SHOW SESSION STATUS LIKE 'Com_stmt_%'")
+    counters = {name: int(value) for name, value in cur.fetchall()}
+    cur.close()
+    return counters
+
+
+def sample_params(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT id, clientName FROM clientappdetails ORDER BY id LIMIT 1")
+    client = cur.fetchone() or (1, "")
+    cur.execute("SELECT id, username FROM users ORDER BY id LIMIT 1")
+    user = cur.fetchone() or (1, "admin")
+    cur.close()
+    return [
+        ("USER_BY_LOGIN_SQL", (user[1], user[1])),
+        ("USER_BY_USERNAME_SQL", (user[1],)),
+        ("USER_BY_ID_SQL", (user[0],)),
+        ("CLIENT_BY_ID_SQL", (client[0],)),
+        ("CLIENT_CONFIG_SQL", (client[0],)),
+        ("CLIENT_NAME_BY_ID_SQL", (client[0],)),
+    ]
+
+
+def text_call(conn, sql, params):
+    def run():
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        cur.fetchall()
+        cur.close()
+    return run
+
+
+def prepared_call(conn, sql, params):
+    def run():
+        conn.prepared(sql, params).fetchall()
+    return run
+
+
+def bench(conn, fn, iterations, repeat):
+    fn()  # warm-up; for prepared this is the one PREPARE
+    before = stmt_counters(conn)
+    best = min(timeit.repeat(fn, number=iterations, repeat=repeat))
+    after = stmt_counters(conn)
+    delta = {name: after[name] - before.get(name, 0) for name in after}
+    return best / iterations * 1e6, delta
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    pool = configapp.config_pool
+    pool.prepare_statements = True
+    conn = pool.acquire()
+    try:
+        statements = sample_params(conn)
+        print(f"{iterations} calls per run, best of {repeat}, µs per call\n")
+        print(f"{'statement':<24} {'text':>9} {'prepared':>9} {'saving':>8}  server")
+
+        for name, params in statements:
+            sql = getattr(configapp, name)
+            text_us, _ = bench(conn, text_call(conn, sql, params), iterations, repeat)
+            prep_us, delta = bench(conn, prepared_call(conn, sql, params), iterations, repeat)
+            saving = (text_us - prep_us) / text_us * 100
+            print(
+                f"{name:<24} {text_us:9.1f} {prep_us:9.1f} {saving:7.1f}%  "
+                f"prepare={delta.get('Com_stmt_prepare', 0)} "
+                f"execute={delta.get('Com_stmt_execute', 0)} "
+                f"reset={delta.get('Com_stmt_reset', 0)}"
+            )
+    finally:
+        pool.release(conn, discard=True)
+
+    print("\nprepare=0 in the prepared runs: each statement was parsed once, in warm-up")
+
+
+if __name__ == "__main__":
+    main()
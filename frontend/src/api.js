@@ -113,29 +113,114 @@ export const fetchNotificationConfigs = () =>
 export const fetchClientDefaults = () =>
   safeRequest("/client-defaults");
 
+// ClientList in one round trip: { clients, clientDetails, notificationConfigs }
+export const fetchClientBundle = () =>
+  safeRequest("/client-bundle");
+
+// Keyset pages: { items, nextCursor } – pass nextCursor back as `after`
+const pageQuery = (limit, after) =>
+  `?limit=${limit}${after ? `&after=${encodeURIComponent(after)}` : ""}`;
+
+export const fetchClientsPage = (limit, after) =>
+  safeRequest(`/clients${pageQuery(limit, after)}`);
+
+export const fetchClientDetailsPage = (limit, after) =>
+  safeRequest(`/client-details${pageQuery(limit, after)}`);
+
+export const fetchNotificationConfigsPage = (limit, after) =>
+  safeRequest(`/notification-configs${pageQuery(limit, after)}`);
+
+export const fetchClientBundlePage = (limit, after) =>
+  safeRequest(`/client-bundle${pageQuery(limit, after)}`);
+
+// =====================================================
+// EXPORT – CSV / XLSX streamed by the server
+// =====================================================
+export const exportUrl = (path, params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(
+      ([, v]) => v !== undefined && v !== null && v !== ""
+    )
+  );
+  return `${API_BASE}/export/${path}?${query}`;
+};
+
+// Plain link click: the browser downloads the stream straight to disk
+export const downloadExport = (path, params) => {
+  const link = document.createElement("a");
+  link.href = exportUrl(path, params);
+  link.click();
+};
+
+// Same download, but the params go in a POSTed form: for parameters too
+// long for a URL (the ids of every row on screen)
+export const postExport = (path, params = {}) => {
+  const form = document.createElement("form");
+  form.method = "POST";
+  form.action = `${API_BASE}/export/${path}`;
+  form.style.display = "none";
+  Object.entries(params).forEach(([name, value]) => {
+    if (value === undefined || value === null || value === "") return;
+    const input = document.createElement("input");
+    input.type = "hidden";
+    input.name = name;
+    input.value = value;
+    form.appendChild(input);
+  });
+  document.body.appendChild(form);
+  form.submit();
+  form.remove();
+};
+
 // =====================================================
 // CLIENT CRUD
 // =====================================================
 export const getClient = (id) =>
   safeRequest(`/client/${id}`);
 
+// Full rows of all three tables for one client (EditClient)
+export const getClientConfig = (id) =>
+  safeRequest(`/client/${id}/config`);
+
 export const createClient = (data) =>
   safeRequest("/create-client", {
     method: "POST",
     body: JSON.stringify(data),
   });
 
+// Bulk create: array of client objects -> { ok, imported, rows: [...] }
+export const importClients = (clients, dryRun = false) =>
+  safeRequest(`/import-clients${dryRun ? "?dryRun=1" : ""}`, {
+    method: "POST",
+    body: JSON.stringify(clients),
+  });
+
 export const updateClient = (id, data) =>
   safeRequest(`/update-client/${id}`, {
     method: "PUT",
     body: JSON.stringify(data),
   });
 
+// Sparse update: only the given fields are written
+export const patchClient = (id, changes) =>
+  safeRequest(`/update-client/${id}`, {
+    method: "PATCH",
+    body: JSON.stringify(changes),
+  });
+
 export const deleteClient = (id) =>
   safeRequest(`/delete-client/${id}`, {
     method: "DELETE",
   });
 
+// Mixed create/update/delete in one transaction
+// mode: "atomic" (all or nothing) or "best-effort"
+export const batchClients = (operations, mode = "atomic") =>
+  safeRequest("/batch-clients", {
+    method: "POST",
+    body: JSON.stringify({ mode, operations }),
+  });
+
 // =====================================================
 // HEALTH CHECK
 // =====================================================
@@ -1,21 +1,16 @@
 // Final rewritten ClientList component with proper export ordering, Excel/CSV fixed, and PDF removed
 // (Full code provided as requested)
 
-import React, { useEffect, useState, useCallback } from "react";
+import React, { useEffect, useState, useCallback, useRef } from "react";
 import "../sticky.css";
 import "../App.css";
-import {
-  fetchClients,
-  fetchClientDetails,
-  fetchNotificationConfigs,
-  deleteClient,
-} from "../api";
+import { fetchClientBundlePage, deleteClient, postExport } from "../api";
 
 import FullClientTable from "../components/FullClientTable";
 import ClientDetailsTable from "../components/ClientDetailsTable";
 import NotificationConfigTable from "../components/NotificationConfigTable";
 
-import * as XLSX from "xlsx";
+const PAGE_SIZE = 100;
 
 export default function ClientList() {
   const [clients, setClients] = useState([]);
@@ -23,6 +18,7 @@ export default function ClientList() {
   const [notificationRows, setNotificationRows] = useState([]);
 
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [errorMsg, setErrorMsg] = useState("");
 
   const [activeTab, setActiveTab] = useState("app");
@@ -33,44 +29,50 @@ export default function ClientList() {
 
   const [showExportMenu, setShowExportMenu] = useState(false);
 
-  // Loaders
-  const loadClients = useCallback(async () => {
-    try {
-      const data = await fetchClients();
-      setClients(Array.isArray(data) ? data : []);
-    } catch {
-      setClients([]);
-    }
-  }, []);
+  // Loader: the bundle (all three tables) comes in keyset pages of
+  // clients. The first page renders at once and the rest are appended in
+  // the background, so search, sort and export cover every client once
+  // `loadingMore` clears.
+  const loadGeneration = useRef(0);
 
-  const loadClientDetails = useCallback(async () => {
-    try {
-      const data = await fetchClientDetails();
-      setClientDetails(Array.isArray(data) ? data : []);
-    } catch {
-      setClientDetails([]);
-    }
-  }, []);
+  const loadAll = useCallback(async () => {
+    const generation = ++loadGeneration.current;
+    setLoading(true);
+    setLoadingMore(true);
+    setErrorMsg("");
 
-  const loadNotificationConfigs = useCallback(async () => {
+    const rowsOf = (list) => (Array.isArray(list) ? list : []);
+    let after = null;
+    let first = true;
     try {
-      const data = await fetchNotificationConfigs();
-      setNotificationRows(Array.isArray(data) ? data : []);
+      do {
+        const page = await fetchClientBundlePage(PAGE_SIZE, after);
+        if (generation !== loadGeneration.current) return;
+        const replace = first;
+        const append = (rows) => (prev) => (replace ? rows : [...prev, ...rows]);
+        setClients(append(rowsOf(page?.clients)));
+        setClientDetails(append(rowsOf(page?.clientDetails)));
+        setNotificationRows(append(rowsOf(page?.notificationConfigs)));
+        if (first) {
+          first = false;
+          setLoading(false);
+        }
+        after = page?.nextCursor || null;
+      } while (after);
     } catch {
-      setNotificationRows([]);
+      if (generation !== loadGeneration.current) return;
+      if (first) {
+        setClients([]);
+        setClientDetails([]);
+        setNotificationRows([]);
+        setLoading(false);
+      } else {
+        setErrorMsg("Some clients could not be loaded. Reload to try again.");
+      }
     }
+    setLoadingMore(false);
   }, []);
 
-  const loadAll = useCallback(async () => {
-    setLoading(true);
-    await Promise.all([
-      loadClients(),
-      loadClientDetails(),
-      loadNotificationConfigs(),
-    ]);
-    setLoading(false);
-  }, [loadClients, loadClientDetails, loadNotificationConfigs]);
-
   useEffect(() => {
     loadAll();
   }, [loadAll]);
@@ -137,7 +139,7 @@ export default function ClientList() {
   // Export structure for ordering
   const exportStructure = {
     app: {
-      fileName: "client_app_details",
+      table: "clientappdetails",
       cols: [
         "id",
         "clientName",
@@ -161,7 +163,7 @@ export default function ClientList() {
       ],
     },
     details: {
-  fileName: "client_details",
+  table: "client_details",
   cols: [
     "id",
     "clientName",
@@ -219,7 +221,7 @@ export default function ClientList() {
   ]
 },
     notif: {
-  fileName: "notification_config",
+  table: "notificationconfiguration",
   cols: [
     "id",
     "clientName",
@@ -261,53 +263,29 @@ export default function ClientList() {
   };
 
   // EXPORT FUNCTIONS
-  const getExportData = () => {
-    const rows = getActiveRows();
-    if (!rows.length) return null;
+  // The server streams the file; the ids of the rows on screen, in their
+  // on-screen order, are sent along so the download matches the table.
+  const exportActive = (format) => {
+    const activeRows = getActiveRows();
+    if (!activeRows.length) return;
 
-    const structure =
+    const { table, cols } =
       activeTab === "app"
         ? exportStructure.app
         : activeTab === "details"
         ? exportStructure.details
         : exportStructure.notif;
 
-    return { ...structure, rows };
-  };
-
-  const exportCSV = () => {
-    const data = getExportData();
-    if (!data) return;
-
-    const { cols, rows, fileName } = data;
-
-    const header = cols.join(",");
-    const body = rows
-      .map((r) => cols.map((c) => `"${String(r?.[c] ?? "").replace(/"/g, '""')}"`).join(","))
-      .join("\n");
-
-    const blob = new Blob([header + "\n" + body], { type: "text/csv" });
-    const link = document.createElement("a");
-    link.href = URL.createObjectURL(blob);
-    link.download = `${fileName}.csv`;
-    link.click();
+    postExport(table, {
+      format,
+      fields: cols.join(","),
+      ids: activeRows.map((r) => r.id).join(","),
+    });
   };
 
-  const exportExcel = () => {
-    const data = getExportData();
-    if (!data) return;
-
-    const { cols, rows, fileName } = data;
+  const exportCSV = () => exportActive("csv");
 
-    const aoa = [];
-    aoa.push(cols);
-    rows.forEach((r) => aoa.push(cols.map((c) => r?.[c] ?? "")));
-
-    const sheet = XLSX.utils.aoa_to_sheet(aoa);
-    const book = XLSX.utils.book_new();
-    XLSX.utils.book_append_sheet(book, sheet, "Data");
-    XLSX.writeFile(book, `${fileName}.xlsx`);
-  };
+  const exportExcel = () => exportActive("xlsx");
 
   if (loading) {
     return (
@@ -320,6 +298,11 @@ export default function ClientList() {
   return (
     <div className="page1">
       {errorMsg && <div className="message-box danger">{errorMsg}</div>}
+      {loadingMore && (
+        <div className="message-box">
+          <small>Loading more clients…</small>
+        </div>
+      )}
 
       <div style={styles.topBar}>
         <div style={styles.searchWrapper}>
@@ -359,9 +342,11 @@ export default function ClientList() {
         <div style={{ position: "relative" }}>
           <button
             className="btn primary"
+            disabled={loadingMore}
+            title={loadingMore ? "Still loading clients…" : undefined}
             onClick={() => setShowExportMenu(!showExportMenu)}
           >
-            Export ▾
+            {loadingMore ? "Loading…" : "Export ▾"}
           </button>
 
           {showExportMenu && (
@@ -5,11 +5,9 @@
 import React, { useEffect, useState, useCallback } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import {
-  getClient,
-  fetchClientDetails,
-  fetchNotificationConfigs,
+  getClientConfig,
   fetchClientDefaults,   // ⭐ important
-  updateClient,
+  patchClient,
 } from "../api";
 import "../App.css";
 
@@ -17,6 +15,13 @@ import "../App.css";
 // EMPTY BASE FORM (ALL THREE TABLE MAPPED FIELDS)
 // (also acts as fallback if /client-defaults fails)
 // -----------------------------------------------------
+// Form state -> request body (language lists go back as CSV)
+const toPayload = (form) => ({
+  ...form,
+  listOfLanguage: form.listOfLanguage.join(","),
+  listOfDisplayLanguage: form.listOfDisplayLanguage.join(","),
+});
+
 const emptyForm = {
   clientName: "",
   dbName: "",
@@ -137,6 +142,7 @@ export default function EditClient() {
 
   const [tab, setTab] = useState(1);
   const [form, setForm] = useState(emptyForm);
+  const [original, setOriginal] = useState({}); // payload as loaded
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   const [errorMsg, setErrorMsg] = useState("");
@@ -156,12 +162,10 @@ export default function EditClient() {
     setSuccessMsg("");
 
     try {
-      // 1) Load backend defaults + DB data in parallel
-      const [defaultsRes, base, details, notifs] = await Promise.all([
+      // 1) Load backend defaults + this client's rows in parallel
+      const [defaultsRes, config] = await Promise.all([
         fetchClientDefaults(), // { ok, client_details, client_appdetails, notification_config }
-        getClient(id),
-        fetchClientDetails(),
-        fetchNotificationConfigs(),
+        getClientConfig(id),   // same keys, this client's full rows
       ]);
 
       // ----------------- BACKEND DEFAULTS -----------------
@@ -183,11 +187,9 @@ export default function EditClient() {
       }
 
       // ----------------- DB ROWS FOR THIS CLIENT -----------------
-      const matchId = String(id);
-      const detailRow =
-        details?.find((d) => String(d.clientId) === matchId) || {};
-      const notifRow =
-        notifs?.find((n) => String(n.clientId) === matchId) || {};
+      const detailRow = config?.client_details || {};
+      const notifRow = config?.notification_config || {};
+      const base = config?.client_appdetails || {};
 
       // ----------------- FINAL MERGE ORDER -----------------
       let merged = {
@@ -215,6 +217,7 @@ export default function EditClient() {
       );
 
       setForm(merged);
+      setOriginal(toPayload(merged));
     } catch (err) {
       console.error(err);
       setErrorMsg(err.message || "Failed to load client data");
@@ -276,13 +279,15 @@ export default function EditClient() {
     setSuccessMsg("");
 
     try {
-      const payload = {
-        ...form,
-        listOfLanguage: form.listOfLanguage.join(","),
-        listOfDisplayLanguage: form.listOfDisplayLanguage.join(","),
-      };
+      // Only send what changed, so untouched fields keep their values
+      const payload = toPayload(form);
+      const changes = Object.fromEntries(
+        Object.entries(payload).filter(
+          ([k, v]) => String(v ?? "") !== String(original[k] ?? "")
+        )
+      );
 
-      const res = await updateClient(id, payload);
+      const res = await patchClient(id, changes);
 
       if (res?.error) {
         setErrorMsg(res.error);
@@ -5,8 +5,7 @@
 // =====================================================
 
 import React, { useEffect, useState } from "react";
-import * as XLSX from "xlsx";
-import { fetchLastUpdated } from "../api";
+import { fetchLastUpdated, downloadExport } from "../api";
 import "../styles/Home.css";
 
 // -----------------------------------------------
@@ -65,6 +64,7 @@ export default function Home() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [selectedClient, setSelectedClient] = useState("All Clients");
+  const [period, setPeriod] = useState(null);
 
   // ------------------------------------------------
   // LOAD UNION DASHBOARD (YEAR + MONTH ONLY)
@@ -78,6 +78,7 @@ export default function Home() {
 
         const data = await fetchLastUpdated(year, month);
         setRows(Array.isArray(data) ? data : []);
+        setPeriod({ year, month });
       } catch (e) {
         console.error(e);
         setError("Failed to load dashboard data");
@@ -106,26 +107,15 @@ export default function Home() {
   // EXPORT TO EXCEL
   // -----------------------------------------------
   function handleExportExcel() {
-    if (!filteredRows.length) return;
-
-    const excelData = filteredRows.map(r => ({
-      ClientName: r.clientName,
-      CurrentTime: formatDate(r.currentTime),
-      DeviceStatus: formatDate(r.deviceStatusLastUpdated),
-      PeopleCount: formatDate(r.peopleLastUpdated),
-      Analytics: formatDate(r.analyticsLastUpdated),
-      Flight: formatDate(r.flightLastUpdated),
-      Traffic: formatDate(r.trafficLastUpdated),
-    }));
-
-    const ws = XLSX.utils.json_to_sheet(excelData);
-    const wb = XLSX.utils.book_new();
-    XLSX.utils.book_append_sheet(wb, ws, "Dashboard");
-
-    XLSX.writeFile(
-      wb,
-      `dashboard_${selectedClient.replace(/\s+/g, "_")}.xlsx`
-    );
+    if (!filteredRows.length || !period) return;
+
+    // The period the rows on screen were loaded for, not today's
+    downloadExport("lastupdated", {
+      format: "xlsx",
+      year: period.year,
+      month: period.month,
+      client: selectedClient === "All Clients" ? undefined : selectedClient,
+    });
   }
 
   // -----------------------------------------------
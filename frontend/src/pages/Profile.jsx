@@ -78,6 +78,8 @@ export default function Profile() {
       } else {
         setSuccessMsg("Profile updated successfully");
         localStorage.setItem("user", JSON.stringify(data.user));
+        // username is part of the session token, so the server re-issues it
+        if (data.token) localStorage.setItem("token", data.token);
       }
     } catch (e) {
       setError("Network error. Please try again.");
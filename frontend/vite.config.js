@@ -17,12 +17,16 @@ export default defineConfig({
     assetsDir: "assets",
     emptyOutDir: true,
     sourcemap: false,
+    // dist/.vite/manifest.json: app.py serves only the files listed
+    // there as immutable
+    manifest: true,
 
     rollupOptions: {
       output: {
         // ✅ ALL JS FILES DIRECTLY IN assets/
-        entryFileNames: "assets/[name].js",
-        chunkFileNames: "assets/[name].js",
+        // ✅ Content hash in the name → served with immutable caching
+        entryFileNames: "assets/[name]-[hash].js",
+        chunkFileNames: "assets/[name]-[hash].js",
 
         // ✅ CSS directly in assets/
         // ✅ Images inside assets/images/
@@ -30,11 +34,11 @@ export default defineConfig({
           const ext = assetInfo.name?.split(".").pop();
 
           if (["png", "jpg", "jpeg", "svg", "gif", "webp"].includes(ext)) {
-            return "assets/images/[name][extname]";
+            return "assets/images/[name]-[hash][extname]";
           }
 
           // CSS & others stay flat
-          return "assets/[name][extname]";
+          return "assets/[name]-[hash][extname]";
         },
 
         // ✅ SAME CHUNK LOGIC (UNCHANGED)
@@ -42,7 +46,6 @@ export default defineConfig({
           // Vendor libraries
           if (id.includes("node_modules")) {
             if (id.includes("react")) return "vendor-react";
-            if (id.includes("xlsx")) return "vendor-xlsx";
             return "vendor";
           }
 
@@ -0,0 +1,129 @@
+"""
+Shared fixtures: a fake mysql.connector connection that records what it
+is sent, and a real ConnectionPool (installed as app.config_pool) that
+opens those fakes instead of talking to MySQL.
+"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app as configapp  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, conn, dictionary=False, prepared=False):
+        self.conn = conn
+        self.dictionary = dictionary
+        self.prepared = prepared
+        self.rows = []
+        self.closed = False
+
+    def execute(self, sql, params=()):
+        self.conn.statements.append((sql, tuple(params or ())))
+        self.conn.in_transaction = True
+        self.rows = list(self.conn.respond(sql, tuple(params or ())) or [])
+
+    def executemany(self, sql, seq):
+        for params in seq:
+            self.execute(sql, params)
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    """Enough of MySQLConnection for the pool and the routes."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.statements = []
+        self.in_transaction = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+        self.ping_fails = False
+
+    def cursor(self, dictionary=False, prepared=False, **kwargs):
+        return FakeCursor(self, dictionary=dictionary, prepared=prepared)
+
+    def start_transaction(self, **options):
+        self.transaction_options = options
+        self.in_transaction = True
+
+    def commit(self):
+        self.commits += 1
+        self.in_transaction = False
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def ping(self, reconnect=False):
+        if self.ping_fails:
+            raise configapp.mysql.connector.errors.OperationalError("gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeMySQL:
+    """
+    Stands in for mysql.connector.connect. `respond(sql, params)` returns
+    the rows for each statement; every connection opened is kept.
+    """
+
+    def __init__(self):
+        self.connections = []
+        self.respond = lambda sql, params: []
+
+    def connect(self, **config):
+        conn = FakeConnection(lambda sql, params: self.respond(sql, params))
+        self.connections.append(conn)
+        return conn
+
+    @property
+    def statements(self):
+        return [s for conn in self.connections for s in conn.statements]
+
+
+@pytest.fixture
+def fake_mysql(monkeypatch):
+    fake = FakeMySQL()
+    monkeypatch.setattr(configapp.mysql.connector, "connect", fake.connect)
+    return fake
+
+
+@pytest.fixture
+def pool(fake_mysql, monkeypatch):
+    """A small real pool on fake connections, used by connect()."""
+    pool = configapp.ConnectionPool("test", {}, size=2, timeout=0.2, prepare_statements=False)
+    monkeypatch.setattr(configapp, "config_pool", pool)
+    return pool
+
+
+@pytest.fixture
+def client():
+    return configapp.app.test_client()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """freshness_registry fixed to the seed dbNames, never reloaded."""
+    registry = configapp.FreshnessRegistry(ttl=3600)
+    registry._sources = {
+        name: configapp.sources_for_db(name) for name in configapp.FRESHNESS_SEED_DBNAMES
+    }
+    registry._loaded_at = time.time()
+    monkeypatch.setattr(configapp, "freshness_registry", registry)
+    return registry
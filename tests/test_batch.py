@@ -0,0 +1,106 @@
+import pytest
+
+import app as configapp
+
+CLIENTS = {1: "PHL", 2: "PIT"}
+
+
+@pytest.fixture
+def db(pool, fake_mysql):
+    """Database holding CLIENTS; statements land in fake_mysql.statements."""
+    by_name = {name.lower(): name for name in CLIENTS.values()}
+
+    def respond(sql, params):
+        if sql.startswith("SELECT id, clientName"):
+            return [(int(p), CLIENTS[int(p)]) for p in params if int(p) in CLIENTS]
+        if sql.startswith("SELECT clientName"):
+            return [(by_name[p.lower()],) for p in params if p.lower() in by_name]
+        return []
+
+    fake_mysql.respond = respond
+    return fake_mysql
+
+
+def writes(fake_mysql):
+    return [
+        (sql, params) for sql, params in fake_mysql.statements
+        if sql.split()[0] in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+def batch(client, operations, mode="atomic"):
+    return client.post("/api/batch-clients", json={"mode": mode, "operations": operations})
+
+
+def test_atomic_batch_with_invalid_op_applies_nothing(client, db):
+    resp = batch(client, [
+        {"op": "update", "id": 1, "data": {"heatMapEnabled": "True"}},
+        {"op": "update", "id": 99, "data": {"heatMapEnabled": "True"}},
+        {"op": "create", "data": {"clientName": "NEW", "soapShots": "lots"}},
+    ])
+    body = resp.get_json()
+    assert resp.status_code == 400
+    assert body["applied"] == 0
+    assert [r["error"] for r in body["results"][1:]] == [
+        "Client not found",
+        "soapShots: must be an integer",
+    ]
+    assert writes(db) == []
+    assert db.connections[0].rollbacks >= 1
+
+
+def test_best_effort_skips_invalid_ops(client, db):
+    resp = batch(client, [
+        {"op": "update", "id": 1, "data": {"heatMapEnabled": "True"}},
+        {"op": "delete", "clientName": "nowhere"},
+    ], mode="best-effort")
+    body = resp.get_json()
+    assert body["applied"] == 1
+    assert body["results"][1]["error"] == "Client not found"
+    assert [sql for sql, _ in writes(db)] == [
+        "UPDATE `client_details` SET `heatMapEnabled`=%s WHERE clientName IN (%s)"
+    ]
+
+
+def test_identical_updates_are_grouped(client, db):
+    resp = batch(client, [
+        {"op": "update", "id": 1, "data": {"heatMapEnabled": "True"}},
+        {"op": "update", "clientName": "pit", "data": {"heatMapEnabled": "True"}},
+    ])
+    assert resp.get_json()["applied"] == 2
+    assert writes(db) == [(
+        "UPDATE `client_details` SET `heatMapEnabled`=%s WHERE clientName IN (%s,%s)",
+        ("True", "PHL", "PIT"),
+    )]
+    assert db.connections[0].commits == 1
+
+
+def test_client_in_two_operations_is_rejected(client, db):
+    resp = batch(client, [
+        {"op": "update", "id": 1, "data": {"heatMapEnabled": "True"}},
+        {"op": "delete", "clientName": "PHL"},
+    ])
+    assert resp.status_code == 400
+    assert resp.get_json()["results"][1]["error"] == "client is also in operation 0"
+
+
+def test_create_of_existing_client_is_rejected(client, db):
+    resp = batch(client, [{"op": "create", "data": {"clientName": "phl"}}])
+    assert resp.get_json()["results"][0]["error"] == "client already exists"
+
+
+@pytest.mark.parametrize("body, error", [
+    ({}, 'expected {"operations": [...]}'),
+    ({"operations": []}, "no operations"),
+    ({"operations": [{"op": "noop"}], "mode": "eventually"}, "mode must be atomic or best-effort"),
+])
+def test_malformed_batches(client, db, body, error):
+    resp = client.post("/api/batch-clients", json=body)
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == error
+
+
+def test_batch_size_limit(client, db, monkeypatch):
+    monkeypatch.setattr(configapp, "BATCH_MAX_OPERATIONS", 1)
+    resp = batch(client, [{"op": "delete", "id": 1}, {"op": "delete", "id": 2}])
+    assert resp.status_code == 400
@@ -0,0 +1,69 @@
+import app as configapp
+
+
+def app_row(i, name):
+    return {"id": i, "clientName": name, "headerText": f"H{i}"}
+
+
+def test_tables_are_joined_in_memory_by_client_name():
+    apps = [app_row(2, "PHL"), app_row(1, "pit")]
+    details = [{"id": 20, "clientName": "phl", "dbName": "phl", "baseClient": "PHL"}]
+    notifs = [
+        {"id": 30, "clientName": "PHL", "push": "True", "trashThreshold": "5"},
+        {"id": 31, "clientName": "Orphan", "push": "False"},
+    ]
+
+    bundle = configapp.build_client_bundle(apps, details, notifs)
+
+    phl, pit = bundle["clients"]
+    assert phl["id"] == 2 and phl["dbName"] == "phl" and phl["push"] == "True"
+    assert phl["trashThreshold"] == "5" and phl["headerText"] == "H2"
+    assert pit["dbName"] is None and pit["push"] is None  # LEFT JOIN misses
+    assert [d["clientId"] for d in bundle["clientDetails"]] == [2]
+    assert [n["clientId"] for n in bundle["notificationConfigs"]] == [2, None]
+
+
+def test_duplicate_join_rows_collapse_like_select_distinct():
+    apps = [app_row(1, "PHL")]
+    details = [{"id": 10, "clientName": "PHL", "dbName": "phl", "baseClient": None}] * 2
+
+    bundle = configapp.build_client_bundle(apps, details, [])
+
+    assert len(bundle["clients"]) == 1
+    assert len(bundle["clientDetails"]) == 2
+
+
+def test_route_reads_one_snapshot_on_one_connection(pool, client, fake_mysql):
+    def respond(sql, params):
+        if "clientappdetails" in sql:
+            return [app_row(1, "PHL")]
+        if "client_details" in sql:
+            return [{"id": 10, "clientName": "PHL", "dbName": "phl", "baseClient": None}]
+        return []
+    fake_mysql.respond = respond
+
+    body = client.get("/api/client-bundle").get_json()
+
+    assert body["clients"][0]["dbName"] == "phl"
+    assert body["clientDetails"][0]["clientId"] == 1
+    assert body["notificationConfigs"] == []
+    assert len(fake_mysql.connections) == 1
+    conn = fake_mysql.connections[0]
+    assert conn.transaction_options == {"consistent_snapshot": True, "readonly": True}
+    assert len(conn.statements) == 3 and conn.commits == 1
+
+
+def test_paged_bundle_only_reads_the_page_clients(pool, client, fake_mysql):
+    def respond(sql, params):
+        if "clientappdetails" in sql:
+            return [app_row(9, "A"), app_row(8, "B"), app_row(7, "C")]
+        return []
+    fake_mysql.respond = respond
+
+    body = client.get("/api/client-bundle?limit=2").get_json()
+
+    assert [c["id"] for c in body["clients"]] == [9, 8]
+    assert body["nextCursor"] == "8"
+    detail_sql, detail_params = fake_mysql.statements[1]
+    assert "WHERE clientName IN (%s,%s)" in detail_sql
+    assert detail_params == ("A", "B")
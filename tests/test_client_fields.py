@@ -0,0 +1,113 @@
+import pytest
+
+import app as configapp
+
+
+# ---- client_values: defaults ----
+
+def test_missing_fields_take_their_defaults():
+    values, errors = configapp.client_values({"clientName": "PHL"})
+
+    assert errors == []
+    assert set(values) == set(configapp.FIELDS_BY_NAME)
+    assert values["soapShots"] == 1000
+    assert values["trafficSensor"] == "PeopleCount"
+    assert values["listOfLanguage"] == configapp.DEFAULT_LANG_LIST
+
+
+def test_null_takes_the_default():
+    values, errors = configapp.client_values({"clientName": "PHL", "soapShots": None})
+    assert errors == []
+    assert values["soapShots"] == 1000
+
+
+def test_blank_fields_default_empty_values_but_others_keep_them():
+    values, _ = configapp.client_values(
+        {"clientName": "PHL", "menuColor": "", "mobileHeaderColor": ""}
+    )
+    assert values["menuColor"] == "#141b4d"  # blank=True
+    assert values["mobileHeaderColor"] == ""
+
+
+def test_names_are_trimmed_and_dbname_falls_back_to_base_client():
+    values, _ = configapp.client_values({"clientName": "  PHL ", "baseClient": " phl "})
+    assert values["clientName"] == "PHL"
+    assert values["baseClient"] == "phl"
+    assert values["dbName"] == "phl"
+
+    values, _ = configapp.client_values({"clientName": "PHL", "baseClient": "phl", "dbName": "phl2"})
+    assert values["dbName"] == "phl2"
+
+
+def test_unknown_keys_are_ignored():
+    values, errors = configapp.client_values({"clientName": "PHL", "bogus": 1})
+    assert errors == []
+    assert "bogus" not in values
+
+
+# ---- client_values: coercion ----
+
+def test_values_are_coerced_to_their_column_type():
+    values, errors = configapp.client_values(
+        {"clientName": "PHL", "soapShots": " 500 ", "pumpPercentage": 80.0, "labelFlag": 3}
+    )
+    assert errors == []
+    assert values["soapShots"] == 500
+    assert values["pumpPercentage"] == 80
+    assert values["labelFlag"] == "3"
+
+
+def test_coercion_errors_are_collected_per_field():
+    values, errors = configapp.client_values(
+        {
+            "clientName": "PHL",
+            "soapShots": "lots",
+            "typicalHighValue": True,
+            "trafficSensor": "x" * 46,
+            "language": 0.5,
+        }
+    )
+
+    assert sorted(errors) == [
+        "language: must be text, not a number",
+        "soapShots: must be an integer",
+        "trafficSensor: longer than 45 characters",
+        "typicalHighValue: must be an integer",
+    ]
+    # A bad field falls back to its default rather than going missing
+    assert values["soapShots"] == 1000
+    assert values["trafficSensor"] == "PeopleCount"
+
+
+# ---- what is derived from CLIENT_FIELDS ----
+
+@pytest.mark.parametrize("table", configapp.CLIENT_TABLES)
+def test_insert_params_follow_the_insert_columns(table):
+    values, _ = configapp.client_values({"clientName": "PHL", "baseClient": "phl"})
+    sql = configapp.INSERT_SQL[table]
+    params = configapp.INSERT_PARAMS[table](values)
+
+    columns = [f.name for f in configapp.CLIENT_FIELDS[table]]
+    assert sql.count("%s") == len(params) == len(columns)
+    assert all(f"`{c}`" in sql for c in columns)
+    assert params[0] == "PHL"
+
+
+def test_update_skips_non_updatable_columns_and_the_key():
+    sql = configapp.UPDATE_SQL["client_details"]
+    assert sql.endswith("WHERE clientName=%s")
+    assert "`soapShots`=%s" in sql
+    assert "`medianFlag`" not in sql
+    assert "`clientName`=%s" not in sql
+
+    sql = configapp.UPDATE_SQL["clientappdetails"]
+    assert sql.endswith("WHERE id=%s")
+    assert "`footerLogo`" not in sql
+    assert "`clientName`=%s" in sql
+
+
+def test_ddl_defaults_only_where_declared():
+    ddl = configapp.CREATE_TABLE_SQL["client_details"]
+    assert "`soapShots` INT DEFAULT 1000" in ddl
+    assert "`clientName` VARCHAR(255) NOT NULL," in ddl
+    assert "`baseClient` VARCHAR(100)," in ddl
@@ -0,0 +1,32 @@
+import gzip
+
+import pytest
+
+import app as configapp
+
+
+@pytest.fixture
+def big_clients(pool, fake_mysql, monkeypatch):
+    monkeypatch.setattr(configapp, "API_COMPRESS_MIN_SIZE", 64)
+    monkeypatch.setattr(configapp, "brotli", None)
+    fake_mysql.respond = lambda sql, params: [
+        {"id": i, "clientName": f"CLIENT{i}"} for i in range(50)
+    ]
+
+
+def test_large_json_is_gzipped_when_accepted(client, big_clients):
+    plain = client.get("/api/clients")
+    packed = client.get("/api/clients", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.data) == plain.data
+    assert "Accept-Encoding" in packed.headers["Vary"]
+
+
+def test_small_json_is_left_alone(client, pool, fake_mysql):
+    resp = client.get("/api/clients", headers={"Accept-Encoding": "gzip"})
+
+    assert resp.get_json() == []
+    assert "Content-Encoding" not in resp.headers
+
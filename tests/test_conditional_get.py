@@ -0,0 +1,73 @@
+import pytest
+
+import app as configapp
+
+
+@pytest.fixture
+def version(monkeypatch):
+    version = configapp.ConfigVersion()
+    monkeypatch.setattr(configapp, "config_version", version)
+    return version
+
+
+def test_defaults_carry_validators(client, version):
+    resp = client.get("/api/client-defaults")
+    assert resp.status_code == 200
+    assert resp.headers["ETag"].startswith('W/"')
+    assert resp.headers["Last-Modified"]
+    assert resp.headers["Cache-Control"] == "no-cache"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+
+
+def test_if_none_match_gets_304_with_same_validators(client, version):
+    first = client.get("/api/client-defaults")
+    resp = client.get(
+        "/api/client-defaults", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert resp.status_code == 304
+    assert resp.data == b""
+    # RFC 7232 4.1; Werkzeug drops Last-Modified from 304s itself
+    for header in ("ETag", "Cache-Control", "Vary"):
+        assert resp.headers[header] == first.headers[header]
+
+
+def test_if_modified_since_matches_the_sent_last_modified(client, version):
+    first = client.get("/api/client-defaults")
+    resp = client.get(
+        "/api/client-defaults",
+        headers={"If-Modified-Since": first.headers["Last-Modified"]},
+    )
+    assert resp.status_code == 304
+
+
+def test_bump_invalidates_both_validators(client, version):
+    first = client.get("/api/client-defaults")
+    version.bump()
+    by_etag = client.get(
+        "/api/client-defaults", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    by_date = client.get(
+        "/api/client-defaults",
+        headers={"If-Modified-Since": first.headers["Last-Modified"]},
+    )
+    assert by_etag.status_code == 200
+    assert by_date.status_code == 200
+    assert by_etag.headers["ETag"] != first.headers["ETag"]
+
+
+def test_bump_in_the_same_second_moves_last_modified(version):
+    before = int(version.modified)
+    version.bump()
+    version.bump()
+    assert int(version.modified) >= before + 2
+
+
+def test_compressed_response_still_revalidates(client, version, monkeypatch):
+    monkeypatch.setattr(configapp, "API_COMPRESS_MIN_SIZE", 1)
+    first = client.get("/api/client-defaults", headers={"Accept-Encoding": "gzip"})
+    assert first.headers.get("Content-Encoding") == "gzip"
+    resp = client.get(
+        "/api/client-defaults",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+    )
+    assert resp.status_code == 304
@@ -0,0 +1,44 @@
+import app as configapp
+
+Errors = configapp.mysql.connector.errors
+
+
+def index_responder(fail_alter=None):
+    """Every table exists and lacks the index; ALTERs on fail_alter raise."""
+    def respond(sql, params):
+        if "INFORMATION_SCHEMA.TABLES" in sql:
+            return [(1,)]
+        if "INFORMATION_SCHEMA.STATISTICS" in sql:
+            return []
+        if sql.startswith("ALTER TABLE") and fail_alter and fail_alter in sql:
+            raise Errors.ReadTimeoutError(errno=configapp.ER_QUERY_TIMEOUT)
+        return []
+    return respond
+
+
+def test_builds_on_an_unpooled_connection_without_timeouts(fake_mysql, registry, monkeypatch):
+    opened = []
+    connect = fake_mysql.connect
+    monkeypatch.setattr(configapp.mysql.connector, "connect",
+                        lambda **config: opened.append(config) or connect(**config))
+    monkeypatch.setattr(configapp, "connect_dashboard", lambda: 1 / 0)
+    monkeypatch.setattr(configapp, "uses_backward_index_scan", lambda *args: True)
+    fake_mysql.respond = index_responder()
+
+    report = configapp.ensure_freshness_indexes("2026", "03")
+
+    assert len(opened) == 1
+    assert "read_timeout" not in opened[0] and "connection_timeout" not in opened[0]
+    assert report["added"] and not report["timed_out"]
+
+
+def test_timed_out_table_is_reported_and_the_run_continues(fake_mysql, registry, monkeypatch):
+    monkeypatch.setattr(configapp, "uses_backward_index_scan", lambda *args: True)
+    fake_mysql.respond = index_responder(fail_alter="`phl`.`deviceStatus`")
+
+    report = configapp.ensure_freshness_indexes("2026", "03")
+
+    assert report["timed_out"] == ["phl.deviceStatus(deviceTimestamp)"]
+    assert len(fake_mysql.connections) == 2
+    assert fake_mysql.connections[0].closed
+    assert any(entry.startswith("pit.") for entry in report["added"])
@@ -0,0 +1,32 @@
+import app as configapp
+
+
+def test_export_ids_keeps_screen_order(client, pool, fake_mysql, monkeypatch):
+    monkeypatch.setattr(configapp, "EXPORT_BATCH_SIZE", 2)
+    fake_mysql.respond = lambda sql, params: [(i, i, f"C{i}") for i in params if i != 99]
+
+    resp = client.post("/api/export/clientappdetails", data={
+        "format": "csv", "fields": "id,clientName", "ids": "5,99,3,1",
+    })
+    assert resp.get_data(as_text=True).splitlines() == ["id,clientName", "5,C5", "3,C3", "1,C1"]
+    resp.close()
+    assert len(fake_mysql.statements) == 2  # one query per batch of ids
+    assert pool.stats()["in_use"] == 0
+
+
+def test_export_rejects_bad_ids(client, pool):
+    resp = client.post("/api/export/clientappdetails", data={"ids": "5,x"})
+    assert resp.status_code == 400
+
+
+def test_lastupdated_export_reuses_the_page_snapshot(client, registry, monkeypatch):
+    keys = []
+
+    def get(key):
+        keys.append(key)
+        return [{"clientName": "PHL", "flightLastUpdated": "f"}, {"clientName": "PIT"}], 0
+
+    monkeypatch.setattr(configapp.freshness_cache, "get", get)
+    resp = client.get("/api/export/lastupdated?format=csv&year=2026&month=3&client=phl&source=flight")
+    assert resp.get_data(as_text=True).splitlines() == ["clientName,currentTime,flightLastUpdated", "PHL,,f"]
+    assert keys == [("2026", "03", None, None)]
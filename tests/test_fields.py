@@ -0,0 +1,41 @@
+def last_select(fake_mysql):
+    sql, _ = fake_mysql.statements[-1]
+    return " ".join(sql.split()).split(" FROM ")[0]
+
+
+def test_fields_become_the_select_list(pool, client, fake_mysql):
+    res = client.get("/api/client-details?fields=clientName,heatMapEnabled,clientId")
+
+    assert res.status_code == 200
+    assert last_select(fake_mysql) == (
+        "SELECT d.id, d.`clientName`, d.`heatMapEnabled`, c.id AS clientId"
+    )
+
+
+def test_id_is_selected_once_and_duplicates_collapse(pool, client, fake_mysql):
+    client.get("/api/notification-configs?fields=push,id,push")
+
+    assert last_select(fake_mysql) == "SELECT n.id, n.`push`"
+
+
+def test_without_fields_every_column_is_selected(pool, client, fake_mysql):
+    client.get("/api/notification-configs")
+
+    assert last_select(fake_mysql) == "SELECT n.*, c.id AS clientId"
+
+
+def test_unknown_field_is_rejected_before_querying(pool, client, fake_mysql):
+    res = client.get("/api/client-details?fields=clientName,password`--")
+
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "unknown fields: password`--"
+    assert fake_mysql.statements == []
+
+
+def test_fields_combine_with_paging(pool, client, fake_mysql):
+    fake_mysql.respond = lambda sql, params: [{"id": 5, "push": "True"}]
+
+    body = client.get("/api/notification-configs?fields=push&limit=10").get_json()
+
+    assert body == {"items": [{"id": 5, "push": "True"}], "nextCursor": None}
+    assert last_select(fake_mysql) == "SELECT n.id, n.`push`"
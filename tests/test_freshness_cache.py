@@ -0,0 +1,100 @@
+import threading
+import time
+
+import app as configapp
+
+KEY = ("2026", "03", None, None)
+
+
+def make_cache(compute, **kwargs):
+    kwargs = {"interval": 60, "max_stale": 600, "key_idle": 3600, **kwargs}
+    cache = configapp.FreshnessCache(compute, **kwargs)
+    # Only the read path is under test; keep the periodic refresher off
+    cache._thread = threading.current_thread()
+    return cache
+
+
+def test_cold_key_is_computed_inline():
+    cache = make_cache(lambda *key: [{"clientName": "PHL"}])
+    rows, computed_at = cache.get(KEY)
+    assert rows == [{"clientName": "PHL"}]
+    assert computed_at <= time.time()
+
+
+def test_concurrent_cold_readers_share_one_compute():
+    calls = []
+    started = threading.Event()
+
+    def compute(*key):
+        calls.append(key)
+        started.set()
+        time.sleep(0.2)
+        return [{"clientName": "PHL"}]
+
+    cache = make_cache(compute)
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(cache.get(KEY))) for _ in range(8)]
+    readers[0].start()
+    started.wait(1)
+    for reader in readers[1:]:
+        reader.start()
+    for reader in readers:
+        reader.join(2)
+
+    assert calls == [KEY]
+    assert len(results) == 8
+    assert all(rows == [{"clientName": "PHL"}] for rows, _ in results)
+
+
+def test_failed_cold_compute_returns_none():
+    def compute(*key):
+        raise RuntimeError("probe failed")
+
+    cache = make_cache(compute)
+    assert cache.get(KEY) == (None, None)
+
+
+def test_failed_refresh_keeps_previous_snapshot():
+    results = [[{"clientName": "PHL"}], RuntimeError("down")]
+
+    def compute(*key):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    cache = make_cache(compute)
+    first = cache.get(KEY)
+    cache.refresh(KEY)
+    assert cache.get(KEY) == first
+
+
+def test_stale_snapshot_is_served_while_refreshing():
+    release = threading.Event()
+    calls = []
+
+    def compute(*key):
+        calls.append(key)
+        if len(calls) > 1:
+            release.wait(2)
+        return [{"n": len(calls)}]
+
+    cache = make_cache(compute, interval=0.01)
+    cache.get(KEY)
+    time.sleep(0.02)
+    rows, _ = cache.get(KEY)  # past interval: old rows, refresh in the background
+    assert rows == [{"n": 1}]
+    release.set()
+
+
+def test_snapshot_past_max_stale_is_recomputed_inline():
+    calls = []
+
+    def compute(*key):
+        calls.append(key)
+        return [{"n": len(calls)}]
+
+    cache = make_cache(compute, max_stale=0)
+    cache.get(KEY)
+    rows, _ = cache.get(KEY)
+    assert rows == [{"n": 2}]
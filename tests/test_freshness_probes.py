@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import app as configapp
+
+SEEDS = configapp.FRESHNESS_SEED_DBNAMES
+
+
+@pytest.fixture
+def dashboard(fake_mysql, registry, monkeypatch):
+    """Dashboard connections from a fresh pool of fakes; set .respond per test."""
+    pool = configapp.ConnectionPool("dashboard", {}, size=10, timeout=1)
+    monkeypatch.setattr(configapp, "connect_dashboard", pool.acquire)
+    return fake_mysql
+
+
+def probe_rows(stamps, slow=(), broken=()):
+    """respond() answering each client's probe with one row."""
+    def respond(sql, params):
+        db = next(db for db in stamps if f"{db}." in sql or f"{db}_" in sql)
+        if db in broken:
+            raise configapp.mysql.connector.errors.ProgrammingError("Table doesn't exist")
+        if db in slow:
+            time.sleep(0.5)
+        return [{"currentTime": "now", "deviceStatusLastUpdated": stamps[db]}]
+    return respond
+
+
+def test_one_probe_per_client_merged_in_order(dashboard):
+    stamps = {db: f"2026-03-01 {i:02d}:00:00" for i, db in enumerate(SEEDS)}
+    dashboard.respond = probe_rows(stamps)
+
+    rows = configapp.compute_freshness("2026", "03")
+
+    assert [row["clientName"] for row in rows] == sorted(db.upper() for db in SEEDS)
+    assert all(row["deviceStatusLastUpdated"] == stamps[row["clientName"].lower()] for row in rows)
+    assert len(dashboard.statements) == len(SEEDS)
+    assert any("phl_depHistory_2026_03" in sql for sql, _ in dashboard.statements)
+
+
+def test_broken_client_gets_an_error_row(dashboard):
+    stamps = dict.fromkeys(SEEDS, "2026-03-01 00:00:00")
+    dashboard.respond = probe_rows(stamps, broken={"pit"})
+
+    rows = {row["clientName"]: row for row in configapp.compute_freshness("2026", "03")}
+
+    assert "doesn't exist" in rows["PIT"]["error"]
+    assert rows["PIT"]["deviceStatusLastUpdated"] is None
+    assert rows["PHL"]["deviceStatusLastUpdated"] == "2026-03-01 00:00:00"
+    assert "error" not in rows["PHL"]
+
+
+def test_slow_client_times_out_without_blanking_the_rest(dashboard, monkeypatch):
+    monkeypatch.setattr(configapp, "FRESHNESS_PROBE_TIMEOUT", 0.2)
+    stamps = dict.fromkeys(SEEDS, "2026-03-01 00:00:00")
+    dashboard.respond = probe_rows(stamps, slow={"dial"})
+
+    rows = {row["clientName"]: row for row in configapp.compute_freshness("2026", "03")}
+
+    assert rows["DIAL"]["error"] == "timeout"
+    assert len(rows) == len(SEEDS)
+    assert all("error" not in row for name, row in rows.items() if name != "DIAL")
+
+
+def test_probe_query_bounds_server_time():
+    sql = configapp.build_probe_query("phl", configapp.sources_for_db("phl"), "2026", "03")
+    assert "MAX_EXECUTION_TIME" in sql
+    assert "flightDataHistory.phl_depHistory_2026_03" in sql
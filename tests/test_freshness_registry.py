@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+import app as configapp
+
+THIS_YEAR = str(time.localtime().tm_year)
+
+
+def key_for(query):
+    with configapp.app.test_request_context("/api/lastupdated?" + query):
+        return configapp.freshness_key()
+
+
+# ---- FreshnessRegistry ----
+
+def test_registry_merges_client_details_with_seeds(pool, fake_mysql):
+    fake_mysql.respond = lambda sql, params: [("NewSite ",), ("phl",), ("bad-name;",)]
+    sources = configapp.FreshnessRegistry(ttl=60).get()
+
+    assert set(sources) == set(configapp.FRESHNESS_SEED_DBNAMES) | {"newsite"}
+    assert sources["newsite"] == configapp.STANDARD_SITE_SOURCES
+    assert sources["abmmia"] == configapp.FRESHNESS_SOURCE_OVERRIDES["abmmia"]
+
+
+def test_registry_is_cached_for_ttl(pool, fake_mysql):
+    registry = configapp.FreshnessRegistry(ttl=60)
+    assert registry.get() is registry.get()
+    assert len(fake_mysql.statements) == 1
+
+
+def test_registry_keeps_last_good_load(pool, fake_mysql):
+    fake_mysql.respond = lambda sql, params: [("newsite",)]
+    registry = configapp.FreshnessRegistry(ttl=0)
+    first = registry.get()
+
+    def fail(sql, params):
+        raise configapp.mysql.connector.errors.OperationalError("gone away")
+    fake_mysql.respond = fail
+    assert registry.get() is first
+
+
+# ---- filters ----
+
+def test_filters_narrow_the_probes(registry, fake_mysql, monkeypatch):
+    pool = configapp.ConnectionPool("dashboard", {}, size=4, timeout=1)
+    monkeypatch.setattr(configapp, "connect_dashboard", pool.acquire)
+    fake_mysql.respond = lambda sql, params: [{"currentTime": "now"}]
+
+    rows = configapp.compute_freshness("2026", "03", clients=("phl", "abmmia"), kinds=("flight",))
+
+    assert [row["clientName"] for row in rows] == ["PHL"]  # abmmia has no flight source
+    (sql, _), = fake_mysql.statements
+    assert "phl_depHistory_2026_03" in sql
+    assert "deviceStatus" not in sql
+
+
+def test_key_normalises_filters(registry):
+    assert key_for(f"year={THIS_YEAR}&month=1&client=PIT,phl&source=flight") == (
+        THIS_YEAR, "01", ("phl", "pit"), ("flight",)
+    )
+
+
+def test_key_drops_unknown_clients_and_sources(registry):
+    assert key_for(f"year={THIS_YEAR}&month=1&client=phl,nope&source=flight,nope") == (
+        THIS_YEAR, "01", ("phl",), ("flight",)
+    )
+    assert key_for(f"year={THIS_YEAR}&month=1&client=nope") is None
+    assert key_for(f"year={THIS_YEAR}&month=1&source=nope") is None
+
+
+def test_filter_naming_everything_shares_the_unfiltered_key(registry):
+    every_client = ",".join(configapp.FRESHNESS_SEED_DBNAMES)
+    every_kind = ",".join(configapp.FRESHNESS_KINDS)
+    assert key_for(f"year={THIS_YEAR}&month=1&client={every_client}&source={every_kind}") == (
+        THIS_YEAR, "01", None, None
+    )
+
+
+@pytest.mark.parametrize("query", [
+    "month=1",
+    "year=26&month=1",
+    "year=2026&month=13",
+    "year=1999&month=1",
+    f"year={int(THIS_YEAR) + 1}&month=1",
+    f"year={int(THIS_YEAR) - configapp.FRESHNESS_YEARS_BACK - 1}&month=12",
+])
+def test_key_rejects_dates_outside_the_window(registry, query):
+    assert key_for(query) is None
+
+
+def test_rejected_request_never_reaches_the_cache(client, registry, monkeypatch):
+    def get(key):
+        raise AssertionError("cache touched")
+    monkeypatch.setattr(configapp.freshness_cache, "get", get)
+    resp = client.get("/api/lastupdated?year=1999&month=1&client=whatever")
+    assert resp.get_json() == []
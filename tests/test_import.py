@@ -0,0 +1,157 @@
+import io
+import zipfile
+
+import pytest
+
+import app as configapp
+
+NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+STYLES = (
+    f'<styleSheet {NS}><numFmts><numFmt numFmtId="164" formatCode="h:mm AM/PM"/></numFmts>'
+    '<cellXfs><xf numFmtId="0"/><xf numFmtId="164"/><xf numFmtId="14"/></cellXfs></styleSheet>'
+)
+
+
+def inline(ref, text):
+    return f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+def workbook(rows, styles=STYLES):
+    sheet = f"<worksheet {NS}><sheetData>" + "".join(
+        f"<row>{''.join(cells)}</row>" for cells in rows
+    ) + "</sheetData></worksheet>"
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as book:
+        book.writestr("xl/worksheets/sheet1.xml", sheet)
+        book.writestr("xl/styles.xml", styles)
+    buf.seek(0)
+    return buf
+
+
+def existing(*names):
+    """respond() for a database that already holds `names`."""
+    taken = {n.lower(): n for n in names}
+
+    def respond(sql, params):
+        if "clientName IN" in sql:
+            return [(taken[p.lower()],) for p in params if p.lower() in taken]
+        return []
+    return respond
+
+
+def inserts(fake_mysql):
+    return [s for s in fake_mysql.statements if s[0].startswith("INSERT")]
+
+
+# ---- prepare_import_row / Field.coerce ----
+
+def test_missing_fields_take_defaults():
+    params, errors = configapp.prepare_import_row({"clientName": " PHL ", "soapShots": "500"})
+    assert errors == []
+    values, _ = configapp.client_values({"clientName": "PHL", "soapShots": "500"})
+    assert params["clientappdetails"][0] == "PHL"
+    assert values["soapShots"] == 500
+    assert values["heatMapEnabled"] == "False"
+
+
+def test_row_errors_are_collected():
+    _, errors = configapp.prepare_import_row({"bogus": 1, "soapShots": "many", "menuColor": "x" * 51})
+    assert "unknown field: bogus" in errors
+    assert "soapShots: must be an integer" in errors
+    assert "menuColor: longer than 50 characters" in errors
+    assert "clientName is required" in errors
+
+
+def test_not_an_object():
+    assert configapp.prepare_import_row(["PHL"]) == (None, ["not an object"])
+
+
+# ---- xlsx cells ----
+
+def test_xlsx_cells_are_typed():
+    rows = configapp.read_xlsx_rows(workbook([
+        [inline("A1", "clientName"), inline("B1", "overViewStartTime"),
+         inline("C1", "heatMapEnabled"), inline("D1", "soapShots")],
+        [inline("A2", "PHL"), '<c r="B2" s="1"><v>0.395833333</v></c>',
+         '<c r="C2" t="b"><v>1</v></c>', '<c r="D2"><v>500</v></c>'],
+    ]))
+    assert rows[1] == ["PHL", "9:30 AM", True, 500]
+
+    record = configapp.rows_to_dicts(rows)[0]
+    values, errors = configapp.client_values(record)
+    assert errors == []
+    assert values["heatMapEnabled"] == "True"
+    assert values["overViewStartTime"] == "9:30 AM"
+
+
+def test_xlsx_date_in_text_field_is_a_row_error():
+    rows = configapp.read_xlsx_rows(workbook([
+        [inline("A1", "clientName"), inline("B1", "overViewStartTime")],
+        [inline("A2", "PHL"), '<c r="B2" s="2"><v>45000.5</v></c>'],
+    ]))
+    _, errors = configapp.prepare_import_row(configapp.rows_to_dicts(rows)[0])
+    assert errors == ["overViewStartTime: must be text, not a number"]
+
+
+def test_xlsx_error_cell_rejects_file():
+    with pytest.raises(ValueError, match="#N/A"):
+        configapp.read_xlsx_rows(workbook([['<c r="A1" t="e"><v>#N/A</v></c>']]))
+
+
+def test_xlsx_size_checked_before_parsing(monkeypatch):
+    monkeypatch.setattr(configapp, "IMPORT_MAX_XLSX_BYTES", 100)
+    with pytest.raises(ValueError, match="expands to more than 100 bytes"):
+        configapp.read_xlsx_rows(workbook([[inline("A1", "clientName")]] * 20))
+
+
+# ---- /api/import-clients ----
+
+def test_import_inserts_all_three_tables(client, pool, fake_mysql):
+    resp = client.post("/api/import-clients", json=[{"clientName": "PHL"}, {"clientName": "PIT"}])
+    assert resp.status_code == 200
+    assert resp.get_json()["imported"] == 2
+    statements = inserts(fake_mysql)
+    assert len(statements) == 6  # two rows x three tables
+    assert {sql.split("`")[1] for sql, _ in statements} == set(configapp.CLIENT_TABLES)
+    assert fake_mysql.connections[0].commits == 1
+
+
+def test_import_rejects_duplicates_and_existing_clients(client, pool, fake_mysql):
+    fake_mysql.respond = existing("phl")
+    resp = client.post(
+        "/api/import-clients",
+        json=[{"clientName": "PHL"}, {"clientName": "PIT"}, {"clientName": "pit"}],
+    )
+    body = resp.get_json()
+    assert resp.status_code == 400
+    assert body["rows"][0]["errors"] == ["client already exists"]
+    assert body["rows"][2]["errors"] == ["duplicate of row 2"]
+    assert inserts(fake_mysql) == []
+
+
+def test_import_dry_run_writes_nothing(client, pool, fake_mysql):
+    resp = client.post("/api/import-clients?dryRun=1", json=[{"clientName": "PHL"}])
+    assert resp.get_json() == {
+        "ok": True, "dryRun": True, "imported": 0,
+        "rows": [{"row": 1, "clientName": "PHL", "ok": True, "errors": []}],
+    }
+    assert inserts(fake_mysql) == []
+
+
+def test_import_csv_upload(client, pool, fake_mysql):
+    data = {"file": (io.BytesIO(b"\xef\xbb\xbfid,clientName,soapShots\n7,PHL,500\n"), "clients.csv")}
+    resp = client.post("/api/import-clients?dryRun=1", data=data)
+    assert resp.status_code == 200
+    assert resp.get_json()["rows"][0]["clientName"] == "PHL"
+
+
+def test_import_row_limit(client, pool, monkeypatch):
+    monkeypatch.setattr(configapp, "IMPORT_MAX_ROWS", 1)
+    resp = client.post("/api/import-clients", json=[{"clientName": "A"}, {"clientName": "B"}])
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "at most 1 rows per import"
+
+
+def test_import_unknown_file_type(client, pool):
+    resp = client.post("/api/import-clients", data={"file": (io.BytesIO(b"x"), "clients.txt")})
+    assert resp.status_code == 400
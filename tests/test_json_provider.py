@@ -0,0 +1,39 @@
+import datetime
+import decimal
+
+import pytest
+
+import app as configapp
+
+ROW = {
+    "zeta": 1,
+    "clientName": "PHL",
+    "updated": datetime.datetime(2026, 3, 1, 12, 30),
+    "day": datetime.date(2026, 3, 1),
+    "ratio": decimal.Decimal("0.50"),
+    "note": "café",
+}
+EXPECTED = (
+    '{"clientName":"PHL","day":"2026-03-01","note":"café",'
+    '"ratio":"0.50","updated":"2026-03-01T12:30:00","zeta":1}'
+)
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def provider(request, monkeypatch):
+    if request.param == "orjson":
+        if configapp.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(configapp, "orjson", None)
+    return configapp.FastJSONProvider(configapp.app)
+
+
+def test_output_matches_flask_default_key_order(provider):
+    assert provider.dumps(ROW) == EXPECTED
+    assert provider.response(ROW).get_data(as_text=True) == EXPECTED + "\n"
+
+
+def test_sort_keys_can_be_turned_off(provider):
+    provider.sort_keys = False
+    assert list(provider.loads(provider.dumps(ROW))) == list(ROW)
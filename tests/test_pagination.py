@@ -0,0 +1,59 @@
+import app as configapp
+
+
+def client_rows(ids, joins=1):
+    """dictionary rows for /api/clients, `joins` rows per id (one per join match)."""
+    return [{"id": i, "clientName": f"C{i}", "dbName": f"db{j}"}
+            for i in ids for j in range(joins)]
+
+
+def test_without_page_args_the_full_list_is_returned(pool, client, fake_mysql):
+    fake_mysql.respond = lambda sql, params: client_rows([3, 2, 1])
+
+    res = client.get("/api/clients")
+
+    assert res.status_code == 200
+    assert [row["id"] for row in res.get_json()] == [3, 2, 1]
+    sql, params = fake_mysql.statements[-1]
+    assert "LIMIT" not in sql and params == ()
+
+
+def test_first_page_fetches_one_extra_row_for_the_cursor(pool, client, fake_mysql):
+    fake_mysql.respond = lambda sql, params: client_rows([9, 8, 7])
+
+    body = client.get("/api/clients?limit=2").get_json()
+
+    assert [row["id"] for row in body["items"]] == [9, 8]
+    assert body["nextCursor"] == "8"
+    sql, params = fake_mysql.statements[-1]
+    assert "FROM (SELECT * FROM clientappdetails ORDER BY id DESC LIMIT %s) c" in sql
+    assert params == (3,)
+
+
+def test_next_page_starts_after_the_cursor(pool, client, fake_mysql):
+    fake_mysql.respond = lambda sql, params: client_rows([7])
+
+    body = client.get("/api/client-details?limit=2&after=8").get_json()
+
+    assert body == {"items": [{"id": 7, "clientName": "C7", "dbName": "db0"}],
+                    "nextCursor": None}
+    sql, params = fake_mysql.statements[-1]
+    assert "WHERE id < %s ORDER BY id DESC LIMIT %s" in sql
+    assert params == (8, 3)
+
+
+def test_joined_rows_of_one_id_stay_on_one_page(pool, client, fake_mysql):
+    fake_mysql.respond = lambda sql, params: client_rows([9, 8, 7], joins=2)
+
+    body = client.get("/api/notification-configs?limit=2").get_json()
+
+    assert [row["id"] for row in body["items"]] == [9, 9, 8, 8]
+    assert body["nextCursor"] == "8"
+
+
+def test_bad_page_args_are_rejected(pool, client, fake_mysql):
+    for query in ("limit=0", f"limit={configapp.PAGE_LIMIT_MAX + 1}", "limit=x", "after=abc"):
+        res = client.get(f"/api/clients?{query}")
+        assert res.status_code == 400, query
+        assert "error" in res.get_json()
+    assert fake_mysql.statements == []
@@ -0,0 +1,73 @@
+import pytest
+
+import app as configapp
+
+
+@pytest.fixture
+def db(pool, fake_mysql):
+    def respond(sql, params):
+        if sql == configapp.CLIENT_NAME_FOR_UPDATE_SQL:
+            return [("PHL",)] if params == ("7",) else []
+        return []
+
+    fake_mysql.respond = respond
+    return fake_mysql
+
+
+def updates(fake_mysql):
+    return [s for s in fake_mysql.statements if s[0].startswith("UPDATE")]
+
+
+def test_patch_touches_only_the_tables_it_names(client, db):
+    version = configapp.config_version.snapshot()[0]
+    resp = client.patch("/api/update-client/7", json={"heatMapEnabled": "True", "menuColor": "#fff"})
+    assert resp.get_json() == {
+        "ok": True,
+        "message": "Updated successfully",
+        "updated": {"client_details": ["heatMapEnabled"], "clientappdetails": ["menuColor"]},
+    }
+    assert updates(db) == [
+        ("UPDATE `client_details` SET `heatMapEnabled`=%s WHERE clientName=%s", ("True", "PHL")),
+        ("UPDATE `clientappdetails` SET `menuColor`=%s WHERE id=%s", ("#fff", "7")),
+    ]
+    assert db.connections[0].commits == 1
+    assert configapp.config_version.snapshot()[0] != version
+
+
+def test_patch_rename_reaches_every_table(client, db):
+    client.patch("/api/update-client/7", json={"clientName": " PHL2 "})
+    assert sorted(sql.split("`")[1] for sql, _ in updates(db)) == sorted(configapp.CLIENT_TABLES)
+    assert all(params[0] == "PHL2" for _, params in updates(db))
+
+
+def test_patch_null_resets_to_default(client, db):
+    client.patch("/api/update-client/7", json={"soapShots": None})
+    assert updates(db)[0][1] == (1000, "PHL")
+
+
+def test_patch_unknown_client_is_404_and_releases(client, db, pool):
+    resp = client.patch("/api/update-client/8", json={"soapShots": 5})
+    assert resp.status_code == 404
+    assert updates(db) == []
+    assert db.connections[0].rollbacks >= 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_patch_validation_errors_skip_the_database(client, db):
+    resp = client.patch("/api/update-client/7", json={"soapShots": "many", "bogus": 1})
+    assert resp.status_code == 400
+    # The test client sends keys sorted, so "bogus" is checked first
+    assert resp.get_json()["error"] == "unknown field: bogus; soapShots: must be an integer"
+    assert db.connections == []
+
+
+def test_patch_empty_body(client, db):
+    assert client.patch("/api/update-client/7", json={}).get_json()["message"] == "Nothing to update"
+    assert client.patch("/api/update-client/7", json=[1]).status_code == 400
+
+
+def test_patch_connection_back_in_pool(client, db, pool):
+    client.patch("/api/update-client/7", json={"soapShots": 5})
+    client.patch("/api/update-client/7", json={"soapShots": 6})
+    assert pool.stats()["in_use"] == 0
+    assert len(db.connections) == 1
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+import app as configapp
+
+
+def test_release_reuses_the_connection(pool, fake_mysql):
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert len(fake_mysql.connections) == 1
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_close_returns_connection_to_pool(pool):
+    conn = pool.acquire()
+    conn.close()
+    assert pool.stats()["in_use"] == 0
+    assert pool.acquire() is conn
+
+
+def test_release_rolls_back_open_transaction(pool):
+    conn = pool.acquire()
+    conn.cursor().execute("UPDATE users SET email=%s", ("x",))
+    pool.release(conn)
+    assert conn._raw.rollbacks == 1
+
+
+def test_acquire_times_out_when_exhausted(pool):
+    held = [pool.acquire(), pool.acquire()]
+    started = time.monotonic()
+    with pytest.raises(configapp.PoolTimeout):
+        pool.acquire()
+    assert time.monotonic() - started >= pool.timeout
+    assert pool.stats()["timeouts"] == 1
+    for conn in held:
+        pool.release(conn)
+
+
+def test_waiter_gets_connection_when_one_is_released(pool):
+    held = [pool.acquire(), pool.acquire()]
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(held[0])
+    waiter.join(1)
+    assert got == [held[0]]
+
+
+def test_discard_frees_the_slot(pool, fake_mysql):
+    conn = pool.acquire()
+    pool.release(conn, discard=True)
+    assert conn._raw.closed
+    assert pool.acquire() is not conn
+    assert len(fake_mysql.connections) == 2
+
+
+def test_stale_connection_is_replaced_on_checkout(pool, fake_mysql):
+    conn = pool.acquire()
+    pool.release(conn)
+    conn._raw.ping_fails = True
+    conn._last_used -= pool.ping_after + 1
+    fresh = pool.acquire()
+    assert fresh is not conn
+    assert conn._raw.closed
+
+
+def test_recycled_after_max_age(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    conn._created -= pool.recycle + 1
+    assert pool.acquire() is not conn
+    assert pool.stats()["recycled"] == 1
+
+
+def test_request_scoped_connection_released_in_teardown(pool, client, fake_mysql):
+    fake_mysql.respond = lambda sql, params: [(1,)]
+    with configapp.app.test_request_context():
+        first = configapp.connect()
+        assert configapp.connect() is first
+        first.close()  # no-op inside a request
+        assert pool.stats()["in_use"] == 1
+    assert pool.stats()["in_use"] == 0
+
+
+def test_warm_opens_min_idle(fake_mysql):
+    pool = configapp.ConnectionPool("warm", {}, size=3, min_idle=2)
+    assert pool.warm() == 2
+    assert pool.warm() == 0
+    assert len(fake_mysql.connections) == 2
+
+
+def test_warm_stops_at_pool_size(fake_mysql):
+    pool = configapp.ConnectionPool("warm", {}, size=1, min_idle=5)
+    assert pool.warm() == 1
+    assert pool.stats()["min_idle"] == 1
@@ -0,0 +1,53 @@
+import app as configapp
+
+SQL = configapp.USER_BY_ID_SQL
+
+
+def checkout(fake_mysql, **kwargs):
+    pool = configapp.ConnectionPool("stmt", {}, size=1, **kwargs)
+    return pool, pool.acquire()
+
+
+def test_text_protocol_unless_opted_in(fake_mysql):
+    pool, conn = checkout(fake_mysql, prepare_statements=False)
+
+    cur = conn.prepared(SQL, (1,))
+
+    assert not cur.prepared
+    assert fake_mysql.statements == [(SQL, (1,))]
+    assert pool.stats()["stmt_prepared"] == 0
+
+
+def test_statement_is_prepared_once_per_connection(fake_mysql):
+    pool, conn = checkout(fake_mysql, prepare_statements=True)
+
+    first = conn.prepared(SQL, (1,))
+    second = conn.prepared(SQL, (2,))
+
+    assert first is second and first.prepared
+    assert fake_mysql.statements == [(SQL, (1,)), (SQL, (2,))]
+    assert pool.stats()["stmt_prepared"] == 1
+    assert pool.stats()["stmt_reused"] == 1
+
+
+def test_dictionary_and_tuple_cursors_are_cached_apart(fake_mysql):
+    _, conn = checkout(fake_mysql, prepare_statements=True)
+
+    plain = conn.prepared(SQL, (1,))
+    rows = conn.prepared(SQL, (1,), dictionary=True)
+
+    assert plain is not rows
+    assert rows.dictionary and not plain.dictionary
+
+
+def test_least_recently_used_statement_is_closed(fake_mysql):
+    pool, conn = checkout(fake_mysql, prepare_statements=True, statement_cache_size=2)
+
+    a = conn.prepared("SELECT 1", ())
+    b = conn.prepared("SELECT 2", ())
+    conn.prepared("SELECT 1", ())  # a is now the most recent
+    conn.prepared("SELECT 3", ())
+
+    assert b.closed and not a.closed
+    assert [sql for sql, _ in conn._statements] == ["SELECT 1", "SELECT 3"]
+    assert pool.stats()["stmt_prepared"] == 3
@@ -0,0 +1,102 @@
+import pytest
+
+import app as configapp
+
+INSTANT, INPLACE, COPY = 0, 1, 2
+
+
+@pytest.mark.parametrize("column_type, live_type, algorithm", [
+    ("VARCHAR(50)", "varchar(10)", INPLACE),   # both fit a 1-byte length prefix
+    ("VARCHAR(100)", "varchar(45)", COPY),     # crosses to a 2-byte prefix
+    ("VARCHAR(10)", "int", COPY),
+])
+def test_lossless_type_changes_pick_the_cheapest_algorithm(column_type, live_type, algorithm):
+    kind, clause, algo = configapp.diff_column("x", column_type, None, (live_type, None))
+    assert kind == "modify"
+    assert clause == f"MODIFY `x` {column_type}"
+    assert algo == algorithm
+
+
+def test_missing_column_is_added_instantly():
+    assert configapp.diff_column("x", "INT", 5, None) == (
+        "add", "ADD COLUMN `x` INT DEFAULT 5", INSTANT
+    )
+
+
+def test_default_change_is_instant():
+    assert configapp.diff_column("x", "VARCHAR(45)", "True", ("varchar(45)", "False")) == (
+        "default", "ALTER COLUMN `x` SET DEFAULT 'True'", INSTANT
+    )
+    assert configapp.diff_column("x", "VARCHAR(45)", None, ("varchar(45)", "'a'")) == (
+        "default", "ALTER COLUMN `x` DROP DEFAULT", INSTANT
+    )
+
+
+@pytest.mark.parametrize("column_type, live_type", [
+    ("VARCHAR(45)", "varchar(100)"),  # would truncate
+    ("INT", "varchar(45)"),           # would fail on non-numeric rows
+])
+def test_lossy_changes_are_skipped(column_type, live_type):
+    kind, note, algo = configapp.diff_column("x", column_type, None, (live_type, None))
+    assert kind == "skip" and algo is None
+    assert live_type in note
+
+
+def test_matching_column_needs_nothing():
+    # int(11) vs INT is display width only; MariaDB quotes string defaults
+    assert configapp.diff_column("x", "INT", 24, ("int(11)", "24")) is None
+    assert configapp.diff_column("x", "VARCHAR(45)", "True", ("varchar(45)", "'True'")) is None
+
+
+def live_rows(table, **overrides):
+    """INFORMATION_SCHEMA.COLUMNS rows matching DESIRED_COLUMNS[table]."""
+    rows = []
+    for column, column_type, default in configapp.DESIRED_COLUMNS[table]:
+        live = (column_type.replace(" NOT NULL", "").lower(),
+                None if default is None else str(default))
+        if column in overrides:
+            if overrides[column] is None:
+                continue
+            live = overrides[column]
+        rows.append((table, column, *live))
+    return rows
+
+
+def test_plan_combines_one_alter_per_table_at_the_worst_algorithm(fake_mysql):
+    fake_mysql.respond = lambda sql, params: live_rows(
+        "client_details",
+        dbName=None,                           # add: INSTANT
+        labelFlag=("varchar(10)", "3"),        # widen within prefix: INPLACE
+        soapShots=("varchar(45)", "1000"),     # narrowing: skipped
+    )
+    cur = fake_mysql.connect().cursor()
+
+    plan = configapp.plan_schema(cur, tables=["client_details", "users_missing"])
+
+    assert len(plan) == 1
+    entry = plan[0]
+    assert entry["table"] == "client_details"
+    assert entry["algorithm"] == "INPLACE" and entry["lock"] == "NONE"
+    assert entry["changes"] == [
+        "ADD COLUMN `dbName` VARCHAR(100)",
+        "MODIFY `labelFlag` VARCHAR(45) DEFAULT '3'",
+    ]
+    assert entry["skipped"] == ["soapShots: live varchar(45), wanted int"]
+    assert entry["sql"].startswith("ALTER TABLE `client_details`")
+    assert entry["sql"].endswith("ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def test_plan_kinds_filter_and_up_to_date_tables(fake_mysql):
+    fake_mysql.respond = lambda sql, params: (
+        live_rows("client_details", dbName=None, labelFlag=("varchar(10)", "3"))
+        + live_rows("notificationconfiguration")
+    )
+    cur = fake_mysql.connect().cursor()
+
+    plan = configapp.plan_schema(
+        cur, tables=["client_details", "notificationconfiguration"], kinds={"add"}
+    )
+
+    assert [entry["table"] for entry in plan] == ["client_details"]
+    assert plan[0]["changes"] == ["ADD COLUMN `dbName` VARCHAR(100)"]
+    assert plan[0]["algorithm"] == "INSTANT" and plan[0]["lock"] is None
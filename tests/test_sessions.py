@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import app as configapp
+
+USER = {"id": 7, "username": "ana", "email": "ana@example.com", "password_hash": "x"}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = configapp.UserCache(ttl=60)
+    monkeypatch.setattr(configapp, "user_cache", cache)
+    return cache
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_token_round_trip():
+    claims = configapp.verify_session_token(configapp.issue_session_token(USER))
+    assert claims["uid"] == 7 and claims["sub"] == "ana"
+    assert claims["exp"] > time.time()
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda t: t[:-2] + ("AA" if t[-2:] != "AA" else "BB"),    # signature bytes
+    lambda t: configapp.b64url(b'{"uid":1,"sub":"admin","exp":9999999999}') + t[t.index("."):],
+    lambda t: t.replace(".", ""),                              # no separator
+    lambda t: "ana",                                           # pre-HMAC username token
+])
+def test_tampered_tokens_are_rejected(tamper):
+    assert configapp.verify_session_token(tamper(configapp.issue_session_token(USER))) is None
+
+
+def test_token_from_another_secret_is_rejected(monkeypatch):
+    token = configapp.issue_session_token(USER)
+    monkeypatch.setattr(configapp, "SESSION_SECRET", b"rotated")
+    assert configapp.verify_session_token(token) is None
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(configapp, "SESSION_TTL", -1)
+    assert configapp.verify_session_token(configapp.issue_session_token(USER)) is None
+
+
+def test_user_cache_expires_and_invalidates():
+    cache = configapp.UserCache(ttl=60)
+    cache.put(USER)
+    assert cache.get(7) is USER
+    cache.invalidate(7)
+    assert cache.get(7) is None
+
+    cache = configapp.UserCache(ttl=0)
+    cache.put(USER)
+    assert cache.get(7) is None
+
+
+def test_profile_is_served_from_the_cache(client, pool, fake_mysql, cache):
+    fake_mysql.respond = lambda sql, params: [dict(USER)] if "FROM users" in sql else []
+    headers = bearer(configapp.issue_session_token(USER))
+
+    first = client.get("/api/user/profile", headers=headers)
+    second = client.get("/api/user/profile", headers=headers)
+
+    assert first.get_json()["user"]["username"] == "ana"
+    assert second.get_json() == first.get_json()
+    assert len(fake_mysql.statements) == 1
+
+
+def test_profile_update_invalidates_and_reissues(client, pool, fake_mysql, cache):
+    renamed = {**USER, "username": "ana2"}
+    rows = [renamed]  # the session user comes from the cache
+    fake_mysql.respond = lambda sql, params: (
+        [rows.pop(0)] if sql.startswith("SELECT") and "FROM users" in sql else []
+    )
+    cache.put(dict(USER))
+
+    resp = client.put("/api/user/profile", json={"username": "ana2"},
+                      headers=bearer(configapp.issue_session_token(USER)))
+
+    body = resp.get_json()
+    assert body["user"]["username"] == "ana2"
+    assert configapp.verify_session_token(body["token"])["sub"] == "ana2"
+    assert cache.get(7) is None
+
+
+def test_bad_token_is_401_without_a_query(client, pool, fake_mysql, cache):
+    resp = client.get("/api/user/profile", headers=bearer("nope.nope"))
+    assert resp.status_code == 401
+    assert fake_mysql.statements == []
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+import app as configapp
+
+
+@pytest.fixture
+def dist(tmp_path, monkeypatch):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<!doctype html>" + " " * 2000)
+    (tmp_path / "assets" / "index-B7xk2Qa9.js").write_text("console.log(1);" * 200)
+    (tmp_path / "assets" / "index-B7xk2Qa9.css").write_text("body{}")
+    # Looks hashed, isn't in the manifest
+    (tmp_path / "assets" / "vendor-lib.js").write_text("x")
+    (tmp_path / "logo.svg").write_text("<svg/>")
+    (tmp_path / ".vite").mkdir()
+    (tmp_path / ".vite" / "manifest.json").write_text(json.dumps({
+        "index.html": {
+            "file": "assets/index-B7xk2Qa9.js",
+            "css": ["assets/index-B7xk2Qa9.css"],
+            "isEntry": True,
+        },
+    }))
+    assets = configapp.StaticAssets(tmp_path)
+    monkeypatch.setattr(configapp, "static_assets", assets)
+    return tmp_path
+
+
+def test_manifest_files_are_immutable(client, dist):
+    for path in ("/assets/index-B7xk2Qa9.js", "/assets/index-B7xk2Qa9.css"):
+        assert client.get(path).headers["Cache-Control"] == configapp.CACHE_IMMUTABLE
+
+
+def test_files_outside_manifest_revalidate(client, dist):
+    for path in ("/", "/index.html", "/assets/vendor-lib.js", "/logo.svg"):
+        assert client.get(path).headers["Cache-Control"] == configapp.CACHE_REVALIDATE
+
+
+def test_no_manifest_means_no_immutable(client, dist):
+    (dist / ".vite" / "manifest.json").unlink()
+    resp = client.get("/assets/index-B7xk2Qa9.js")
+    assert resp.headers["Cache-Control"] == configapp.CACHE_REVALIDATE
+
+
+def test_manifest_itself_is_not_served(client, dist):
+    resp = client.get("/.vite/manifest.json")
+    assert resp.data.startswith(b"<!doctype html>")  # SPA fallback
+
+
+def test_spa_routes_fall_back_to_index(client, dist):
+    resp = client.get("/clients/42/edit")
+    assert resp.status_code == 200
+    assert resp.data.startswith(b"<!doctype html>")
+
+
+def test_gzip_variant_and_etag_revalidation(client, dist):
+    first = client.get("/assets/index-B7xk2Qa9.js", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["Vary"] == "Accept-Encoding"
+
+    resp = client.get(
+        "/assets/index-B7xk2Qa9.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+    )
+    assert resp.status_code == 304
@@ -0,0 +1,74 @@
+import app as configapp
+
+ROW = {"id": 7, "username": "Alice", "email": "alice@example.com", "password_hash": "x"}
+
+
+def test_get_user_is_one_union_over_both_indexed_columns(fake_mysql, pool):
+    fake_mysql.respond = lambda sql, params: [ROW]
+
+    assert configapp.get_user("ALICE@Example.com") == ROW
+
+    [(sql, params)] = fake_mysql.statements
+    assert "username_lc=LOWER(%s)" in sql
+    assert "email_lc=LOWER(%s)" in sql
+    assert "UNION" in sql
+    assert "LOWER(username)" not in sql and "LOWER(email)" not in sql
+    assert params == ("ALICE@Example.com", "ALICE@Example.com")
+
+
+def test_get_user_miss_returns_none(fake_mysql, pool):
+    assert configapp.get_user("nobody") is None
+
+
+def test_user_exists_checks_every_name_on_both_branches(fake_mysql, pool):
+    fake_mysql.respond = lambda sql, params: [(7,)]
+
+    assert configapp.user_exists("Alice", "alice@example.com") is True
+
+    [(sql, params)] = fake_mysql.statements
+    assert sql.count("IN (LOWER(%s),LOWER(%s))") == 2
+    assert "username_lc IN" in sql and "email_lc IN" in sql
+    assert params == ("Alice", "alice@example.com", "Alice", "alice@example.com")
+
+
+def test_user_exists_false_when_neither_branch_matches(fake_mysql, pool):
+    assert configapp.user_exists("Alice", "alice@example.com") is False
+
+
+def test_register_refuses_a_taken_name(fake_mysql, pool, client):
+    fake_mysql.respond = lambda sql, params: [(7,)] if "UNION" in sql else []
+
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": "ALICE", "email": "new@example.com", "password": "pw"},
+    )
+
+    assert resp.status_code == 400
+    assert resp.get_json() == {"ok": False, "error": "User already exists"}
+    assert not any(sql.startswith("INSERT") for sql, _ in fake_mysql.statements)
+
+
+def test_migration_adds_virtual_columns_and_indexes(fake_mysql, pool):
+    conn = configapp.mysql.connector.connect()
+    configapp.add_users_login_columns(conn.cursor())
+
+    [alter] = [sql for sql, _ in conn.statements if sql.startswith("ALTER TABLE users")]
+    assert "ADD COLUMN `username_lc` VARCHAR(255) GENERATED ALWAYS AS (LOWER(`username`)) VIRTUAL" in alter
+    assert "ADD COLUMN `email_lc` VARCHAR(255) GENERATED ALWAYS AS (LOWER(`email`)) VIRTUAL" in alter
+    assert "ADD INDEX `idx_users_username_lc` (`username_lc`)" in alter
+    assert "ADD INDEX `idx_users_email_lc` (`email_lc`)" in alter
+
+
+def test_migration_is_a_no_op_once_applied(fake_mysql, pool):
+    def respond(sql, params):
+        if "INFORMATION_SCHEMA.COLUMNS" in sql:
+            return [("username_lc",), ("email_lc",)]
+        if "INFORMATION_SCHEMA.STATISTICS" in sql:
+            return [(1,)]
+        return []
+
+    fake_mysql.respond = respond
+    conn = configapp.mysql.connector.connect()
+    configapp.add_users_login_columns(conn.cursor())
+
+    assert not any(sql.startswith("ALTER") for sql, _ in conn.statements)